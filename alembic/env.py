@@ -8,7 +8,14 @@ from alembic import context
 
 from app.database import Base  
 from app.config import settings 
-from app.models import abastecimento  # noqa: F401
+from app.models import (  # noqa: F401
+    abastecimento,
+    chave_idempotencia,
+    contagem_diaria,
+    estatistica_preco_posto,
+    resumo_motorista,
+    rollup_posto,
+)
 
 
 
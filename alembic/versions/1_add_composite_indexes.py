@@ -0,0 +1,89 @@
+"""add composite and brin indexes to abastecimentos
+
+Revision ID: d001512f9770
+Revises: b1347c05ea73
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd001512f9770'
+down_revision = 'b1347c05ea73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block,
+    # so the index changes run in autocommit mode to avoid locking writes
+    # on a populated table.
+    with op.get_context().autocommit_block():
+        # Listing filtered by fuel type, ordered by date (id breaks ties
+        # for keyset pagination)
+        op.create_index(
+            'ix_abastecimentos_tipo_data_hora',
+            'abastecimentos',
+            ['tipo_combustivel', sa.text('data_hora DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+
+        # Driver history ordered by date; supersedes the single-column CPF
+        # index, which is a prefix of this one
+        op.create_index(
+            'ix_abastecimentos_cpf_data_hora',
+            'abastecimentos',
+            ['cpf_motorista', sa.text('data_hora DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+
+        # Unfiltered listing (ORDER BY data_hora, id + LIMIT)
+        op.create_index(
+            'ix_abastecimentos_data_hora_id',
+            'abastecimentos',
+            [sa.text('data_hora DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+
+        # Date range scans: rows arrive roughly in chronological order, so a
+        # BRIN index stays tiny and still very selective
+        op.create_index(
+            'ix_abastecimentos_data_hora_brin',
+            'abastecimentos',
+            ['data_hora'],
+            postgresql_using='brin',
+            postgresql_concurrently=True,
+        )
+
+        op.drop_index(
+            'ix_abastecimentos_cpf_motorista',
+            table_name='abastecimentos',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_abastecimentos_data_hora',
+            table_name='abastecimentos',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_abastecimentos_data_hora',
+            'abastecimentos',
+            ['data_hora'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_abastecimentos_cpf_motorista',
+            'abastecimentos',
+            ['cpf_motorista'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_abastecimentos_data_hora_brin', table_name='abastecimentos')
+        op.drop_index('ix_abastecimentos_data_hora_id', table_name='abastecimentos')
+        op.drop_index('ix_abastecimentos_cpf_data_hora', table_name='abastecimentos')
+        op.drop_index('ix_abastecimentos_tipo_data_hora', table_name='abastecimentos')
@@ -0,0 +1,174 @@
+"""partition abastecimentos by month on data_hora
+
+Revision ID: a685dda0ddde
+Revises: d001512f9770
+Create Date: 2026-10-17 10:03:27.551902
+
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a685dda0ddde'
+down_revision = 'd001512f9770'
+branch_labels = None
+depends_on = None
+
+
+# Months created ahead of the current one; later months are created by
+# scripts/gerenciar_particoes.py
+FUTURE_MONTHS = 3
+
+INDEXES = {
+    'ix_abastecimentos_tipo_data_hora': 'tipo_combustivel, data_hora DESC, id DESC',
+    'ix_abastecimentos_cpf_data_hora': 'cpf_motorista, data_hora DESC, id DESC',
+    'ix_abastecimentos_data_hora_id': 'data_hora DESC, id DESC',
+}
+
+COLUMNS = (
+    'id, id_posto, data_hora, tipo_combustivel, preco_por_litro, '
+    'volume_abastecido, cpf_motorista, improper_data, created_at'
+)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(month: date) -> None:
+    end = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE abastecimentos_p{month:%Y%m} "
+        f"PARTITION OF abastecimentos "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def _rename_legacy_objects(suffix_from: str, suffix_to: str) -> None:
+    op.execute(
+        f"ALTER TABLE abastecimentos{suffix_from} RENAME TO abastecimentos{suffix_to}"
+    )
+    op.execute(
+        f"ALTER TABLE abastecimentos{suffix_to} "
+        f"RENAME CONSTRAINT abastecimentos{suffix_from}_pkey "
+        f"TO abastecimentos{suffix_to}_pkey"
+    )
+    for name in [*INDEXES, 'ix_abastecimentos_data_hora_brin']:
+        op.execute(f"ALTER INDEX {name}{suffix_from} RENAME TO {name}{suffix_to}")
+
+
+def upgrade() -> None:
+    # Keep the current table aside; its rows are copied into the new
+    # partitioned table and the sequence is reused so ids stay the same.
+    _rename_legacy_objects('', '_legacy')
+    op.execute("ALTER SEQUENCE abastecimentos_id_seq OWNED BY NONE")
+
+    # The partition key must be part of the primary key. Both datetime
+    # columns become timestamptz to match the ORM model; existing naive
+    # values are interpreted as UTC.
+    op.execute(
+        """
+        CREATE TABLE abastecimentos (
+            id integer NOT NULL DEFAULT nextval('abastecimentos_id_seq'),
+            id_posto integer NOT NULL,
+            data_hora timestamptz NOT NULL,
+            tipo_combustivel tipocombustivel NOT NULL,
+            preco_por_litro numeric(10, 2) NOT NULL,
+            volume_abastecido numeric(10, 2) NOT NULL,
+            cpf_motorista varchar(11) NOT NULL,
+            improper_data boolean NOT NULL DEFAULT false,
+            created_at timestamptz DEFAULT now(),
+            CONSTRAINT abastecimentos_pkey PRIMARY KEY (id, data_hora)
+        ) PARTITION BY RANGE (data_hora)
+        """
+    )
+
+    # Catches rows outside every monthly partition (e.g. far future dates)
+    op.execute(
+        "CREATE TABLE abastecimentos_default PARTITION OF abastecimentos DEFAULT"
+    )
+
+    bind = op.get_bind()
+    oldest = bind.execute(
+        sa.text(
+            "SELECT min(data_hora AT TIME ZONE 'UTC') FROM abastecimentos_legacy"
+        )
+    ).scalar()
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else current
+    month = min(month, current)
+    while month <= _add_months(current, FUTURE_MONTHS):
+        _create_month_partition(month)
+        month = _add_months(month, 1)
+
+    # Partitioned indexes cascade to every current and future partition
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON abastecimentos ({columns})")
+    op.execute(
+        "CREATE INDEX ix_abastecimentos_data_hora_brin "
+        "ON abastecimentos USING brin (data_hora)"
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO abastecimentos ({COLUMNS})
+        SELECT
+            id, id_posto, data_hora AT TIME ZONE 'UTC', tipo_combustivel,
+            preco_por_litro, volume_abastecido, cpf_motorista, improper_data,
+            created_at AT TIME ZONE 'UTC'
+        FROM abastecimentos_legacy
+        """
+    )
+
+    op.execute("DROP TABLE abastecimentos_legacy")
+    op.execute("ALTER SEQUENCE abastecimentos_id_seq OWNED BY abastecimentos.id")
+
+
+def downgrade() -> None:
+    _rename_legacy_objects('', '_partitioned')
+    op.execute("ALTER SEQUENCE abastecimentos_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE abastecimentos (
+            id integer NOT NULL DEFAULT nextval('abastecimentos_id_seq'),
+            id_posto integer NOT NULL,
+            data_hora timestamp NOT NULL,
+            tipo_combustivel tipocombustivel NOT NULL,
+            preco_por_litro numeric(10, 2) NOT NULL,
+            volume_abastecido numeric(10, 2) NOT NULL,
+            cpf_motorista varchar(11) NOT NULL,
+            improper_data boolean NOT NULL DEFAULT false,
+            created_at timestamp DEFAULT now(),
+            CONSTRAINT abastecimentos_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO abastecimentos ({COLUMNS})
+        SELECT
+            id, id_posto, data_hora AT TIME ZONE 'UTC', tipo_combustivel,
+            preco_por_litro, volume_abastecido, cpf_motorista, improper_data,
+            created_at AT TIME ZONE 'UTC'
+        FROM abastecimentos_partitioned
+        """
+    )
+
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON abastecimentos ({columns})")
+    op.execute(
+        "CREATE INDEX ix_abastecimentos_data_hora_brin "
+        "ON abastecimentos USING brin (data_hora)"
+    )
+
+    # Drops the parent and every attached partition
+    op.execute("DROP TABLE abastecimentos_partitioned")
+    op.execute("ALTER SEQUENCE abastecimentos_id_seq OWNED BY abastecimentos.id")
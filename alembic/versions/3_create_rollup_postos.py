@@ -0,0 +1,71 @@
+"""create rollup_postos table
+
+Revision ID: 77c5f8cfd09c
+Revises: a685dda0ddde
+Create Date: 2026-10-17 11:26:09.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '77c5f8cfd09c'
+down_revision = 'a685dda0ddde'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Daily per-station rollup, kept up to date by the application in the
+    # same transaction as each insert
+    op.create_table(
+        'rollup_postos',
+        sa.Column('id_posto', sa.Integer(), nullable=False),
+        sa.Column(
+            'tipo_combustivel',
+            postgresql.ENUM(name='tipocombustivel', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('soma_preco', sa.Numeric(18, 2), nullable=False),
+        sa.Column('preco_min', sa.Numeric(10, 2), nullable=False),
+        sa.Column('preco_max', sa.Numeric(10, 2), nullable=False),
+        sa.Column('litros', sa.Numeric(18, 2), nullable=False),
+        sa.Column('quantidade_anomalias', sa.Integer(), nullable=False),
+        sa.Column(
+            'atualizado_em',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('id_posto', 'tipo_combustivel', 'dia'),
+    )
+
+    # Backfill from the rows that already exist
+    op.execute(
+        """
+        INSERT INTO rollup_postos (
+            id_posto, tipo_combustivel, dia, quantidade, soma_preco,
+            preco_min, preco_max, litros, quantidade_anomalias
+        )
+        SELECT
+            id_posto,
+            tipo_combustivel,
+            (data_hora AT TIME ZONE 'UTC')::date,
+            count(*),
+            sum(preco_por_litro),
+            min(preco_por_litro),
+            max(preco_por_litro),
+            sum(volume_abastecido),
+            count(*) FILTER (WHERE improper_data)
+        FROM abastecimentos
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_postos')
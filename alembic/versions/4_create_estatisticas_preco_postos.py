@@ -0,0 +1,46 @@
+"""create estatisticas_preco_postos table
+
+Revision ID: 658c64016869
+Revises: 77c5f8cfd09c
+Create Date: 2026-10-17 14:02:41.118352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '658c64016869'
+down_revision = '77c5f8cfd09c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Periodic snapshots of the per-station price sketches used by the
+    # anomaly detector; rebuilt from live traffic, so no backfill
+    op.create_table(
+        'estatisticas_preco_postos',
+        sa.Column('id_posto', sa.Integer(), nullable=False),
+        sa.Column(
+            'tipo_combustivel',
+            postgresql.ENUM(name='tipocombustivel', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('media', sa.Float(), nullable=False),
+        sa.Column('variancia', sa.Float(), nullable=False),
+        sa.Column('digest', postgresql.JSONB(), nullable=False),
+        sa.Column(
+            'atualizado_em',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('id_posto', 'tipo_combustivel'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('estatisticas_preco_postos')
@@ -0,0 +1,62 @@
+"""create resumo_motoristas table
+
+Revision ID: 49d544db2d52
+Revises: 658c64016869
+Create Date: 2026-10-17 16:48:12.530214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '49d544db2d52'
+down_revision = '658c64016869'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lifetime per-driver totals, kept up to date by the application in the
+    # same transaction as each insert
+    op.create_table(
+        'resumo_motoristas',
+        sa.Column('cpf_motorista', sa.String(length=11), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('litros', sa.Numeric(18, 2), nullable=False),
+        sa.Column('gasto', sa.Numeric(20, 4), nullable=False),
+        sa.Column('quantidade_anomalias', sa.Integer(), nullable=False),
+        sa.Column('primeiro_abastecimento', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('ultimo_abastecimento', sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            'atualizado_em',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('cpf_motorista'),
+    )
+
+    # Backfill from the rows that already exist
+    op.execute(
+        """
+        INSERT INTO resumo_motoristas (
+            cpf_motorista, quantidade, litros, gasto, quantidade_anomalias,
+            primeiro_abastecimento, ultimo_abastecimento
+        )
+        SELECT
+            cpf_motorista,
+            count(*),
+            sum(volume_abastecido),
+            sum(preco_por_litro * volume_abastecido),
+            count(*) FILTER (WHERE improper_data),
+            min(data_hora),
+            max(data_hora)
+        FROM abastecimentos
+        GROUP BY 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resumo_motoristas')
@@ -0,0 +1,47 @@
+"""create contagens_diarias table
+
+Revision ID: 52a48ee2ff49
+Revises: 49d544db2d52
+Create Date: 2026-10-17 17:35:27.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '52a48ee2ff49'
+down_revision = '49d544db2d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Row counts per fuel type and UTC day, used for list totals instead of
+    # COUNT(*); kept up to date by the application on every insert
+    op.create_table(
+        'contagens_diarias',
+        sa.Column(
+            'tipo_combustivel',
+            postgresql.ENUM(name='tipocombustivel', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('tipo_combustivel', 'dia'),
+    )
+
+    # Backfill from the rows that already exist
+    op.execute(
+        """
+        INSERT INTO contagens_diarias (tipo_combustivel, dia, quantidade)
+        SELECT tipo_combustivel, (data_hora AT TIME ZONE 'UTC')::date, count(*)
+        FROM abastecimentos
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('contagens_diarias')
@@ -0,0 +1,43 @@
+"""create chaves_idempotencia table
+
+Revision ID: 2a435ccba457
+Revises: 52a48ee2ff49
+Create Date: 2026-10-17 18:21:03.661845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a435ccba457'
+down_revision = '52a48ee2ff49'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Idempotency-Key -> created row; only written for requests that send
+    # the header, so abastecimentos itself gets no unique index
+    op.create_table(
+        'chaves_idempotencia',
+        sa.Column('chave', sa.String(length=255), nullable=False),
+        sa.Column('id_abastecimento', sa.Integer(), nullable=False),
+        sa.Column('data_hora', sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('chave'),
+    )
+    # Keys older than the dedup window are deleted periodically
+    op.create_index(
+        'ix_chaves_idempotencia_created_at', 'chaves_idempotencia', ['created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chaves_idempotencia_created_at', table_name='chaves_idempotencia')
+    op.drop_table('chaves_idempotencia')
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, status , HTTPException, Query
+from fastapi import APIRouter, Depends, status , Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 
-from app.database import get_db
+from app.config import settings
+from app.core.buffer_ingestao import (BufferCheio, BufferIndisponivel, BufferTimeout,
+buffer_ingestao)
+from app.core.idempotencia import AbastecimentoDuplicado
+from app.database import get_db, get_read_db
 from app.models.abastecimento import TipoCombustivel
 from app.schemas.abastecimento import (AbastecimentoCreate, AbastecimentoResponse,
-HistoricoResponse , AbastecimentoPagination)
+HistoricoResponse , AbastecimentoPagination, LoteItemResultado, LoteResponse)
+from app.schemas.motorista import ResumoMotoristaResponse
+from app.schemas.serie import INTERVALOS, MAX_INTERVALOS, SeriePrecosResponse
 from app.services.abastecimento_service import AbastecimentoService
+from app.utils.datas import para_utc
+from app.utils.lote import ler_itens_lote, validar_itens_lote
+from app.utils.serializacao import comprimir_gzip
 
 router = APIRouter(prefix="/api/v1/abastecimentos", tags=["Abastecimentos"])
 
@@ -20,17 +30,241 @@ router = APIRouter(prefix="/api/v1/abastecimentos", tags=["Abastecimentos"])
 )
 async def create_abastecimento(   #async
     data: AbastecimentoCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Reenvios com a mesma chave devolvem o registro original",
+    ),
+    commit: Optional[Literal["sincrono", "assincrono"]] = Header(
+        None,
+        alias="X-Commit",
+        description=(
+            "`assincrono` confirma sem esperar o fsync do WAL (padrão: "
+            "INGESTAO_COMMIT_ASSINCRONO)"
+        ),
+    ),
     db: AsyncSession = Depends(get_db),  #AsyncSession
 ):
+    """
+    Cria um abastecimento.
+
+    Um reenvio (mesma Idempotency-Key ou mesmo posto, data_hora, CPF e
+    volume) não cria outro registro: responde 200 com o original e o
+    header `Idempotent-Replayed: true`.
+
+    Com `X-Commit: assincrono` o registro é confirmado com
+    synchronous_commit=off: menor latência, mas uma queda do banco pode
+    perder os últimos registros já confirmados.
+    """
     service = AbastecimentoService(db)
-    return await service.create_abastecimento(data)  #await
+
+    try:
+        await service.verificar_duplicado(data, idempotency_key)
+
+        if buffer_ingestao.ativo:
+            try:
+                abastecimento = await service.enfileirar_abastecimento(
+                    data, idempotency_key
+                )
+            except (BufferCheio, BufferIndisponivel):
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Fila de ingestão cheia, tente novamente",
+                    headers={"Retry-After": "1"},
+                )
+            except BufferTimeout:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Gravação não confirmada a tempo, tente novamente",
+                    headers={"Retry-After": "1"},
+                )
+
+            if abastecimento is None:
+                return JSONResponse(
+                    status_code=status.HTTP_202_ACCEPTED,
+                    content={"status": "aceito"},
+                )
+            return abastecimento
+
+        return await service.create_abastecimento(
+            data,
+            idempotency_key,
+            commit_assincrono=None if commit is None else commit == "assincrono",
+        )
+    except AbastecimentoDuplicado as e:
+        response.status_code = status.HTTP_200_OK
+        response.headers["Idempotent-Replayed"] = "true"
+        return e.abastecimento
+
+
+@router.post("/batch", response_model=LoteResponse)
+async def create_abastecimentos_lote(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ingestão em lote de abastecimentos.
+
+    Aceita um array JSON ou NDJSON (Content-Type: application/x-ndjson).
+    Itens inválidos são rejeitados individualmente; os válidos são gravados
+    em uma única transação com INSERT multi-linha.
+    """
+    content_type = request.headers.get("content-type", "")
+    ndjson = "ndjson" in content_type or "jsonlines" in content_type
+
+    try:
+        itens = ler_itens_lote(await request.body(), ndjson=ndjson)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if len(itens) > settings.lote_max_itens:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {settings.lote_max_itens} itens",
+        )
+
+    validos, resultados = validar_itens_lote(itens)
+
+    if validos:
+        service = AbastecimentoService(db)
+        criados = await service.create_abastecimentos_lote(
+            [data for _, data in validos]
+        )
+        resultados.extend(
+            LoteItemResultado(
+                indice=indice,
+                status="criado",
+                abastecimento=AbastecimentoResponse.model_validate(abastecimento),
+            )
+            for (indice, _), abastecimento in zip(validos, criados)
+        )
+
+    resultados.sort(key=lambda r: r.indice)
+
+    return LoteResponse(
+        total=len(itens),
+        criados=len(validos),
+        rejeitados=len(itens) - len(validos),
+        itens=resultados,
+    )
+
+
+@router.get("/export")
+async def exportar_abastecimentos(
+    formato: Literal["csv", "ndjson"] = Query("ndjson"),
+    compressao: Optional[Literal["gzip"]] = Query(
+        None, description="`gzip` comprime o fluxo (Content-Encoding: gzip)"
+    ),
+    tipo_combustivel: Optional[TipoCombustivel] = Query(None),
+    data_inicio: Optional[datetime] = Query(None),
+    data_fim: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Exporta todos os abastecimentos filtrados em CSV ou NDJSON.
+
+    Aceita os mesmos filtros da listagem, mas transmite o resultado inteiro
+    em streaming (uma consulta com cursor no servidor), sem paginação.
+    """
+    service = AbastecimentoService(db)
+
+    conteudo = service.exportar_abastecimentos(
+        formato,
+        tipo_combustivel=tipo_combustivel,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+    )
+    headers = {
+        "Content-Disposition": f'attachment; filename="abastecimentos.{formato}"',
+    }
+    if compressao == "gzip":
+        conteudo = comprimir_gzip(conteudo)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        conteudo,
+        media_type="text/csv" if formato == "csv" else "application/x-ndjson",
+        headers=headers,
+    )
 
 
 @router.get("/motoristas/{cpf}/historico", response_model=HistoricoResponse)
 async def historico_motorista(
     cpf: str,
-    db: AsyncSession = Depends(get_db),
+    size: Optional[int] = Query(
+        None,
+        ge=1,
+        le=1000,
+        description="Ativa a paginação keyset com este tamanho de página",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor opaco (next_cursor da resposta anterior)"
+    ),
+    formato: Literal["json", "ndjson"] = Query(
+        "json",
+        description="`ndjson` transmite o histórico completo em streaming",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if len(cpf) != 11 or not cpf.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CPF inválido",
+        )
+
+    service = AbastecimentoService(db)
+
+    if formato == "ndjson":
+        total = await service.contar_abastecimentos_motorista(cpf)
+        if total == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Nenhum abastecimento encontrado",
+            )
+
+        return StreamingResponse(
+            service.stream_historico_motorista(cpf),
+            media_type="application/x-ndjson",
+            headers={"X-Total-Count": str(total)},
+        )
+
+    if size is not None or cursor is not None:
+        try:
+            historico = await service.get_historico_motorista_paginado(
+                cpf, size=size or 100, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+    else:
+        historico = await service.get_historico_motorista(cpf)
+
+    if historico is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum abastecimento encontrado",
+        )
+
+    # JSON já serializado pelo serviço; response_model fica só para o OpenAPI
+    return Response(content=historico, media_type="application/json")
+
+
+@router.get("/motoristas/{cpf}/resumo", response_model=ResumoMotoristaResponse)
+async def resumo_motorista(
+    cpf: str,
+    db: AsyncSession = Depends(get_read_db),
 ):
+    """
+    Totais do motorista: abastecimentos, litros, gasto, preço médio pago
+    por litro e anomalias, sem transferir o histórico.
+    """
     if len(cpf) != 11 or not cpf.isdigit():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,15 +272,55 @@ async def historico_motorista(
         )
 
     service = AbastecimentoService(db)
-    historico = await service.get_historico_motorista(cpf)
+    resumo = await service.get_resumo_motorista(cpf)
 
-    if historico.total_abastecimentos == 0:
+    if resumo is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Nenhum abastecimento encontrado",
         )
 
-    return historico
+    return resumo
+
+
+@router.get("/series", response_model=SeriePrecosResponse)
+async def serie_precos(
+    intervalo: Literal["5m", "15m", "1h", "6h", "1d"] = Query("1h"),
+    data_inicio: Optional[datetime] = Query(
+        None, description="Inclusivo; padrão: 24 horas antes de data_fim"
+    ),
+    data_fim: Optional[datetime] = Query(None, description="Exclusivo; padrão: agora"),
+    tipo_combustivel: Optional[TipoCombustivel] = Query(None),
+    id_posto: Optional[int] = Query(None, gt=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Série temporal por combustível: quantidade, preço médio/mínimo/máximo,
+    litros e anomalias em cada intervalo (alinhado a UTC).
+
+    Períodos dentro da janela recente são agregados em memória (`origem:
+    memoria`); períodos mais antigos vão ao banco (`origem: banco`).
+    """
+    data_fim = para_utc(data_fim) if data_fim else datetime.now(timezone.utc)
+    data_inicio = (
+        para_utc(data_inicio) if data_inicio else data_fim - timedelta(hours=24)
+    )
+
+    if data_inicio >= data_fim:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="data_inicio deve ser anterior a data_fim",
+        )
+    if (data_fim - data_inicio).total_seconds() / INTERVALOS[intervalo] > MAX_INTERVALOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Período excede {MAX_INTERVALOS} intervalos de {intervalo}",
+        )
+
+    service = AbastecimentoService(db)
+    return await service.get_serie_precos(
+        data_inicio, data_fim, intervalo, tipo_combustivel, id_posto
+    )
 
 
 @router.get("", response_model=AbastecimentoPagination)
@@ -56,21 +330,42 @@ async def list_abastecimentos(
     tipo_combustivel: Optional[TipoCombustivel] = Query(None),
     data_inicio: Optional[datetime] = Query(None),
     data_fim: Optional[datetime] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor opaco (next_cursor da resposta anterior). "
+        "Quando informado, ativa a paginação keyset e ignora `page`.",
+    ),
+    total: Optional[Literal["exato", "estimado", "omitido"]] = Query(
+        None,
+        description="Como calcular `total` (padrão: LISTAGEM_TOTAL_MODO). "
+        "`estimado` lê só os contadores diários; `omitido` não conta.",
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
     service = AbastecimentoService(db)
-    items, total = await service.list_abastecimentos(
-        page=page,
-        size=size,
-        tipo_combustivel=tipo_combustivel,
-        data_inicio=data_inicio,
-        data_fim=data_fim,
-    )
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": (total + size - 1) // size,
-    }
\ No newline at end of file
+    if cursor is not None:
+        try:
+            pagina = await service.list_abastecimentos_cursor(
+                size=size,
+                tipo_combustivel=tipo_combustivel,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+    else:
+        pagina = await service.list_abastecimentos(
+            page=page,
+            size=size,
+            tipo_combustivel=tipo_combustivel,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            modo_total=total,
+        )
+
+    return Response(content=pagina, media_type="application/json")
@@ -1,10 +1,10 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, status
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.database import get_db
+from app.core.prontidao import prontidao
+from app.database import monitor_saude
 
 router = APIRouter(tags=["Health"])
 
@@ -15,28 +15,51 @@ router = APIRouter(tags=["Health"])
     summary="Health check",
     response_description="Status da API e seus componentes",
 )
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check():
     """
     Verifica saúde da API e conectividade com banco de dados.
-    
+
+    Não abre conexão: devolve o resultado da última verificação feita em
+    segundo plano (conexão dedicada, fora do pool) e a ocupação do pool.
+
     Retorna:
     - status: Estado geral (healthy/degraded)
     - version: Versão da aplicação
-    - timestamp: Momento da verificação (UTC)
-    - services: Status de cada serviço
+    - timestamp: Momento da resposta (UTC)
+    - services: Status de cada serviço (database: healthy/unhealthy/unknown)
+    - verificacao: Momento, idade e latência da última verificação do banco
+    - pool: Ocupação do pool de conexões das requisições
     """
-    db_status = "healthy"
-    
-    try:
-        await db.execute(text("SELECT 1"))
-    except Exception:
-        db_status = "unhealthy"
-    
+    estado = monitor_saude.estado()
     return {
-        "status": "healthy" if db_status == "healthy" else "degraded",
+        "status": estado["status"],
         "version": settings.api_version,
         "timestamp": datetime.now(timezone.utc).isoformat(),
-        "services": {
-            "database": db_status,
-        },
-    }
\ No newline at end of file
+        "services": estado["services"],
+        "verificacao": estado["verificacao"],
+        "pool": estado["pool"],
+    }
+
+
+@router.get(
+    "/ready",
+    summary="Readiness check",
+    response_description="Se o worker já concluiu o aquecimento",
+)
+async def readiness_check():
+    """
+    Indica se o worker pode receber tráfego (readiness).
+
+    Responde 200 depois do aquecimento da inicialização (agregados em
+    memória, conexões e consultas preparadas) e 503 enquanto ele não
+    termina ou quando o worker está encerrando. Não consulta o banco:
+    /health continua sendo o check de liveness.
+    """
+    estado = prontidao.estado()
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK if prontidao.pronto
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content=estado,
+    )
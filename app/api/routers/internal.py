@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+
+from app.core.buffer_ingestao import buffer_ingestao
+from app.core.cache import cache_respostas
+from app.core.camada_quente import camada_quente
+from app.core.idempotencia import indice_idempotencia
+from app.database import engine, roteador_leitura
+
+router = APIRouter(prefix="/internal", tags=["Internal"], include_in_schema=False)
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Contadores de hit/miss do cache de respostas."""
+    return cache_respostas.estatisticas()
+
+
+@router.get("/ingestao")
+async def ingestao_stats():
+    """Estado do buffer write-behind de ingestão."""
+    return buffer_ingestao.estatisticas()
+
+
+@router.get("/pool")
+async def pool_stats():
+    """Uso do pool de conexões e tempo de espera por uma conexão."""
+    return engine.pool.estatisticas()
+
+
+@router.get("/idempotencia")
+async def idempotencia_stats():
+    """Ocupação do filtro de Bloom e início da janela que ele cobre."""
+    return indice_idempotencia.estatisticas()
+
+
+@router.get("/replicas")
+async def replicas_stats():
+    """Saúde e atraso das réplicas de leitura e leituras roteadas."""
+    return roteador_leitura.estatisticas()
+
+
+@router.get("/camada-quente")
+async def camada_quente_stats():
+    """Linhas e memória da camada quente e início da janela coberta."""
+    return camada_quente.estatisticas()
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metricas import metricas
+
+router = APIRouter(tags=["Métricas"], include_in_schema=False)
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics")
+async def metrics():
+    """Métricas do worker no formato de exposição de texto do Prometheus."""
+    return PlainTextResponse(metricas.expor(), media_type=CONTENT_TYPE_PROMETHEUS)
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from datetime import date
+from typing import Optional
+
+from app.database import get_db
+from app.models.abastecimento import TipoCombustivel
+from app.schemas.posto import EstatisticasDiariasResponse, EstatisticasPostoResponse
+from app.services.posto_service import PostoService
+
+router = APIRouter(prefix="/api/v1/postos", tags=["Postos"])
+
+
+@router.get("/{id_posto}/estatisticas", response_model=EstatisticasPostoResponse)
+async def estatisticas_posto(
+    id_posto: int,
+    tipo_combustivel: Optional[TipoCombustivel] = Query(None),
+    data_inicio: Optional[date] = Query(None, description="Dia inicial (UTC), inclusivo"),
+    data_fim: Optional[date] = Query(None, description="Dia final (UTC), inclusivo"),
+    db: AsyncSession = Depends(get_db),
+):
+    service = PostoService(db)
+    estatisticas = await service.get_estatisticas(
+        id_posto, tipo_combustivel, data_inicio, data_fim
+    )
+
+    if not estatisticas.combustiveis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum abastecimento encontrado para o posto",
+        )
+
+    return estatisticas
+
+
+@router.get(
+    "/{id_posto}/estatisticas/diarias",
+    response_model=EstatisticasDiariasResponse,
+)
+async def estatisticas_diarias_posto(
+    id_posto: int,
+    tipo_combustivel: Optional[TipoCombustivel] = Query(None),
+    data_inicio: Optional[date] = Query(None, description="Dia inicial (UTC), inclusivo"),
+    data_fim: Optional[date] = Query(None, description="Dia final (UTC), inclusivo"),
+    db: AsyncSession = Depends(get_db),
+):
+    service = PostoService(db)
+    estatisticas = await service.get_estatisticas_diarias(
+        id_posto, tipo_combustivel, data_inicio, data_fim
+    )
+
+    if not estatisticas.dias:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum abastecimento encontrado para o posto",
+        )
+
+    return estatisticas
@@ -1,13 +1,111 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
 class Settings(BaseSettings):
     database_url: str = Field(..., env="DATABASE_URL")
-    redis_url: str = Field("redis://localhost:6379/0", env="REDIS_URL")
+    redis_url: Optional[str] = Field(None, env="REDIS_URL")
     api_key: str = Field("your_secret_key", env="API_KEY")
     api_version: str = Field("v1", env="API_VERSION")
 
+    # Réplicas de leitura (URLs separadas por vírgula; vazio = só o primário)
+    database_read_urls: str = Field("", env="DATABASE_READ_URLS")
+    replica_atraso_max_segundos: float = Field(5.0, env="REPLICA_ATRASO_MAX_SEGUNDOS")
+    replica_verificacao_segundos: float = Field(1.0, env="REPLICA_VERIFICACAO_SEGUNDOS")
+
+    # Pool de conexões e cache de prepared statements (asyncpg)
+    db_pool_size: int = Field(5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30.0, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(-1, env="DB_POOL_RECYCLE")  # segundos; -1 = nunca
+    db_pool_pre_ping: bool = Field(False, env="DB_POOL_PRE_PING")
+    # 0 desativa (necessário atrás de PgBouncer em modo transaction)
+    db_statement_cache_size: int = Field(100, env="DB_STATEMENT_CACHE_SIZE")
+
+    # Conexões do pool abertas (e com consultas preparadas) antes de o
+    # worker ficar pronto; limitado a DB_POOL_SIZE, 0 desativa
+    aquecimento_conexoes: int = Field(5, env="AQUECIMENTO_CONEXOES")
+
+    # /health: verificação em segundo plano, em conexão dedicada (fora do pool)
+    saude_verificacao_segundos: float = Field(2.0, env="SAUDE_VERIFICACAO_SEGUNDOS")
+    saude_timeout_segundos: float = Field(2.0, env="SAUDE_TIMEOUT_SEGUNDOS")
+
+    # Ingestão em lote
+    lote_max_itens: int = Field(5000, env="LOTE_MAX_ITENS")
+    lote_tamanho_chunk: int = Field(500, env="LOTE_TAMANHO_CHUNK")
+
+    # Ingestão com buffer write-behind
+    ingestao_modo: str = Field("direto", env="INGESTAO_MODO")  # direto | buffer
+    ingestao_durabilidade: str = Field("aguardar", env="INGESTAO_DURABILIDADE")  # aguardar | aceitar
+    ingestao_buffer_max_lote: int = Field(500, env="INGESTAO_BUFFER_MAX_LOTE")
+    ingestao_buffer_intervalo_ms: int = Field(50, env="INGESTAO_BUFFER_INTERVALO_MS")
+    ingestao_buffer_tamanho_fila: int = Field(10_000, env="INGESTAO_BUFFER_TAMANHO_FILA")
+    ingestao_buffer_timeout_ms: int = Field(100, env="INGESTAO_BUFFER_TIMEOUT_MS")
+    # Espera máxima pela gravação com durabilidade "aguardar" (503 ao expirar)
+    ingestao_buffer_timeout_gravacao_ms: int = Field(
+        5000, env="INGESTAO_BUFFER_TIMEOUT_GRAVACAO_MS"
+    )
+    # Registros aceitos com 202 que falharam na gravação (NDJSON)
+    ingestao_arquivo_rejeitados: str = Field(
+        "ingestao_rejeitados.ndjson", env="INGESTAO_ARQUIVO_REJEITADOS"
+    )
+    # synchronous_commit=off nas criações individuais; fontes também podem
+    # optar por requisição com o header X-Commit: assincrono
+    ingestao_commit_assincrono: bool = Field(False, env="INGESTAO_COMMIT_ASSINCRONO")
+
+    # Total da listagem paginada: exato | estimado | omitido
+    listagem_total_modo: str = Field("exato", env="LISTAGEM_TOTAL_MODO")
+
+    # Idempotência da criação (Idempotency-Key e chave natural)
+    idempotencia_modo: str = Field("bloom", env="IDEMPOTENCIA_MODO")  # bloom | banco | desativado
+    idempotencia_janela_horas: int = Field(72, env="IDEMPOTENCIA_JANELA_HORAS")
+    idempotencia_bloom_capacidade: int = Field(1_000_000, env="IDEMPOTENCIA_BLOOM_CAPACIDADE")
+    idempotencia_bloom_taxa_fp: float = Field(0.01, env="IDEMPOTENCIA_BLOOM_TAXA_FP")
+    idempotencia_expurgo_segundos: int = Field(3600, env="IDEMPOTENCIA_EXPURGO_SEGUNDOS")
+
+    # Histórico do motorista
+    historico_yield_per: int = Field(500, env="HISTORICO_YIELD_PER")
+
+    # Exportação em streaming
+    exportacao_yield_per: int = Field(2000, env="EXPORTACAO_YIELD_PER")
+
+    # Particionamento mensal de abastecimentos
+    particoes_meses_futuros: int = Field(3, env="PARTICOES_MESES_FUTUROS")
+    particoes_retencao_meses: int = Field(0, env="PARTICOES_RETENCAO_MESES")  # 0 = sem expurgo
+    particoes_modo_expurgo: str = Field("detach", env="PARTICOES_MODO_EXPURGO")  # detach | drop
+
+    # Cache de respostas (listagem e histórico)
+    # memoria | redis | desativado; sem valor: redis se REDIS_URL estiver configurada
+    cache_backend: Optional[str] = Field(None, env="CACHE_BACKEND")
+    cache_ttl_segundos: int = Field(30, env="CACHE_TTL_SEGUNDOS")
+    cache_max_itens: int = Field(10_000, env="CACHE_MAX_ITENS")
+
+    # Média de preço em memória
+    media_preco_modo: str = Field("acumulada", env="MEDIA_PRECO_MODO")  # acumulada | ewma
+    media_preco_alpha: float = Field(0.01, env="MEDIA_PRECO_ALPHA")
+    media_preco_reconciliacao_segundos: int = Field(
+        300, env="MEDIA_PRECO_RECONCILIACAO_SEGUNDOS"
+    )
+
+    # Detector de anomalias por posto (EWMA + t-digest)
+    anomalia_modo: str = Field("estatistico", env="ANOMALIA_MODO")  # estatistico | limiar
+    anomalia_alpha: float = Field(0.05, env="ANOMALIA_ALPHA")
+    anomalia_quantil: float = Field(0.99, env="ANOMALIA_QUANTIL")
+    anomalia_z: float = Field(3.0, env="ANOMALIA_Z")
+    anomalia_margem_minima: float = Field(0.05, env="ANOMALIA_MARGEM_MINIMA")
+    anomalia_min_amostras: int = Field(50, env="ANOMALIA_MIN_AMOSTRAS")
+    anomalia_compressao: int = Field(100, env="ANOMALIA_COMPRESSAO")
+    anomalia_snapshot_segundos: int = Field(60, env="ANOMALIA_SNAPSHOT_SEGUNDOS")
+
+    # Camada quente (colunas NumPy da janela recente; 0 desativa)
+    camada_quente_janela_horas: int = Field(720, env="CAMADA_QUENTE_JANELA_HORAS")
+    camada_quente_expurgo_segundos: int = Field(60, env="CAMADA_QUENTE_EXPURGO_SEGUNDOS")
+    # Recarga completa a partir do banco (inserções de outros workers e da
+    # importação); 0 = nunca, só para um único worker sem importações
+    camada_quente_recarga_segundos: int = Field(300, env="CAMADA_QUENTE_RECARGA_SEGUNDOS")
+
     class Config:
         env_file = ".env"
         extra = "ignore"
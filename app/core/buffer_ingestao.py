@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import os
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Recebe os valores e as Idempotency-Keys (None quando ausente) do lote
+Persistir = Callable[[List[dict], List[Optional[str]]], Awaitable[Sequence[Any]]]
+
+Item = Tuple[dict, Optional[str], Optional[asyncio.Future]]
+
+_FIM = object()
+
+# Falhas causadas pelos próprios registros: só essas justificam regravar o
+# lote um a um. Conexão, timeout e OperationalError afetam o lote inteiro.
+ERROS_DE_DADOS = (IntegrityError, DataError)
+
+
+def _json_padrao(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError
+
+
+def gravar_rejeitados(caminho: str, itens: List[Tuple[dict, str]]) -> None:
+    """
+    Acrescenta registros não gravados ao arquivo de rejeitados (NDJSON, um
+    abastecimento por linha com o erro em "erro") e faz fsync.
+
+    O formato é o da importação histórica: o arquivo pode ser reprocessado
+    com scripts/importar_abastecimentos.py depois de corrigida a causa.
+    """
+    with open(caminho, "ab") as arquivo:
+        for valores, erro in itens:
+            arquivo.write(
+                orjson.dumps(
+                    {**valores, "erro": erro},
+                    default=_json_padrao,
+                    option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE,
+                )
+            )
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+
+class BufferCheio(Exception):
+    """A fila de ingestão não liberou espaço dentro do tempo limite."""
+
+
+class BufferIndisponivel(Exception):
+    """O buffer não está aceitando registros (parado ou encerrando)."""
+
+
+class BufferTimeout(Exception):
+    """
+    A gravação não terminou dentro do tempo limite. O registro continua na
+    fila e ainda pode ser gravado; um reenvio é deduplicado pela chave
+    natural.
+    """
+
+
+class BufferIngestao:
+    """
+    Buffer write-behind para abastecimentos.
+
+    As requisições apenas enfileiram os valores já validados e pontuados;
+    uma única tarefa em segundo plano grava a fila em INSERTs multi-linha
+    a cada `intervalo_ms` ou quando acumula `max_lote` registros. Assim a
+    requisição não segura uma conexão do pool enquanto espera o commit.
+
+    Se um lote falha por erro de dados (IntegrityError, DataError), os
+    registros são regravados um a um: só quem causou a falha recebe o erro.
+    Qualquer outra falha (banco fora, pool esgotado) derruba o lote inteiro
+    de uma vez, sem multiplicar tentativas. Registros já aceitos com 202
+    (sem ninguém aguardando) que falham vão para `arquivo_rejeitados`.
+    """
+
+    def __init__(
+        self,
+        max_lote: int = 500,
+        intervalo_ms: int = 50,
+        tamanho_fila: int = 10_000,
+        timeout_enfileirar_ms: int = 100,
+        timeout_gravacao_ms: int = 5000,
+        arquivo_rejeitados: str = "ingestao_rejeitados.ndjson",
+    ):
+        self.max_lote = max_lote
+        self.intervalo = intervalo_ms / 1000
+        self.tamanho_fila = tamanho_fila
+        self.timeout_enfileirar = timeout_enfileirar_ms / 1000
+        self.timeout_gravacao = timeout_gravacao_ms / 1000
+        self.arquivo_rejeitados = arquivo_rejeitados
+
+        self.gravados = 0
+        self.falhas = 0
+        self.rejeitados = 0
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._persistir: Optional[Persistir] = None
+        self._aceitando = False
+
+    @property
+    def ativo(self) -> bool:
+        return self._aceitando
+
+    def pendentes(self) -> int:
+        return self._fila.qsize() if self._fila else 0
+
+    def iniciar(self, persistir: Persistir) -> None:
+        """Inicia a tarefa de gravação; deve ser chamado dentro do event loop."""
+        self._persistir = persistir
+        self._fila = asyncio.Queue(maxsize=self.tamanho_fila)
+        self._aceitando = True
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        """Para de aceitar registros e grava tudo o que ainda está na fila."""
+        if self._tarefa is None:
+            return
+
+        self._aceitando = False
+        await self._fila.put(_FIM)
+        await self._tarefa
+        self._tarefa = None
+
+    async def enfileirar(
+        self,
+        valores: dict,
+        aguardar: bool = True,
+        chave_idempotencia: Optional[str] = None,
+    ) -> Optional[Any]:
+        """
+        Coloca um registro na fila.
+
+        Args:
+            valores: Colunas do abastecimento a inserir
+            chave_idempotencia: Idempotency-Key, gravada na mesma transação
+            aguardar: Se True, espera a gravação e retorna o registro criado;
+                se False, retorna None assim que o registro entra na fila
+
+        Raises:
+            BufferIndisponivel: Se o buffer não está ativo
+            BufferCheio: Se a fila continuar cheia após o tempo limite
+            BufferTimeout: Se a gravação não terminar em `timeout_gravacao`
+        """
+        if not self._aceitando:
+            raise BufferIndisponivel()
+
+        futuro = asyncio.get_running_loop().create_future() if aguardar else None
+
+        try:
+            await asyncio.wait_for(
+                self._fila.put((valores, chave_idempotencia, futuro)), self.timeout_enfileirar
+            )
+        except asyncio.TimeoutError:
+            raise BufferCheio()
+
+        if futuro is None:
+            return None
+        try:
+            return await asyncio.wait_for(futuro, self.timeout_gravacao)
+        except asyncio.TimeoutError:
+            raise BufferTimeout()
+
+    async def _executar(self) -> None:
+        loop = asyncio.get_running_loop()
+        encerrar = False
+
+        while not encerrar:
+            item = await self._fila.get()
+            if item is _FIM:
+                break
+
+            lote: List[Item] = [item]
+            prazo = loop.time() + self.intervalo
+
+            while len(lote) < self.max_lote:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                if item is _FIM:
+                    encerrar = True
+                    break
+                lote.append(item)
+
+            await self._gravar(lote)
+
+    async def _gravar(self, lote: List[Item]) -> None:
+        try:
+            criados = await self._persistir(
+                [valores for valores, _, _ in lote],
+                [chave for _, chave, _ in lote],
+            )
+        except ERROS_DE_DADOS as e:
+            if len(lote) == 1:
+                await self._falhar(lote, e)
+                return
+            logger.warning(
+                "Falha ao gravar lote de %d abastecimentos; regravando um a um",
+                len(lote),
+                exc_info=True,
+            )
+            for item in lote:
+                await self._gravar([item])
+            return
+        except Exception as e:
+            await self._falhar(lote, e)
+            return
+
+        self.gravados += len(criados)
+        for (_, _, futuro), criado in zip(lote, criados):
+            if futuro is not None and not futuro.done():
+                futuro.set_result(criado)
+
+    async def _falhar(self, lote: List[Item], erro: Exception) -> None:
+        """Entrega o erro a quem aguarda; sem ninguém aguardando, rejeita."""
+        self.falhas += len(lote)
+        logger.error("Falha ao gravar abastecimento: %s", erro, exc_info=erro)
+
+        sem_espera = []
+        for valores, _, futuro in lote:
+            if futuro is None:
+                sem_espera.append((valores, f"{type(erro).__name__}: {erro}"))
+            elif not futuro.done():
+                futuro.set_exception(erro)
+
+        if not sem_espera:
+            return
+        try:
+            await asyncio.to_thread(
+                gravar_rejeitados, self.arquivo_rejeitados, sem_espera
+            )
+        except Exception:
+            # Último recurso: os valores ficam no log
+            logger.exception(
+                "Falha ao gravar rejeitados em %s: %r",
+                self.arquivo_rejeitados,
+                [valores for valores, _ in sem_espera],
+            )
+            return
+        self.rejeitados += len(sem_espera)
+
+    def estatisticas(self) -> dict:
+        return {
+            "ativo": self.ativo,
+            "pendentes": self.pendentes(),
+            "gravados": self.gravados,
+            "falhas": self.falhas,
+            "rejeitados": self.rejeitados,
+            "arquivo_rejeitados": self.arquivo_rejeitados,
+        }
+
+
+buffer_ingestao = BufferIngestao(
+    max_lote=settings.ingestao_buffer_max_lote,
+    intervalo_ms=settings.ingestao_buffer_intervalo_ms,
+    tamanho_fila=settings.ingestao_buffer_tamanho_fila,
+    timeout_enfileirar_ms=settings.ingestao_buffer_timeout_ms,
+    timeout_gravacao_ms=settings.ingestao_buffer_timeout_gravacao_ms,
+    arquivo_rejeitados=settings.ingestao_arquivo_rejeitados,
+)
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL_PADRAO = "redis://localhost:6379/0"
+
+
+class CacheBackend(Protocol):
+    """Operações mínimas que um backend de cache precisa oferecer."""
+
+    nome: str
+
+    async def get(self, chave: str) -> Optional[bytes]: ...
+
+    async def set(self, chave: str, valor: bytes, ttl: int) -> None: ...
+
+    async def incr(self, chave: str) -> int: ...
+
+
+class MemoriaLRUBackend:
+    """
+    Cache LRU em processo, com TTL por entrada.
+
+    A invalidação só vale para o próprio processo: com vários workers, os
+    outros seguem servindo respostas antigas até o TTL. Nesse caso use o
+    RedisBackend.
+    """
+
+    nome = "memoria"
+
+    def __init__(self, max_itens: int = 10_000):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, chave: str) -> Optional[bytes]:
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+
+        expira_em, valor = item
+        if expira_em < time.monotonic():
+            del self._itens[chave]
+            return None
+
+        self._itens.move_to_end(chave)
+        return valor
+
+    async def set(self, chave: str, valor: bytes, ttl: int) -> None:
+        self._itens[chave] = (time.monotonic() + ttl, valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    async def incr(self, chave: str) -> int:
+        atual = await self.get(chave)
+        novo = int(atual or 0) + 1
+        # Contadores de versão não expiram por tempo, só por LRU
+        self._itens[chave] = (float("inf"), str(novo).encode())
+        self._itens.move_to_end(chave)
+        return novo
+
+
+class RedisBackend:
+    """Cache compartilhado entre workers via Redis (redis.asyncio)."""
+
+    nome = "redis"
+
+    def __init__(self, url: Optional[str] = None, client: Any = None):
+        if client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError as e:  # pragma: no cover - depende do ambiente
+                raise RuntimeError(
+                    "CACHE_BACKEND=redis requer o pacote 'redis'"
+                ) from e
+            client = redis_asyncio.from_url(url)
+        self.client = client
+
+    async def get(self, chave: str) -> Optional[bytes]:
+        return await self.client.get(chave)
+
+    async def set(self, chave: str, valor: bytes, ttl: int) -> None:
+        await self.client.set(chave, valor, ex=ttl)
+
+    async def incr(self, chave: str) -> int:
+        return int(await self.client.incr(chave))
+
+
+class CacheRespostas:
+    """
+    Cache read-through de respostas serializadas.
+
+    As chaves carregam a versão do seu namespace (ex.: o histórico de um
+    CPF); invalidar é apenas incrementar essa versão, de modo que entradas
+    antigas deixam de ser lidas e expiram pelo TTL. Mesmo que um contador
+    de versão seja perdido (eviction), uma resposta velha nunca é servida
+    por mais que o TTL.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: int = 30):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.erros = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.backend is not None
+
+    async def _versao(self, namespace: str) -> bytes:
+        return await self.backend.get(f"v:{namespace}") or b"0"
+
+    @staticmethod
+    def _resumo(parametros: Dict[str, Any]) -> str:
+        bruto = json.dumps(parametros, sort_keys=True, default=str)
+        return hashlib.sha1(bruto.encode()).hexdigest()
+
+    async def obter_ou_carregar(
+        self,
+        namespace: str,
+        parametros: Dict[str, Any],
+        carregar: Callable[[], Awaitable[bytes]],
+        guardar: bool = True,
+    ) -> bytes:
+        """
+        Retorna a resposta em cache ou executa `carregar` e guarda o resultado.
+
+        As respostas já são JSON serializado: um hit devolve os bytes
+        guardados sem nenhuma decodificação. Com `guardar=False` (leitura
+        de uma réplica possivelmente atrasada) o cache só é lido.
+
+        Falhas do backend nunca derrubam a requisição: a resposta é carregada
+        do banco e o erro é contabilizado.
+        """
+        if not self.ativo:
+            return await carregar()
+
+        try:
+            versao = await self._versao(namespace)
+            chave = f"c:{namespace}:{versao.decode()}:{self._resumo(parametros)}"
+            valor = await self.backend.get(chave)
+        except Exception:
+            logger.exception("Falha ao ler do cache")
+            self.erros += 1
+            return await carregar()
+
+        if valor is not None:
+            self.hits += 1
+            return valor
+
+        self.misses += 1
+        resposta = await carregar()
+        if not guardar:
+            return resposta
+
+        try:
+            await self.backend.set(chave, resposta, self.ttl)
+        except Exception:
+            logger.exception("Falha ao gravar no cache")
+            self.erros += 1
+
+        return resposta
+
+    async def invalidar(self, *namespaces: str) -> None:
+        """Invalida todas as respostas dos namespaces informados."""
+        if not self.ativo:
+            return
+
+        for namespace in namespaces:
+            try:
+                await self.backend.incr(f"v:{namespace}")
+            except Exception:
+                logger.exception("Falha ao invalidar o cache")
+                self.erros += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.nome if self.backend else "desativado",
+            "hits": self.hits,
+            "misses": self.misses,
+            "erros": self.erros,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+def namespace_historico(cpf_motorista: str) -> str:
+    return f"historico:{cpf_motorista}"
+
+
+def namespace_lista(tipo_combustivel: Optional[str]) -> str:
+    """
+    Namespace das listagens: uma versão por combustível e outra ("*") para
+    as listagens sem filtro, afetadas por qualquer novo abastecimento.
+    """
+    tipo = getattr(tipo_combustivel, "value", tipo_combustivel)
+    return f"lista:{tipo or '*'}"
+
+
+def criar_backend(nome: Optional[str]) -> Optional[CacheBackend]:
+    # Sem CACHE_BACKEND: Redis quando REDIS_URL está configurada (invalidação
+    # compartilhada entre workers), senão memória
+    if nome is None:
+        nome = "redis" if settings.redis_url else "memoria"
+
+    if nome == "desativado":
+        return None
+    if nome == "memoria":
+        return MemoriaLRUBackend(max_itens=settings.cache_max_itens)
+    if nome == "redis":
+        return RedisBackend(url=settings.redis_url or REDIS_URL_PADRAO)
+    raise ValueError(f"Backend de cache desconhecido: {nome}")
+
+
+cache_respostas = CacheRespostas(
+    backend=criar_backend(settings.cache_backend),
+    ttl=settings.cache_ttl_segundos,
+)
@@ -0,0 +1,304 @@
+"""
+Camada quente: os abastecimentos recentes em colunas NumPy, em memória.
+
+Guarda data_hora, combustível, preço, volume, posto e a flag de anomalia
+da janela recente (CAMADA_QUENTE_JANELA_HORAS) em arrays contíguos. As
+séries agregadas por intervalo de tempo são calculadas com group-by
+vetorizado sobre esses arrays, sem varrer abastecimentos no banco.
+
+O estado é carregado na inicialização, recebe cada abastecimento gravado
+por este processo e descarta periodicamente o que sai da janela. Como o
+filtro de Bloom, cada worker só enxerga as próprias inserções: a recarga
+periódica a partir do banco (CAMADA_QUENTE_RECARGA_SEGUNDOS) traz as de
+outros workers e da importação, e se ela parar de acontecer as séries
+voltam para o banco.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.models.abastecimento import TipoCombustivel
+from app.utils.datas import para_utc
+
+TIPOS = tuple(TipoCombustivel)
+CODIGOS = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICRO = timedelta(microseconds=1)
+
+# Coluna -> dtype; id é -1 quando desconhecido (registros vindos do COPY)
+COLUNAS = {
+    "id": np.int64,
+    "tempo": np.int64,  # data_hora em microssegundos desde a época (UTC)
+    "combustivel": np.int8,
+    "preco": np.float64,
+    "volume": np.float64,
+    "posto": np.int32,
+    "anomalo": np.bool_,
+}
+
+
+def para_micros(valor: datetime) -> int:
+    return (para_utc(valor) - _EPOCA) // _MICRO
+
+
+def de_micros(valor: int) -> datetime:
+    return _EPOCA + timedelta(microseconds=int(valor))
+
+
+class Colunas:
+    """Arrays de tamanho fixo com crescimento geométrico (append amortizado)."""
+
+    def __init__(self, capacidade: int = 1024):
+        self.tamanho = 0
+        self._arrays = {
+            nome: np.empty(capacidade, dtype=dtype) for nome, dtype in COLUNAS.items()
+        }
+
+    @property
+    def capacidade(self) -> int:
+        return len(self._arrays["tempo"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def __len__(self) -> int:
+        return self.tamanho
+
+    def __getitem__(self, nome: str) -> np.ndarray:
+        return self._arrays[nome][:self.tamanho]
+
+    def anexar(self, linhas: List[tuple]) -> None:
+        """Acrescenta tuplas na ordem de COLUNAS."""
+        if not linhas:
+            return
+
+        necessario = self.tamanho + len(linhas)
+        if necessario > self.capacidade:
+            capacidade = max(necessario, self.capacidade * 2)
+            for nome, array in self._arrays.items():
+                novo = np.empty(capacidade, dtype=array.dtype)
+                novo[:self.tamanho] = array[:self.tamanho]
+                self._arrays[nome] = novo
+
+        fatia = slice(self.tamanho, necessario)
+        for nome, valores in zip(COLUNAS, zip(*linhas)):
+            self._arrays[nome][fatia] = valores
+        self.tamanho = necessario
+
+    def filtrar(self, manter: np.ndarray) -> None:
+        """Compacta os arrays mantendo só as linhas marcadas."""
+        quantidade = int(manter.sum())
+        for nome, array in self._arrays.items():
+            array[:quantidade] = array[:self.tamanho][manter]
+        self.tamanho = quantidade
+
+
+def _linha(abastecimento: Any) -> tuple:
+    return (
+        -1 if getattr(abastecimento, "id", None) is None else abastecimento.id,
+        para_micros(abastecimento.data_hora),
+        CODIGOS[TipoCombustivel(abastecimento.tipo_combustivel)],
+        float(abastecimento.preco_por_litro),
+        float(abastecimento.volume_abastecido),
+        abastecimento.id_posto,
+        bool(abastecimento.improper_data),
+    )
+
+
+class CamadaQuente:
+    """
+    Janela recente de abastecimentos em colunas NumPy.
+
+    Só responde por intervalos que começam em `cobertura_desde` ou depois
+    (`cobre`); antes da carga, ou para intervalos mais antigos, o chamador
+    consulta o banco. Durante uma carga os registros novos ficam pendentes
+    e entram ao final, sem duplicar o que a carga já trouxe.
+
+    Com `recarga_segundos`, a camada deixa de responder (`defasada`) se a
+    última carga concluída tiver mais de duas recargas: sem ela, não há
+    como garantir que as inserções de outros processos estão presentes.
+    """
+
+    def __init__(self, janela_horas: int = 720, recarga_segundos: int = 0):
+        self.janela = timedelta(hours=janela_horas)
+        self.recarga = recarga_segundos
+        self.colunas = Colunas()
+        self.cobertura_desde: Optional[datetime] = None
+        self.carregada_em: Optional[float] = None  # time.monotonic()
+        self._carga: Optional[Colunas] = None
+        self._inicio_carga: Optional[float] = None
+        self._pendentes: List[tuple] = []
+
+    @property
+    def ativo(self) -> bool:
+        return self.janela > timedelta(0)
+
+    def inicio_janela(self, agora: Optional[datetime] = None) -> datetime:
+        return (agora or datetime.now(timezone.utc)) - self.janela
+
+    def defasada(self, agora: Optional[float] = None) -> bool:
+        """Com recarga periódica, se a última carga não é mais recente."""
+        if not self.recarga or self.carregada_em is None:
+            return False
+        return (agora or time.monotonic()) - self.carregada_em > 2 * self.recarga
+
+    def cobre(self, inicio: datetime) -> bool:
+        return (
+            self.ativo
+            and self.cobertura_desde is not None
+            and para_utc(inicio) >= self.cobertura_desde
+            and not self.defasada()
+        )
+
+    def registrar(self, abastecimento: Any) -> None:
+        """Acrescenta um abastecimento recém-gravado (ignora os fora da janela)."""
+        if not self.ativo:
+            return
+
+        linha = _linha(abastecimento)
+        if self._carga is not None:
+            self._pendentes.append(linha)
+        elif self.cobertura_desde is not None and linha[1] >= para_micros(
+            self.cobertura_desde
+        ):
+            self.colunas.anexar([linha])
+
+    def iniciar_carga(self) -> None:
+        self._carga = Colunas(max(self.colunas.capacidade, 1024))
+        self._inicio_carga = time.monotonic()
+        self._pendentes = []
+
+    def carregar(self, linhas: Iterable) -> None:
+        """
+        Acrescenta à carga em andamento linhas do banco (id, data_hora,
+        tipo_combustivel, preco_por_litro, volume_abastecido, id_posto,
+        improper_data).
+        """
+        self._carga.anexar([_linha(linha) for linha in linhas])
+
+    def concluir_carga(self, desde: datetime) -> None:
+        """Troca o estado pela carga, que cobre data_hora >= `desde`."""
+        carga, pendentes = self._carga, self._pendentes
+        self._carga, self._pendentes = None, []
+
+        if pendentes:
+            corte = para_micros(desde)
+            ids = np.array([linha[0] for linha in pendentes], dtype=np.int64)
+            repetidos = (ids >= 0) & np.isin(ids, carga["id"])
+            carga.anexar([
+                linha
+                for linha, repetido in zip(pendentes, repetidos)
+                if not repetido and linha[1] >= corte
+            ])
+
+        self.colunas = carga
+        self.cobertura_desde = para_utc(desde)
+        # O que outros processos gravaram depois do início da carga ficou
+        # de fora: a defasagem conta a partir daí
+        self.carregada_em = self._inicio_carga
+
+    def abortar_carga(self) -> None:
+        """Descarta a carga; os pendentes voltam para o estado atual."""
+        pendentes = self._pendentes
+        self._carga, self._pendentes = None, []
+        for linha in pendentes:
+            if self.cobertura_desde is not None and linha[1] >= para_micros(
+                self.cobertura_desde
+            ):
+                self.colunas.anexar([linha])
+
+    def expurgar(self, agora: Optional[datetime] = None) -> int:
+        """Descarta o que saiu da janela; retorna quantas linhas saíram."""
+        if self.cobertura_desde is None:
+            return 0
+
+        inicio = self.inicio_janela(agora)
+        antes = len(self.colunas)
+        self.colunas.filtrar(self.colunas["tempo"] >= para_micros(inicio))
+        self.cobertura_desde = max(self.cobertura_desde, inicio)
+        return antes - len(self.colunas)
+
+    def series(
+        self,
+        inicio: datetime,
+        fim: datetime,
+        intervalo_segundos: int,
+        tipo_combustivel: Optional[TipoCombustivel] = None,
+        id_posto: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Agrega [inicio, fim) em baldes de `intervalo_segundos` (alinhados à
+        época, em UTC) por combustível, em ordem de balde e combustível.
+        """
+        colunas = self.colunas
+        tempo = colunas["tempo"]
+        filtro = (tempo >= para_micros(inicio)) & (tempo < para_micros(fim))
+        if tipo_combustivel is not None:
+            filtro &= colunas["combustivel"] == CODIGOS[tipo_combustivel]
+        if id_posto is not None:
+            filtro &= colunas["posto"] == id_posto
+
+        passo = intervalo_segundos * 1_000_000
+        combustivel = colunas["combustivel"][filtro].astype(np.int64)
+        chave = (tempo[filtro] // passo) * len(TIPOS) + combustivel
+        if not len(chave):
+            return []
+
+        # Group-by: ordena pela chave (balde, combustível) e reduz cada fatia
+        ordem = np.argsort(chave, kind="stable")
+        chave = chave[ordem]
+        inicios = np.flatnonzero(np.r_[True, chave[1:] != chave[:-1]])
+        quantidade = np.diff(np.r_[inicios, len(chave)])
+
+        preco = colunas["preco"][filtro][ordem]
+        volume = colunas["volume"][filtro][ordem]
+        anomalo = colunas["anomalo"][filtro][ordem].astype(np.int64)
+
+        soma_preco = np.add.reduceat(preco, inicios)
+        preco_minimo = np.minimum.reduceat(preco, inicios)
+        preco_maximo = np.maximum.reduceat(preco, inicios)
+        volume_total = np.add.reduceat(volume, inicios)
+        anomalias = np.add.reduceat(anomalo, inicios)
+        baldes, codigos = np.divmod(chave[inicios], len(TIPOS))
+
+        return [
+            {
+                "inicio": de_micros(baldes[i] * passo),
+                "tipo_combustivel": TIPOS[codigos[i]],
+                "total_abastecimentos": int(quantidade[i]),
+                "preco_medio": round(float(soma_preco[i] / quantidade[i]), 3),
+                "preco_min": round(float(preco_minimo[i]), 3),
+                "preco_max": round(float(preco_maximo[i]), 3),
+                "litros_vendidos": round(float(volume_total[i]), 2),
+                "quantidade_anomalias": int(anomalias[i]),
+            }
+            for i in range(len(inicios))
+        ]
+
+    def estatisticas(self) -> dict:
+        return {
+            "janela_horas": self.janela.total_seconds() / 3600,
+            "linhas": len(self.colunas),
+            "capacidade": self.colunas.capacidade,
+            "bytes": self.colunas.nbytes,
+            "cobertura_desde": self.cobertura_desde,
+            "carregando": self._carga is not None,
+            "recarga_segundos": self.recarga,
+            "segundos_desde_carga": (
+                None
+                if self.carregada_em is None
+                else round(time.monotonic() - self.carregada_em, 1)
+            ),
+            "defasada": self.defasada(),
+        }
+
+
+camada_quente = CamadaQuente(
+    janela_horas=settings.camada_quente_janela_horas,
+    recarga_segundos=settings.camada_quente_recarga_segundos,
+)
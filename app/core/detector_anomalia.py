@@ -0,0 +1,354 @@
+import math
+from decimal import Decimal
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.models.abastecimento import TipoCombustivel
+
+Chave = Tuple[int, TipoCombustivel]
+
+
+class TDigest:
+    """
+    Sketch de quantis t-digest (variante "merging").
+
+    Os pontos novos vão para um buffer e são fundidos aos centróides quando
+    ele enche. Cada centróide cobre no máximo uma unidade da escala
+    k(q) = compressão/(2π)·asin(2q-1): centróides pequenos nas caudas (onde
+    ficam os limites de anomalia) e no máximo ~compressão centróides.
+    """
+
+    def __init__(self, compressao: int = 100):
+        self.compressao = compressao
+        self.centroides: List[List[float]] = []  # [média, peso], ordenados
+        self.total = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self._buffer: List[float] = []
+
+    def adicionar(self, valor: float) -> bool:
+        """Adiciona um ponto; retorna True se o buffer foi fundido agora."""
+        self._buffer.append(valor)
+        self.total += 1
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+        if len(self._buffer) >= 5 * self.compressao:
+            self.comprimir()
+            return True
+        return False
+
+    def _limite_q(self, q: float) -> float:
+        """Maior quantil que um centróide iniciado em `q` pode alcançar."""
+        k = self.compressao / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compressao / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compressao) + 1) / 2
+
+    def comprimir(self) -> None:
+        if not self._buffer:
+            return
+
+        pontos = self.centroides + [[valor, 1.0] for valor in self._buffer]
+        self._buffer = []
+        self._fundir(pontos)
+
+    def mesclar(self, outro: "TDigest") -> None:
+        """Incorpora os centróides de outro digest (soma das distribuições)."""
+        if not outro.total:
+            return
+        outro.comprimir()
+        self.total += outro.total
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._fundir(
+            self.centroides
+            + [[valor, 1.0] for valor in self._buffer]
+            + [list(c) for c in outro.centroides]
+        )
+        self._buffer = []
+
+    def _fundir(self, pontos: List[List[float]]) -> None:
+        pontos = sorted(pontos)
+        fundidos: List[List[float]] = []
+        acumulado = 0.0
+        limite = self._limite_q(0.0)
+        media, peso = pontos[0]
+
+        for media_ponto, peso_ponto in pontos[1:]:
+            proposto = peso + peso_ponto
+            if (acumulado + proposto) / self.total <= limite:
+                media += (media_ponto - media) * peso_ponto / proposto
+                peso = proposto
+            else:
+                fundidos.append([media, peso])
+                acumulado += peso
+                limite = self._limite_q(acumulado / self.total)
+                media, peso = media_ponto, peso_ponto
+
+        fundidos.append([media, peso])
+        self.centroides = fundidos
+
+    def quantil(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+        self.comprimir()
+
+        alvo = q * self.total
+        acumulado = 0.0
+        anterior_centro, anterior_media = 0.0, self.minimo
+
+        for media, peso in self.centroides:
+            centro = acumulado + peso / 2
+            if alvo <= centro:
+                if centro == anterior_centro:
+                    return media
+                fracao = (alvo - anterior_centro) / (centro - anterior_centro)
+                return anterior_media + fracao * (media - anterior_media)
+            acumulado += peso
+            anterior_centro, anterior_media = centro, media
+
+        if self.total == anterior_centro:
+            return self.maximo
+        fracao = (alvo - anterior_centro) / (self.total - anterior_centro)
+        return anterior_media + fracao * (self.maximo - anterior_media)
+
+    def para_dict(self) -> dict:
+        self.comprimir()
+        return {
+            "centroides": self.centroides,
+            "total": self.total,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict, compressao: int = 100) -> "TDigest":
+        digest = cls(compressao)
+        digest.centroides = [list(c) for c in dados["centroides"]]
+        digest.total = float(dados["total"])
+        digest.minimo = float(dados["minimo"])
+        digest.maximo = float(dados["maximo"])
+        return digest
+
+
+class EstatisticaPreco:
+    """Média e variância exponenciais (EWMA) mais o t-digest de um posto."""
+
+    __slots__ = ("quantidade", "media", "variancia", "digest", "_limite_quantil")
+
+    def __init__(self, compressao: int):
+        self.quantidade = 0
+        self.media = 0.0
+        self.variancia = 0.0
+        self.digest = TDigest(compressao)
+        self._limite_quantil: Optional[float] = None
+
+    @classmethod
+    def de_linha(cls, linha: Any, compressao: int) -> "EstatisticaPreco":
+        """Reconstrói a partir de uma linha de snapshot (objeto ou dict)."""
+        valor = linha.get if isinstance(linha, dict) else partial(getattr, linha)
+        estatistica = cls(compressao)
+        estatistica.quantidade = valor("quantidade")
+        estatistica.media = valor("media")
+        estatistica.variancia = valor("variancia")
+        estatistica.digest = TDigest.de_dict(valor("digest"), compressao)
+        return estatistica
+
+    def para_linha(self, chave: Chave) -> dict:
+        id_posto, tipo = chave
+        return {
+            "id_posto": id_posto,
+            "tipo_combustivel": tipo,
+            "quantidade": self.quantidade,
+            "media": self.media,
+            "variancia": self.variancia,
+            "digest": self.digest.para_dict(),
+        }
+
+    def registrar(self, preco: float, alpha: float) -> None:
+        if self.quantidade == 0:
+            self.media = preco
+        else:
+            diferenca = preco - self.media
+            incremento = alpha * diferenca
+            self.media += incremento
+            self.variancia = (1 - alpha) * (self.variancia + diferenca * incremento)
+
+        self.quantidade += 1
+        if self.digest.adicionar(preco):
+            self._limite_quantil = None
+
+    def mesclar(self, posterior: "EstatisticaPreco", alpha: float) -> None:
+        """
+        Incorpora pontos registrados depois dos desta estatística.
+
+        Após n pontos novos a EWMA dá peso (1 - alpha)^n ao estado anterior;
+        com n = 1 o resultado é exatamente o de `registrar`.
+        """
+        if posterior.quantidade == 0:
+            return
+        if self.quantidade == 0:
+            self.media, self.variancia = posterior.media, posterior.variancia
+        else:
+            peso = 1 - (1 - alpha) ** posterior.quantidade
+            diferenca = posterior.media - self.media
+            self.variancia = (
+                (1 - peso) * self.variancia
+                + peso * posterior.variancia
+                + peso * (1 - peso) * diferenca * diferenca
+            )
+            self.media += peso * diferenca
+
+        self.quantidade += posterior.quantidade
+        self.digest.mesclar(posterior.digest)
+        self._limite_quantil = None
+
+    def limite_quantil(self, q: float) -> float:
+        # Recalculado só quando o buffer do digest é fundido: a consulta no
+        # caminho da requisição é O(1) amortizado
+        if self._limite_quantil is None:
+            self._limite_quantil = self.digest.quantil(q)
+        return self._limite_quantil
+
+
+class DetectorAnomalia:
+    """
+    Pontuação de anomalia por (posto, combustível).
+
+    Um preço é anômalo quando supera, ao mesmo tempo, o quantil `quantil`
+    do histórico do posto, a média EWMA + `z` desvios e a média EWMA +
+    `margem_minima` (evita marcar variações de centavos em postos de preço
+    estável). Sem `min_amostras` no posto, `avaliar` devolve None e quem
+    chama aplica a regra de limiar sobre a média nacional.
+    """
+
+    def __init__(
+        self,
+        ativo: bool = True,
+        alpha: float = 0.05,
+        quantil: float = 0.99,
+        z: float = 3.0,
+        margem_minima: float = 0.05,
+        min_amostras: int = 50,
+        compressao: int = 100,
+    ):
+        self.ativo = ativo
+        self.alpha = alpha
+        self.quantil = quantil
+        self.z = z
+        self.margem_minima = margem_minima
+        self.min_amostras = min_amostras
+        self.compressao = compressao
+        self._estatisticas: Dict[Chave, EstatisticaPreco] = {}
+        # Pontos registrados desde o último snapshot, por posto e combustível
+        self._novos: Dict[Chave, EstatisticaPreco] = {}
+
+    def avaliar(
+        self, id_posto: int, tipo: TipoCombustivel, preco_por_litro: Decimal
+    ) -> Optional[bool]:
+        """Retorna se o preço é anômalo, ou None sem histórico suficiente."""
+        if not self.ativo:
+            return None
+
+        estatistica = self._estatisticas.get((id_posto, tipo))
+        if estatistica is None or estatistica.quantidade < self.min_amostras:
+            return None
+
+        media = estatistica.media
+        limite = max(
+            estatistica.limite_quantil(self.quantil),
+            media + self.z * math.sqrt(estatistica.variancia),
+            media * (1 + self.margem_minima),
+        )
+        return float(preco_por_litro) > limite
+
+    def registrar(
+        self, id_posto: int, tipo: TipoCombustivel, preco_por_litro: Decimal
+    ) -> None:
+        """Incorpora um preço já persistido aos sketches do posto."""
+        chave = (id_posto, tipo)
+        estatistica = self._estatisticas.get(chave)
+        if estatistica is None:
+            estatistica = self._estatisticas[chave] = EstatisticaPreco(self.compressao)
+
+        estatistica.registrar(float(preco_por_litro), self.alpha)
+
+        novos = self._novos.get(chave)
+        if novos is None:
+            novos = self._novos[chave] = EstatisticaPreco(self.compressao)
+        novos.registrar(float(preco_por_litro), self.alpha)
+
+    def exportar(self) -> List[dict]:
+        """
+        Gera as linhas de snapshot com os pontos registrados por este
+        processo desde o último snapshot (não o estado acumulado) e limpa
+        a marcação. Quem grava funde as linhas no snapshot do banco com
+        `mesclar_snapshot`.
+        """
+        novos, self._novos = self._novos, {}
+        return [estatistica.para_linha(chave) for chave, estatistica in novos.items()]
+
+    def restaurar_alterados(self, linhas: Iterable[dict]) -> None:
+        """Devolve aos pendentes as linhas de um snapshot que falhou."""
+        for linha in linhas:
+            chave = (linha["id_posto"], linha["tipo_combustivel"])
+            restaurada = EstatisticaPreco.de_linha(linha, self.compressao)
+            if chave in self._novos:
+                restaurada.mesclar(self._novos[chave], self.alpha)
+            self._novos[chave] = restaurada
+
+    def mesclar_snapshot(self, atuais: Iterable, novos: Iterable[dict]) -> List[dict]:
+        """
+        Funde as linhas de `exportar` às linhas atuais do banco e retorna
+        as linhas a gravar. Contagens somam, os t-digests são mesclados e
+        a EWMA do banco avança pelos pontos novos.
+        """
+        estatisticas = {
+            (linha.id_posto, linha.tipo_combustivel): linha for linha in atuais
+        }
+        linhas = []
+        for novo in novos:
+            chave = (novo["id_posto"], novo["tipo_combustivel"])
+            atual = estatisticas.get(chave)
+            if atual is None:
+                linhas.append(novo)
+                continue
+            estatistica = EstatisticaPreco.de_linha(atual, self.compressao)
+            estatistica.mesclar(
+                EstatisticaPreco.de_linha(novo, self.compressao), self.alpha
+            )
+            linhas.append(estatistica.para_linha(chave))
+        return linhas
+
+    def carregar(self, linhas: Iterable) -> None:
+        """
+        Substitui o estado pelos snapshots lidos do banco. Pontos ainda não
+        gravados em snapshot são reaplicados sobre o estado lido.
+        """
+        estatisticas: Dict[Chave, EstatisticaPreco] = {}
+        for linha in linhas:
+            chave = (linha.id_posto, linha.tipo_combustivel)
+            estatisticas[chave] = EstatisticaPreco.de_linha(linha, self.compressao)
+
+        for chave, novos in self._novos.items():
+            estatistica = estatisticas.get(chave)
+            if estatistica is None:
+                estatistica = estatisticas[chave] = EstatisticaPreco(self.compressao)
+            estatistica.mesclar(novos, self.alpha)
+
+        self._estatisticas = estatisticas
+
+
+detector_anomalia = DetectorAnomalia(
+    ativo=settings.anomalia_modo == "estatistico",
+    alpha=settings.anomalia_alpha,
+    quantil=settings.anomalia_quantil,
+    z=settings.anomalia_z,
+    margem_minima=settings.anomalia_margem_minima,
+    min_amostras=settings.anomalia_min_amostras,
+    compressao=settings.anomalia_compressao,
+)
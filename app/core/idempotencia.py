@@ -0,0 +1,175 @@
+"""
+Deduplicação de abastecimentos reenviados (Idempotency-Key e chave natural).
+
+Dispositivos embarcados repetem o envio quando a resposta não chega. Um
+reenvio é reconhecido pela chave do header Idempotency-Key ou, sem ela,
+pela chave natural (posto, data_hora, CPF, volume).
+
+Não há restrição de unicidade em abastecimentos: um filtro de Bloom em
+processo responde "com certeza novo" sem tocar no banco, e só quando ele
+acusa uma possível repetição a chave é conferida nos índices existentes.
+"""
+import hashlib
+import math
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Iterable, List, Optional
+
+from app.config import settings
+from app.utils.datas import para_utc
+
+
+class AbastecimentoDuplicado(Exception):
+    """O abastecimento já foi gravado; `abastecimento` é o registro original."""
+
+    def __init__(self, abastecimento: Any):
+        super().__init__("Abastecimento já registrado")
+        self.abastecimento = abastecimento
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre um bytearray.
+
+    Dimensionado para `capacidade` chaves com a taxa de falsos positivos
+    informada; acima disso a taxa sobe, mas nunca há falso negativo. As
+    `k` posições saem de um único blake2b (hashing duplo).
+    """
+
+    def __init__(self, capacidade: int, taxa_falsos_positivos: float = 0.01):
+        self.bits = max(8, math.ceil(
+            -capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2
+        ))
+        self.funcoes = max(1, round(self.bits / capacidade * math.log(2)))
+        self.quantidade = 0
+        self._mapa = bytearray((self.bits + 7) // 8)
+
+    def _posicoes(self, chave: bytes) -> List[int]:
+        resumo = hashlib.blake2b(chave, digest_size=16).digest()
+        h1 = int.from_bytes(resumo[:8], "little")
+        h2 = int.from_bytes(resumo[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.funcoes)]
+
+    def adicionar(self, chave: bytes) -> None:
+        for posicao in self._posicoes(chave):
+            self._mapa[posicao >> 3] |= 1 << (posicao & 7)
+        self.quantidade += 1
+
+    def __contains__(self, chave: bytes) -> bool:
+        return all(
+            self._mapa[posicao >> 3] & (1 << (posicao & 7))
+            for posicao in self._posicoes(chave)
+        )
+
+
+def normalizar_volume(volume: Decimal) -> Decimal:
+    """Volume com a escala da coluna (Numeric(10, 2)), como fica gravado."""
+    return Decimal(volume).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def chave_natural(
+    id_posto: int, data_hora: datetime, cpf_motorista: str, volume: Decimal
+) -> bytes:
+    return (
+        f"n:{id_posto}|{para_utc(data_hora).isoformat()}|"
+        f"{cpf_motorista}|{normalizar_volume(volume)}"
+    ).encode()
+
+
+def chave_header(chave_idempotencia: str) -> bytes:
+    return f"k:{chave_idempotencia}".encode()
+
+
+class IndiceIdempotencia:
+    """
+    Filtro de Bloom das chaves já gravadas por este processo.
+
+    O filtro só é confiável para abastecimentos com data_hora a partir de
+    `cobertura_desde` (o início da janela carregada do banco); fora dela,
+    ou antes da carga, toda requisição é conferida no banco. Em modo
+    "banco" o filtro é ignorado: necessário com vários workers, já que
+    cada processo só vê as próprias inserções.
+    """
+
+    def __init__(
+        self,
+        modo: str = "bloom",
+        capacidade: int = 1_000_000,
+        taxa_falsos_positivos: float = 0.01,
+        janela_horas: int = 72,
+    ):
+        self.modo = modo
+        self.janela = timedelta(hours=janela_horas)
+        self.filtro = FiltroBloom(capacidade, taxa_falsos_positivos)
+        self.cobertura_desde: Optional[datetime] = None
+
+    @property
+    def ativo(self) -> bool:
+        return self.modo != "desativado"
+
+    def talvez_duplicado(
+        self,
+        id_posto: int,
+        data_hora: datetime,
+        cpf_motorista: str,
+        volume: Decimal,
+        chave_idempotencia: Optional[str] = None,
+    ) -> bool:
+        """False quando o abastecimento é com certeza novo."""
+        if (
+            self.modo != "bloom"
+            or self.cobertura_desde is None
+            or para_utc(data_hora) < self.cobertura_desde
+        ):
+            return True
+
+        if chave_idempotencia is not None and chave_header(chave_idempotencia) in self.filtro:
+            return True
+        return chave_natural(id_posto, data_hora, cpf_motorista, volume) in self.filtro
+
+    def registrar(
+        self,
+        id_posto: int,
+        data_hora: datetime,
+        cpf_motorista: str,
+        volume: Decimal,
+    ) -> None:
+        self.filtro.adicionar(chave_natural(id_posto, data_hora, cpf_motorista, volume))
+
+    def registrar_chave(self, chave_idempotencia: str) -> None:
+        self.filtro.adicionar(chave_header(chave_idempotencia))
+
+    def inicio_janela(self, agora: Optional[datetime] = None) -> datetime:
+        return (agora or datetime.now(timezone.utc)) - self.janela
+
+    def carregar(self, linhas: Iterable) -> None:
+        """
+        Acrescenta ao filtro abastecimentos já gravados (linhas com
+        id_posto, data_hora, cpf_motorista e volume_abastecido).
+
+        O filtro não é limpo: o que foi registrado durante a carga se mantém.
+        """
+        for linha in linhas:
+            self.registrar(
+                linha.id_posto,
+                linha.data_hora,
+                linha.cpf_motorista,
+                linha.volume_abastecido,
+            )
+
+    def estatisticas(self) -> dict:
+        return {
+            "modo": self.modo,
+            "chaves": self.filtro.quantidade,
+            "bits": self.filtro.bits,
+            "funcoes_hash": self.filtro.funcoes,
+            "cobertura_desde": self.cobertura_desde,
+        }
+
+
+indice_idempotencia = IndiceIdempotencia(
+    modo=settings.idempotencia_modo,
+    capacidade=settings.idempotencia_bloom_capacidade,
+    taxa_falsos_positivos=settings.idempotencia_bloom_taxa_fp,
+    janela_horas=settings.idempotencia_janela_horas,
+)
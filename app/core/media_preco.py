@@ -0,0 +1,84 @@
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+
+from app.config import settings
+from app.models.abastecimento import TipoCombustivel
+
+
+class AgregadorMediaPreco:
+    """
+    Média de preço por combustível mantida em memória.
+
+    Guarda soma e contagem por TipoCombustivel (e, opcionalmente, uma média
+    móvel exponencial). O estado é carregado com uma única consulta agrupada
+    e atualizado em O(1) a cada abastecimento aceito, sem ida ao banco.
+    """
+
+    def __init__(self, modo: str = "acumulada", alpha: float = 0.01):
+        if modo not in ("acumulada", "ewma"):
+            raise ValueError(f"Modo de média desconhecido: {modo}")
+
+        self.modo = modo
+        self.alpha = Decimal(str(alpha))
+        self.carregado = False
+        self._soma: Dict[TipoCombustivel, Decimal] = {}
+        self._contagem: Dict[TipoCombustivel, int] = {}
+        self._ewma: Dict[TipoCombustivel, Decimal] = {}
+
+    def carregar(
+        self, agregados: Iterable[Tuple[TipoCombustivel, Decimal, int]]
+    ) -> None:
+        """
+        Substitui o estado pelo resultado de um GROUP BY no banco.
+
+        Args:
+            agregados: Tuplas (tipo_combustivel, soma_preco, contagem)
+
+        Na reconciliação periódica só soma e contagem são corrigidas: a EWMA
+        em memória é mantida, pois o banco não guarda a ordem de chegada
+        necessária para reconstruí-la. Ela só parte da média acumulada para
+        combustíveis ainda sem EWMA (primeira carga ou tipo novo).
+        """
+        soma: Dict[TipoCombustivel, Decimal] = {}
+        contagem: Dict[TipoCombustivel, int] = {}
+
+        for tipo, total, quantidade in agregados:
+            if not quantidade:
+                continue
+            soma[tipo] = Decimal(total)
+            contagem[tipo] = int(quantidade)
+
+        self._soma = soma
+        self._contagem = contagem
+        self._ewma = {
+            tipo: self._ewma.get(tipo, soma[tipo] / contagem[tipo]) for tipo in soma
+        }
+        self.carregado = True
+
+    def registrar(self, tipo: TipoCombustivel, preco_por_litro: Decimal) -> None:
+        """Incorpora um novo preço ao agregado (O(1))."""
+        self._soma[tipo] = self._soma.get(tipo, Decimal("0")) + preco_por_litro
+        self._contagem[tipo] = self._contagem.get(tipo, 0) + 1
+
+        anterior = self._ewma.get(tipo)
+        if anterior is None:
+            self._ewma[tipo] = preco_por_litro
+        else:
+            self._ewma[tipo] = anterior + self.alpha * (preco_por_litro - anterior)
+
+    def media(self, tipo: TipoCombustivel) -> Decimal | None:
+        """Retorna a média do combustível, ou None se ainda não há histórico."""
+        contagem = self._contagem.get(tipo)
+        if not contagem:
+            return None
+
+        if self.modo == "ewma":
+            return self._ewma[tipo]
+
+        return self._soma[tipo] / contagem
+
+
+media_preco = AgregadorMediaPreco(
+    modo=settings.media_preco_modo,
+    alpha=settings.media_preco_alpha,
+)
@@ -0,0 +1,283 @@
+"""
+Métricas em memória no formato de exposição de texto do Prometheus.
+
+Cada worker mantém seus próprios contadores. As atualizações acontecem no
+event loop (inclusive os hooks do SQLAlchemy, que rodam no mesmo thread),
+então bastam dicts e listas simples: nenhum lock no caminho quente.
+"""
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS_HTTP = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075,
+    0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0,
+)
+BUCKETS_DB = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+Rotulos = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str]):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Rotulos, float] = {}
+
+    def inc(self, rotulos: Rotulos, valor: float = 1) -> None:
+        self._valores[rotulos] = self._valores.get(rotulos, 0) + valor
+
+    def valor(self, rotulos: Rotulos) -> float:
+        return self._valores.get(rotulos, 0)
+
+    def expor(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        for rotulos, valor in sorted(self._valores.items()):
+            linhas.append(
+                f"{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_numero(valor)}"
+            )
+        return linhas
+
+
+class Histograma:
+    """
+    Histograma com buckets fixos. Guarda as contagens por bucket (não
+    cumulativas) e acumula só na exposição.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        ajuda: str,
+        rotulos: Sequence[str],
+        buckets: Sequence[float] = BUCKETS_HTTP,
+    ):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.buckets = tuple(buckets)
+        # rotulos -> [contagens por bucket (+Inf no fim), soma]
+        self._series: Dict[Rotulos, list] = {}
+
+    def observar(self, rotulos: Rotulos, valor: float) -> None:
+        serie = self._series.get(rotulos)
+        if serie is None:
+            serie = self._series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def contagem(self, rotulos: Rotulos) -> int:
+        serie = self._series.get(rotulos)
+        return sum(serie[0]) if serie else 0
+
+    def expor(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        limites = [*self.buckets, float("inf")]
+
+        for rotulos, (contagens, soma) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                le = f'le="{_formatar_numero(limite)}"'
+                linhas.append(
+                    f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, rotulos, le)} {acumulado}"
+                )
+            sufixo = _formatar_rotulos(self.rotulos, rotulos)
+            linhas.append(f"{self.nome}_sum{sufixo} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{sufixo} {acumulado}")
+        return linhas
+
+
+def linhas_gauge(prefixo: str, valores: Dict[str, object]) -> List[str]:
+    """Converte um dict de estatísticas em gauges "<prefixo>_<chave>"."""
+    linhas = []
+    for chave, valor in valores.items():
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            continue
+        nome = f"{prefixo}_{chave}"
+        linhas += [f"# TYPE {nome} gauge", f"{nome} {_formatar_numero(valor)}"]
+    return linhas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self.requisicoes = Contador(
+            "http_requests_total",
+            "Requisições HTTP por rota e status.",
+            ("method", "route", "handler", "status"),
+        )
+        self.latencia = Histograma(
+            "http_request_duration_seconds",
+            "Latência das requisições HTTP.",
+            ("method", "route", "handler"),
+            BUCKETS_HTTP,
+        )
+        self.consultas = Contador(
+            "db_queries_total",
+            "Consultas executadas por método de repositório.",
+            ("operacao",),
+        )
+        self.duracao_consultas = Histograma(
+            "db_query_duration_seconds",
+            "Duração das consultas por método de repositório.",
+            ("operacao",),
+            BUCKETS_DB,
+        )
+        self._coletores: List[Callable[[], List[str]]] = []
+
+    def registrar_coletor(self, coletor: Callable[[], List[str]]) -> None:
+        """Registra uma função que gera linhas extras (gauges) na exposição."""
+        self._coletores.append(coletor)
+
+    def expor(self) -> str:
+        linhas: List[str] = []
+        for metrica in (
+            self.requisicoes, self.latencia, self.consultas, self.duracao_consultas
+        ):
+            linhas.extend(metrica.expor())
+        for coletor in self._coletores:
+            linhas.extend(coletor())
+        return "\n".join(linhas) + "\n"
+
+
+metricas = RegistroMetricas()
+
+
+# --- Rótulo da operação de banco -------------------------------------------
+
+operacao_db: ContextVar[Optional[str]] = ContextVar("operacao_db", default=None)
+
+
+def _envolver(nome: str, funcao: Callable) -> Callable:
+    if inspect.isasyncgenfunction(funcao):
+        @functools.wraps(funcao)
+        async def gerador(*args, **kwargs):
+            iterador = funcao(*args, **kwargs)
+            try:
+                while True:
+                    # O rótulo vale apenas enquanto o gerador executa, não
+                    # enquanto o consumidor processa o item entregue
+                    token = operacao_db.set(nome)
+                    try:
+                        item = await iterador.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        operacao_db.reset(token)
+                    yield item
+            finally:
+                await iterador.aclose()
+
+        return gerador
+
+    @functools.wraps(funcao)
+    async def corrotina(*args, **kwargs):
+        token = operacao_db.set(nome)
+        try:
+            return await funcao(*args, **kwargs)
+        finally:
+            operacao_db.reset(token)
+
+    return corrotina
+
+
+def instrumentar_repositorio(cls):
+    """
+    Decorador de classe: rotula as consultas de cada método público
+    assíncrono como "<Classe>.<método>" nas métricas de banco.
+
+    Chamadas aninhadas (um repositório usando outro) ficam com o rótulo
+    do método mais interno.
+    """
+    for nome, funcao in list(vars(cls).items()):
+        if nome.startswith("_") or not (
+            inspect.iscoroutinefunction(funcao) or inspect.isasyncgenfunction(funcao)
+        ):
+            continue
+        setattr(cls, nome, _envolver(f"{cls.__name__}.{nome}", funcao))
+    return cls
+
+
+def registrar_hooks_db(engine: Engine, registro: RegistroMetricas = metricas) -> None:
+    """Mede cada execução de cursor no engine (síncrono) informado."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        context._metricas_inicio = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "_metricas_inicio", None)
+        if inicio is None:
+            return
+        rotulos = (operacao_db.get() or "outros",)
+        registro.consultas.inc(rotulos)
+        registro.duracao_consultas.observar(rotulos, time.perf_counter() - inicio)
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que mede contagem, status e latência por rota.
+
+    O rótulo de rota é o template do path (ex.: /motoristas/{cpf}/historico),
+    disponível no scope depois do roteamento; requisições que não casam com
+    nenhuma rota ficam agrupadas para não explodir a cardinalidade.
+    """
+
+    def __init__(self, app, registro: RegistroMetricas = metricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def send_com_status(mensagem):
+            nonlocal status_code
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            rota = scope.get("route")
+            caminho = getattr(rota, "path", "sem_rota")
+            handler = getattr(rota, "name", "sem_rota")
+            metodo = scope["method"]
+
+            self.registro.requisicoes.inc((metodo, caminho, handler, str(status_code)))
+            self.registro.latencia.observar(
+                (metodo, caminho, handler), time.perf_counter() - inicio
+            )
@@ -0,0 +1,55 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class MedicaoEsperaPool:
+    """
+    Mixin para QueuePool que mede quanto as requisições esperam por uma
+    conexão (inclui a abertura de conexões novas de overflow).
+
+    Os contadores são atualizados na própria chamada de checkout, no mesmo
+    event loop; não há lock envolvido.
+    """
+
+    esperas = 0
+    timeouts = 0
+    espera_total = 0.0
+    espera_max = 0.0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            decorrido = time.perf_counter() - inicio
+            self.esperas += 1
+            self.espera_total += decorrido
+            if decorrido > self.espera_max:
+                self.espera_max = decorrido
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "tamanho": self.size(),
+            "ociosas": self.checkedin(),
+            "em_uso": self.checkedout(),
+            # overflow() começa em -pool_size enquanto o pool não enche
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.esperas,
+            "timeouts": self.timeouts,
+            "espera_media_ms": (
+                round(self.espera_total / self.esperas * 1000, 3)
+                if self.esperas else None
+            ),
+            "espera_max_ms": round(self.espera_max * 1000, 3),
+        }
+
+
+class PoolInstrumentado(MedicaoEsperaPool, AsyncAdaptedQueuePool):
+    """Pool assíncrono padrão do SQLAlchemy, com medição de espera."""
@@ -0,0 +1,57 @@
+"""
+Prontidão do worker para receber tráfego (GET /ready).
+
+O lifespan executa as etapas de aquecimento (carga dos agregados em
+memória, conexões do pool, réplicas) e só então marca o worker como
+pronto. Etapas que falham ficam registradas, mas não impedem a
+prontidão: a aplicação já opera degradada sem elas (ex.: sem médias
+carregadas a regra de anomalia fica inativa até a reconciliação).
+"""
+import logging
+import time
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class EstadoProntidao:
+    def __init__(self):
+        self.pronto = False
+        self.encerrando = False
+        self.etapas: Dict[str, dict] = {}
+
+    async def executar(self, nome: str, etapa: Callable[[], Awaitable]) -> bool:
+        """Executa uma etapa de aquecimento; retorna se ela concluiu sem erro."""
+        inicio = time.perf_counter()
+        try:
+            await etapa()
+        except Exception as e:
+            logger.exception("Falha na etapa de aquecimento '%s'", nome)
+            resultado = {"status": "erro", "erro": f"{type(e).__name__}: {e}"}
+        else:
+            resultado = {"status": "ok"}
+
+        resultado["duracao_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+        self.etapas[nome] = resultado
+        return resultado["status"] == "ok"
+
+    def marcar_pronto(self) -> None:
+        self.pronto = True
+        self.encerrando = False
+
+    def marcar_encerrando(self) -> None:
+        """Tira o worker do balanceamento antes de drenar filas e conexões."""
+        self.pronto = False
+        self.encerrando = True
+
+    def estado(self) -> dict:
+        if self.pronto:
+            status = "ready"
+        elif self.encerrando:
+            status = "shutting_down"
+        else:
+            status = "starting"
+        return {"status": status, "etapas": self.etapas}
+
+
+prontidao = EstadoProntidao()
@@ -0,0 +1,169 @@
+"""
+Roteamento de leituras para réplicas do PostgreSQL.
+
+Cada réplica é consultada periodicamente para saber até que instante ela
+já reproduziu o primário ("visível até"). Uma leitura só vai para uma
+réplica saudável cujo atraso (agora - visível até) esteja dentro do
+limite; se a requisição precisa enxergar uma escrita recente, a réplica
+também precisa já ter reproduzido essa escrita. Sem candidata, a leitura
+vai para o primário.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from typing import Any, List, Optional
+
+from sqlalchemy import text
+
+# Réplica em dia (tudo recebido já reproduzido) está visível até agora;
+# senão, até o commit da última transação reproduzida.
+CONSULTA_ATRASO = text(
+    """
+    SELECT
+        now(),
+        pg_last_xact_replay_timestamp(),
+        pg_last_wal_receive_lsn() IS NOT DISTINCT FROM pg_last_wal_replay_lsn()
+    """
+)
+
+
+class Replica:
+    def __init__(self, nome: str, engine: Any, sessoes: Any):
+        self.nome = nome
+        self.engine = engine
+        self.sessoes = sessoes
+        self.saudavel = False
+        self.visivel_ate: Optional[datetime] = None
+        self.erro: Optional[str] = None
+        self.verificada_em: Optional[float] = None
+
+    def atualizar(
+        self,
+        agora: datetime,
+        ultima_reproducao: Optional[datetime],
+        em_dia: bool,
+    ) -> None:
+        self.visivel_ate = agora if em_dia else ultima_reproducao
+        self.saudavel = self.visivel_ate is not None
+        self.erro = None
+        self.verificada_em = time.monotonic()
+
+    def marcar_falha(self, erro: Exception) -> None:
+        self.saudavel = False
+        self.erro = f"{type(erro).__name__}: {erro}"
+        self.verificada_em = time.monotonic()
+
+    def atraso(self, agora: Optional[datetime] = None) -> Optional[float]:
+        """Segundos desde o último instante visível (cresce se a verificação parar)."""
+        if self.visivel_ate is None:
+            return None
+        agora = agora or datetime.now(timezone.utc)
+        return max((agora - self.visivel_ate).total_seconds(), 0.0)
+
+
+class RoteadorLeitura:
+    """
+    Escolhe a réplica de cada leitura (round-robin entre as elegíveis) e
+    guarda o instante da última escrita por CPF feita por este processo,
+    para que o histórico de quem acabou de abastecer venha do primário
+    enquanto as réplicas não o alcançam.
+    """
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        atraso_max_segundos: float = 5.0,
+        max_escritas: int = 100_000,
+    ):
+        self.replicas = replicas
+        self.atraso_max = atraso_max_segundos
+        self.max_escritas = max_escritas
+        self._escritas: "OrderedDict[str, datetime]" = OrderedDict()
+        self._turno = count()
+        self.leituras_replica = 0
+        self.leituras_primario = 0
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self.replicas)
+
+    def registrar_escrita(self, chave: str, quando: Optional[datetime] = None) -> None:
+        if not self.replicas:
+            return
+
+        quando = quando or datetime.now(timezone.utc)
+        self._escritas[chave] = quando
+        self._escritas.move_to_end(chave)
+
+        # Escritas mais antigas que o atraso máximo já não decidem nada:
+        # réplicas tão atrasadas são descartadas de qualquer forma
+        limite = quando - timedelta(seconds=self.atraso_max)
+        while self._escritas:
+            mais_antiga = next(iter(self._escritas))
+            if (
+                self._escritas[mais_antiga] >= limite
+                and len(self._escritas) <= self.max_escritas
+            ):
+                break
+            del self._escritas[mais_antiga]
+
+    def ultima_escrita(self, chave: str) -> Optional[datetime]:
+        return self._escritas.get(chave)
+
+    def escolher(
+        self, apos: Optional[datetime] = None, agora: Optional[datetime] = None
+    ) -> Optional[Replica]:
+        """
+        Retorna a réplica da próxima leitura, ou None para usar o primário.
+
+        `apos` exige que a réplica já enxergue o que foi escrito até ali.
+        """
+        agora = agora or datetime.now(timezone.utc)
+        candidatas = [
+            replica
+            for replica in self.replicas
+            if replica.saudavel
+            and replica.atraso(agora) <= self.atraso_max
+            and (apos is None or replica.visivel_ate >= apos)
+        ]
+        if not candidatas:
+            self.leituras_primario += 1
+            return None
+
+        self.leituras_replica += 1
+        return candidatas[next(self._turno) % len(candidatas)]
+
+    async def verificar(self) -> None:
+        """Atualiza saúde e atraso de cada réplica (uma consulta por réplica)."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conexao:
+                    agora, ultima_reproducao, em_dia = (
+                        await conexao.execute(CONSULTA_ATRASO)
+                    ).one()
+            except Exception as e:
+                replica.marcar_falha(e)
+            else:
+                replica.atualizar(agora, ultima_reproducao, em_dia)
+
+    def estatisticas(self) -> dict:
+        agora = datetime.now(timezone.utc)
+        return {
+            "atraso_max_segundos": self.atraso_max,
+            "leituras_replica": self.leituras_replica,
+            "leituras_primario": self.leituras_primario,
+            "escritas_recentes": len(self._escritas),
+            "replicas": [
+                {
+                    "nome": replica.nome,
+                    "saudavel": replica.saudavel,
+                    "atraso_segundos": (
+                        None if replica.visivel_ate is None
+                        else round(replica.atraso(agora), 3)
+                    ),
+                    "erro": replica.erro,
+                }
+                for replica in self.replicas
+            ],
+        }
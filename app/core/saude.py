@@ -0,0 +1,110 @@
+"""
+Estado de saúde do worker (GET /health), produzido em segundo plano.
+
+Uma única tarefa por worker faz `SELECT 1` em uma conexão dedicada, fora
+do pool das requisições, e guarda o resultado. O /health só lê esse
+estado e as estatísticas do pool: responde em O(1), sem I/O, e não
+disputa conexões com as requisições quando o pool está saturado.
+"""
+import asyncio
+import time
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+CONSULTA_SAUDE = text("SELECT 1")
+
+
+class MonitorSaude:
+    """
+    Verifica o banco a cada `intervalo_segundos` e guarda o resultado.
+
+    A conexão é aberta na primeira verificação e mantida entre as
+    seguintes; em caso de erro ou timeout ela é descartada e reaberta na
+    próxima. Se a última verificação ficar velha demais (tarefa parada),
+    o banco passa a ser reportado como "unknown".
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        pool: Any,
+        intervalo_segundos: float = 2.0,
+        timeout_segundos: float = 2.0,
+    ):
+        self.engine = engine
+        self.pool = pool
+        self.intervalo = intervalo_segundos
+        self.timeout = timeout_segundos
+        self.max_idade = 3 * intervalo_segundos + timeout_segundos
+        self._conexao: Optional[Any] = None
+        self.banco = "unknown"
+        self.latencia_ms: Optional[float] = None
+        self.erro: Optional[str] = None
+        self.verificado_em: Optional[datetime] = None
+        self._verificado_monotonic: Optional[float] = None
+
+    async def _executar(self) -> None:
+        if self._conexao is None:
+            self._conexao = await self.engine.connect()
+        await self._conexao.execute(CONSULTA_SAUDE)
+
+    async def verificar(self) -> None:
+        """Uma verificação; erros ficam no estado, nunca são propagados."""
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._executar(), timeout=self.timeout)
+        except Exception as e:
+            self.banco = "unhealthy"
+            self.erro = (
+                f"timeout após {self.timeout}s" if isinstance(e, asyncio.TimeoutError)
+                else f"{type(e).__name__}: {e}"
+            )
+            await self.fechar()
+        else:
+            self.banco = "healthy"
+            self.erro = None
+
+        self.latencia_ms = round((time.perf_counter() - inicio) * 1000, 3)
+        self.verificado_em = datetime.now(timezone.utc)
+        self._verificado_monotonic = time.monotonic()
+
+    async def fechar(self) -> None:
+        conexao, self._conexao = self._conexao, None
+        if conexao is not None:
+            with suppress(Exception):
+                await conexao.close()
+
+    def idade(self) -> Optional[float]:
+        """Segundos desde a última verificação."""
+        if self._verificado_monotonic is None:
+            return None
+        return time.monotonic() - self._verificado_monotonic
+
+    def saturacao_pool(self) -> dict:
+        estatisticas = self.pool.estatisticas()
+        capacidade = estatisticas["tamanho"] + estatisticas["max_overflow"]
+        estatisticas["saturacao"] = (
+            round(estatisticas["em_uso"] / capacidade, 3) if capacidade > 0 else None
+        )
+        return estatisticas
+
+    def estado(self) -> dict:
+        idade = self.idade()
+        banco = self.banco
+        if idade is None or idade > self.max_idade:
+            banco = "unknown"
+
+        return {
+            "status": "healthy" if banco == "healthy" else "degraded",
+            "services": {"database": banco},
+            "verificacao": {
+                "em": self.verificado_em.isoformat() if self.verificado_em else None,
+                "idade_segundos": None if idade is None else round(idade, 3),
+                "latencia_ms": self.latencia_ms,
+                "erro": self.erro,
+            },
+            "pool": self.saturacao_pool(),
+        }
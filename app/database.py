@@ -1,22 +1,104 @@
+from typing import Optional
+
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.config import settings
+from app.core.metricas import linhas_gauge, metricas, registrar_hooks_db
+from app.core.pool import PoolInstrumentado
+from app.core.replicas import Replica, RoteadorLeitura
+from app.core.saude import MonitorSaude
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
+
+def _criar_engine(url: str):
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=PoolInstrumentado,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            # Cache do dialeto (por conexão) e cache interno do asyncpg
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+    registrar_hooks_db(engine.sync_engine)
+    return engine
+
+
+def _sessoes(engine) -> sessionmaker:
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+engine = _criar_engine(settings.database_url)
+metricas.registrar_coletor(
+    lambda: linhas_gauge("db_pool", engine.pool.estatisticas())
+)
+
+AsyncSessionLocal = _sessoes(engine)
+
+# Réplicas de leitura (DATABASE_READ_URLS, separadas por vírgula)
+replicas = []
+for indice, url in enumerate(
+    url.strip() for url in settings.database_read_urls.split(",") if url.strip()
+):
+    engine_replica = _criar_engine(url)
+    replicas.append(Replica(f"replica{indice}", engine_replica, _sessoes(engine_replica)))
+
+roteador_leitura = RoteadorLeitura(
+    replicas, atraso_max_segundos=settings.replica_atraso_max_segundos
 )
 
-AsyncSessionLocal = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+# O health check usa uma conexão própria, mantida aberta pelo monitor; sem
+# pool, ela nunca é emprestada a uma requisição (nem espera por uma)
+monitor_saude = MonitorSaude(
+    create_async_engine(settings.database_url, poolclass=NullPool),
+    engine.pool,
+    intervalo_segundos=settings.saude_verificacao_segundos,
+    timeout_segundos=settings.saude_timeout_segundos,
 )
 
+
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Em session.info: False quando a leitura veio de uma réplica escolhida sem
+# o instante da escrita, que pode ainda não enxergar uma escrita recente.
+# Essas respostas não são guardadas no cache (ficariam sob a versão nova).
+LEITURA_CACHEAVEL = "leitura_cacheavel"
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Sessão para rotas somente leitura: uma réplica quando houver alguma
+    elegível, senão o primário.
+
+    Vai direto ao primário com o header `X-Consistencia: primaria`, ou se
+    o CPF da rota tiver uma escrita que as réplicas ainda não reproduziram.
+    """
+    replica: Optional[Replica] = None
+    apos = None
+    if (
+        roteador_leitura.ativo
+        and request.headers.get("x-consistencia", "").lower() != "primaria"
+    ):
+        cpf = request.path_params.get("cpf")
+        if cpf:
+            apos = roteador_leitura.ultima_escrita(cpf)
+        replica = roteador_leitura.escolher(apos=apos)
+
+    fabrica = replica.sessoes if replica is not None else AsyncSessionLocal
+    async with fabrica() as session:
+        session.info[LEITURA_CACHEAVEL] = replica is None or apos is not None
+        yield session
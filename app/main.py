@@ -1,6 +1,145 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from app.config import settings
-from app.api.routers import abastecimento, health
+from app.api.routers import abastecimento, health, internal, metricas, postos
+from app.core.buffer_ingestao import buffer_ingestao
+from app.core.camada_quente import camada_quente
+from app.core.detector_anomalia import detector_anomalia
+from app.core.idempotencia import indice_idempotencia
+from app.core.metricas import MetricasMiddleware
+from app.core.prontidao import prontidao
+from app.database import monitor_saude, roteador_leitura
+from app.services import tarefas
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Aquecimento: o worker só fica pronto (GET /ready) depois destas etapas.
+    # Falhas ficam registradas em /ready, mas não bloqueiam a prontidão.
+
+    # Sem médias carregadas a regra de anomalia fica inativa até a
+    # próxima reconciliação; a API continua aceitando abastecimentos.
+    await prontidao.executar("medias_preco", tarefas.carregar_medias_preco)
+
+    reconciliacao = asyncio.create_task(
+        tarefas.reconciliar_medias_periodicamente(
+            settings.media_preco_reconciliacao_segundos
+        )
+    )
+
+    snapshots = None
+    if detector_anomalia.ativo:
+        # Sem snapshot, cada posto usa a regra de limiar até acumular
+        # histórico suficiente
+        await prontidao.executar(
+            "detector_anomalia", tarefas.carregar_detector_anomalia
+        )
+
+        snapshots = asyncio.create_task(
+            tarefas.snapshot_detector_periodicamente(
+                settings.anomalia_snapshot_segundos
+            )
+        )
+
+    if indice_idempotencia.modo == "bloom":
+        # Sem o filtro carregado, toda criação confere duplicatas no banco
+        await prontidao.executar(
+            "filtro_idempotencia", tarefas.carregar_filtro_idempotencia
+        )
+
+    expurgo_chaves = None
+    if indice_idempotencia.ativo:
+        # Chaves fora da janela já não são conferidas pelo filtro
+        expurgo_chaves = asyncio.create_task(
+            tarefas.expurgar_chaves_periodicamente(
+                settings.idempotencia_expurgo_segundos
+            )
+        )
+
+    camada = None
+    if camada_quente.ativo:
+        # Sem a carga, as séries vêm do banco
+        await prontidao.executar("camada_quente", tarefas.carregar_camada_quente)
+        camada = asyncio.create_task(
+            tarefas.manter_camada_quente_periodicamente(
+                settings.camada_quente_expurgo_segundos,
+                settings.camada_quente_recarga_segundos,
+            )
+        )
+
+    replicas = None
+    if roteador_leitura.ativo:
+        # Primeira medição antes de ficar pronto: as réplicas já entram no
+        # rodízio na primeira requisição
+        await prontidao.executar("replicas", roteador_leitura.verificar)
+        replicas = asyncio.create_task(
+            tarefas.verificar_replicas_periodicamente(
+                settings.replica_verificacao_segundos
+            )
+        )
+
+    if settings.aquecimento_conexoes > 0:
+        await prontidao.executar(
+            "conexoes",
+            lambda: tarefas.aquecer_conexoes(settings.aquecimento_conexoes),
+        )
+
+    if settings.ingestao_modo == "buffer":
+        buffer_ingestao.iniciar(tarefas.persistir_lote_buffer)
+
+    # A primeira verificação roda já na criação da tarefa: o /health sai
+    # de "unknown" sem atrasar a prontidão
+    saude = asyncio.create_task(
+        tarefas.verificar_saude_periodicamente(settings.saude_verificacao_segundos)
+    )
+
+    prontidao.marcar_pronto()
+
+    yield
+
+    # Sai do balanceamento antes de drenar o buffer e fechar conexões
+    prontidao.marcar_encerrando()
+
+    # Drena o buffer antes de encerrar: nada que já foi aceito é perdido
+    await buffer_ingestao.parar()
+
+    reconciliacao.cancel()
+    with suppress(asyncio.CancelledError):
+        await reconciliacao
+
+    if expurgo_chaves is not None:
+        expurgo_chaves.cancel()
+        with suppress(asyncio.CancelledError):
+            await expurgo_chaves
+
+    if camada is not None:
+        camada.cancel()
+        with suppress(asyncio.CancelledError):
+            await camada
+
+    if replicas is not None:
+        replicas.cancel()
+        with suppress(asyncio.CancelledError):
+            await replicas
+
+    saude.cancel()
+    with suppress(asyncio.CancelledError):
+        await saude
+    await monitor_saude.fechar()
+
+    if snapshots is not None:
+        snapshots.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshots
+        try:
+            await tarefas.salvar_snapshot_detector()
+        except Exception:
+            logger.exception("Falha ao gravar snapshot final do detector de anomalias")
 
 
 app = FastAPI(
@@ -9,7 +148,13 @@ app = FastAPI(
     version=settings.api_version,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
+app.add_middleware(MetricasMiddleware)
+
 app.include_router(abastecimento.router)
+app.include_router(postos.router)
 app.include_router(health.router)
+app.include_router(internal.router)
+app.include_router(metricas.router)
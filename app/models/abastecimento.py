@@ -3,7 +3,7 @@ from enum import Enum as PyEnum
 from decimal import Decimal
 
 from sqlalchemy import (
-    Boolean, DateTime, Enum, Integer, Numeric, String, func
+    Boolean, DateTime, Enum, Index, Integer, Numeric, String, func, text
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -19,6 +19,28 @@ class TipoCombustivel(str, PyEnum):
 class Abastecimento(Base):
     
     __tablename__ = "abastecimentos"
+    __table_args__ = (
+        Index(
+            "ix_abastecimentos_tipo_data_hora",
+            "tipo_combustivel", text("data_hora DESC"), text("id DESC"),
+        ),
+        Index(
+            "ix_abastecimentos_cpf_data_hora",
+            "cpf_motorista", text("data_hora DESC"), text("id DESC"),
+        ),
+        Index(
+            "ix_abastecimentos_data_hora_id",
+            text("data_hora DESC"), text("id DESC"),
+        ),
+        Index(
+            "ix_abastecimentos_data_hora_brin",
+            "data_hora",
+            postgresql_using="brin",
+        ),
+        # Particionada por mês em data_hora; no banco a PK é (id, data_hora),
+        # mas o id (sequence) já identifica a linha para o ORM.
+        {"postgresql_partition_by": "RANGE (data_hora)"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     id_posto: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -40,8 +62,7 @@ class Abastecimento(Base):
     )
     cpf_motorista: Mapped[str] = mapped_column(
         String(11), 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     improper_data: Mapped[bool] = mapped_column(
         Boolean, 
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ChaveIdempotencia(Base):
+    """Idempotency-Key recebida e o abastecimento criado por ela."""
+
+    __tablename__ = "chaves_idempotencia"
+
+    chave: Mapped[str] = mapped_column(String(255), primary_key=True)
+    id_abastecimento: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Permite localizar o abastecimento podando as partições
+    data_hora: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Indexado para o expurgo das chaves fora da janela de deduplicação
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
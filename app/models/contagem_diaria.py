@@ -0,0 +1,20 @@
+from datetime import date
+
+from sqlalchemy import Date, Enum, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.abastecimento import TipoCombustivel
+
+
+class ContagemDiaria(Base):
+    """Quantidade de abastecimentos por combustível e dia (UTC)."""
+
+    __tablename__ = "contagens_diarias"
+
+    tipo_combustivel: Mapped[TipoCombustivel] = mapped_column(
+        Enum(TipoCombustivel, name="tipocombustivel"),
+        primary_key=True,
+    )
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
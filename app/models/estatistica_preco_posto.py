@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, Float, Integer, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.abastecimento import TipoCombustivel
+
+
+class EstatisticaPrecoPosto(Base):
+    """Snapshot dos sketches de preço (EWMA + t-digest) por posto e combustível."""
+
+    __tablename__ = "estatisticas_preco_postos"
+
+    id_posto: Mapped[int] = mapped_column(Integer, primary_key=True)
+    tipo_combustivel: Mapped[TipoCombustivel] = mapped_column(
+        Enum(TipoCombustivel, name="tipocombustivel"),
+        primary_key=True,
+    )
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
+    media: Mapped[float] = mapped_column(Float, nullable=False)
+    variancia: Mapped[float] = mapped_column(Float, nullable=False)
+    digest: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,31 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Integer, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ResumoMotorista(Base):
+    """Totais acumulados de abastecimentos por motorista (CPF)."""
+
+    __tablename__ = "resumo_motoristas"
+
+    cpf_motorista: Mapped[str] = mapped_column(String(11), primary_key=True)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
+    litros: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    gasto: Mapped[Decimal] = mapped_column(Numeric(20, 4), nullable=False)
+    quantidade_anomalias: Mapped[int] = mapped_column(Integer, nullable=False)
+    primeiro_abastecimento: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    ultimo_abastecimento: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
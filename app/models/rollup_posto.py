@@ -0,0 +1,33 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, Enum, Integer, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.abastecimento import TipoCombustivel
+
+
+class RollupPosto(Base):
+    """Agregado diário de preços e volumes por posto e combustível."""
+
+    __tablename__ = "rollup_postos"
+
+    id_posto: Mapped[int] = mapped_column(Integer, primary_key=True)
+    tipo_combustivel: Mapped[TipoCombustivel] = mapped_column(
+        Enum(TipoCombustivel, name="tipocombustivel"),
+        primary_key=True,
+    )
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
+    soma_preco: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    preco_min: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    preco_max: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    litros: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    quantidade_anomalias: Mapped[int] = mapped_column(Integer, nullable=False)
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
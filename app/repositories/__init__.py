@@ -1,3 +1,17 @@
 from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.repositories.chave_idempotencia_repository import ChaveIdempotenciaRepository
+from app.repositories.contagem_diaria_repository import ContagemDiariaRepository
+from app.repositories.estatistica_preco_repository import EstatisticaPrecoRepository
+from app.repositories.particao_repository import ParticaoRepository
+from app.repositories.resumo_motorista_repository import ResumoMotoristaRepository
+from app.repositories.rollup_posto_repository import RollupPostoRepository
 
-__all__ = ["AbastecimentoRepository"]
\ No newline at end of file
+__all__ = [
+    "AbastecimentoRepository",
+    "ChaveIdempotenciaRepository",
+    "ContagemDiariaRepository",
+    "EstatisticaPrecoRepository",
+    "ParticaoRepository",
+    "ResumoMotoristaRepository",
+    "RollupPostoRepository",
+]
\ No newline at end of file
@@ -1,52 +1,250 @@
-from typing import List, Optional, Sequence, Tuple
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from decimal import Decimal
 from datetime import datetime
+from types import SimpleNamespace
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import Insert, Row, select, func, and_, insert, text, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.idempotencia import normalizar_volume
+from app.core.media_preco import media_preco
+from app.core.metricas import instrumentar_repositorio
 from app.models.abastecimento import Abastecimento, TipoCombustivel
+from app.repositories.chave_idempotencia_repository import ChaveIdempotenciaRepository
+from app.repositories.contagem_diaria_repository import (
+    ContagemDiariaRepository,
+    estimar_bordas,
+    planejar_contagem,
+)
+from app.repositories.resumo_motorista_repository import ResumoMotoristaRepository
+from app.repositories.rollup_posto_repository import RollupPostoRepository
+from app.utils.datas import dia_utc
 
+# Colunas das consultas de leitura, na ordem dos campos de AbastecimentoResponse.
+# As listagens devolvem tuplas simples (Row) em vez de entidades ORM: nada de
+# identity map nem instrumentação de atributos por linha.
+COLUNAS_RESPOSTA = (
+    Abastecimento.id,
+    Abastecimento.id_posto,
+    Abastecimento.data_hora,
+    Abastecimento.tipo_combustivel,
+    Abastecimento.preco_por_litro,
+    Abastecimento.volume_abastecido,
+    Abastecimento.cpf_motorista,
+    Abastecimento.improper_data,
+    Abastecimento.created_at,
+)
 
+ABRIR_TRANSACAO = text("SELECT 1")
+
+# Equivale a SET LOCAL (vale só até o fim da transação corrente), mas como
+# expressão pode ir no WHERE do próprio comando de inserção
+SYNCHRONOUS_COMMIT_OFF = func.set_config("synchronous_commit", "off", True) == "off"
+
+# Colunas informadas no COPY; id e created_at ficam com o default do banco
+COLUNAS_COPY = (
+    "id_posto",
+    "data_hora",
+    "tipo_combustivel",
+    "preco_por_litro",
+    "volume_abastecido",
+    "cpf_motorista",
+    "improper_data",
+)
+
+
+@instrumentar_repositorio
 class AbastecimentoRepository:
     """Camada de acesso a dados para Abastecimento."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create(self, abastecimento: Abastecimento) -> Abastecimento:
-        self.session.add(abastecimento)
-        await self.session.commit()
-        await self.session.refresh(abastecimento)
+    @staticmethod
+    def _comandos_agregados(
+        abastecimentos: Sequence[Abastecimento],
+    ) -> List[Tuple[str, Insert]]:
+        """Upserts das tabelas derivadas para os abastecimentos, com nome."""
+        comandos = [
+            ("rollup", RollupPostoRepository.comando_acumular(abastecimentos)),
+            ("contagem", ContagemDiariaRepository.comando_acumular(abastecimentos)),
+            ("resumo", ResumoMotoristaRepository.comando_acumular(abastecimentos)),
+        ]
+        return [(nome, comando) for nome, comando in comandos if comando is not None]
+
+    async def _atualizar_agregados(
+        self, abastecimentos: Sequence[Abastecimento]
+    ) -> None:
+        """
+        Mantém as tabelas derivadas na mesma transação da inserção.
+        """
+        for _, comando in self._comandos_agregados(abastecimentos):
+            await self.session.execute(comando)
+
+    async def create(
+        self,
+        valores: dict,
+        chave_idempotencia: Optional[str] = None,
+        commit_assincrono: bool = False,
+    ) -> Row:
+        """
+        Insere um abastecimento com um único comando, fora da unit of work
+        do ORM: a linha volta completa (id e created_at do banco) sem flush
+        nem refresh.
+
+        O INSERT ... RETURNING vira uma CTE e os upserts das tabelas
+        derivadas (e a Idempotency-Key, se houver) entram como CTEs que
+        modificam dados no mesmo comando. Com o BEGIN e o COMMIT, são três
+        idas ao banco.
+
+        Com `commit_assincrono`, a transação usa synchronous_commit=off
+        (set_config local, no mesmo comando): o commit não espera o fsync
+        do WAL e uma queda do servidor pode perder as últimas transações
+        confirmadas (nunca corrompe dados).
+
+        Returns:
+            Row com as colunas de AbastecimentoResponse
+
+        Raises:
+            IntegrityError: Se a chave já existir (a transação é desfeita)
+        """
+        novo = (
+            insert(Abastecimento.__table__)
+            .values(valores)
+            .returning(*COLUNAS_RESPOSTA)
+            .cte("novo")
+        )
+        stmt = select(*novo.c)
+        for nome, comando in self._comandos_agregados(
+            [SimpleNamespace(**valores)]
+        ):
+            stmt = stmt.add_cte(comando.cte(nome))
+        if chave_idempotencia is not None:
+            stmt = stmt.add_cte(
+                ChaveIdempotenciaRepository.comando_registrar(
+                    chave_idempotencia, novo
+                ).cte("chave")
+            )
+        if commit_assincrono:
+            stmt = stmt.where(SYNCHRONOUS_COMMIT_OFF)
+
+        try:
+            result = await self.session.execute(stmt)
+            abastecimento = result.one()
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+
         return abastecimento
 
+    async def create_many(
+        self,
+        valores: Sequence[dict],
+        tamanho_chunk: int = 500,
+        chaves_idempotencia: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[Abastecimento]:
+        """
+        Insere vários abastecimentos em uma única transação.
+
+        Cada chunk vira um INSERT multi-linha com RETURNING, preservando a
+        ordem dos parâmetros para que o chamador possa correlacionar
+        entrada e saída. `chaves_idempotencia`, alinhada a `valores`, grava
+        as Idempotency-Keys presentes na mesma transação.
+
+        Raises:
+            IntegrityError: Se alguma chave já existir (nada é gravado)
+        """
+        criados: List[Abastecimento] = []
+        stmt = insert(Abastecimento).returning(
+            Abastecimento, sort_by_parameter_order=True
+        )
+
+        for inicio in range(0, len(valores), tamanho_chunk):
+            chunk = list(valores[inicio:inicio + tamanho_chunk])
+            result = await self.session.scalars(stmt, chunk)
+            criados.extend(result.all())
+
+        if chaves_idempotencia is not None:
+            await ChaveIdempotenciaRepository(self.session).registrar_lote([
+                (chave, criado)
+                for chave, criado in zip(chaves_idempotencia, criados)
+                if chave is not None
+            ])
+        await self._atualizar_agregados(criados)
+        await self.session.commit()
+        return criados
+
+    async def copiar(self, valores: Sequence[dict]) -> List[Abastecimento]:
+        """
+        Insere vários abastecimentos via COPY (asyncpg) e atualiza os
+        agregados, tudo em uma única transação: se os upserts ou o commit
+        falharem, as linhas copiadas são desfeitas junto.
+
+        Bem mais rápido que INSERT para cargas históricas, mas não retorna
+        ids: os objetos devolvidos são transientes (sem id/created_at) e
+        servem apenas para atualizar os agregados.
+        """
+        conexao = await self.session.connection()
+        try:
+            # O adaptador asyncpg só abre a transação no primeiro execute;
+            # sem isto o COPY, enviado direto ao driver, faria autocommit
+            await conexao.execute(ABRIR_TRANSACAO)
+            bruta = await conexao.get_raw_connection()
+
+            await bruta.driver_connection.copy_records_to_table(
+                Abastecimento.__tablename__,
+                columns=COLUNAS_COPY,
+                records=[
+                    tuple(
+                        getattr(v[coluna], "value", v[coluna]) for coluna in COLUNAS_COPY
+                    )
+                    for v in valores
+                ],
+            )
+
+            abastecimentos = [Abastecimento(**v) for v in valores]
+            await self._atualizar_agregados(abastecimentos)
+            await self.session.commit()
+        except BaseException:
+            await self.session.rollback()
+            raise
+
+        return abastecimentos
+
     async def get_media_preco_por_combustivel(
         self, tipo_combustivel: TipoCombustivel
     ) -> Decimal | None:
         """
         Retorna a média histórica de preço por combustível.
-        (Implementação mockada para o desafio.)
+
+        A média vem do agregador em memória (carregado na inicialização e
+        reconciliado periodicamente), sem consulta ao banco.
         """
-        medias_mockadas = {
-            TipoCombustivel.GASOLINA: Decimal("5.00"),
-            TipoCombustivel.ETANOL: Decimal("3.50"),
-            TipoCombustivel.DIESEL: Decimal("4.80"),
-        }
+        return media_preco.media(tipo_combustivel)
 
-        return medias_mockadas.get(tipo_combustivel)
-    
-    async def get_all(
+    async def get_agregados_preco(
         self,
-        page: int,
-        size: int,
+    ) -> List[Tuple[TipoCombustivel, Decimal, int]]:
+        """
+        Retorna soma e contagem de preços por combustível (um único GROUP BY).
+        """
+        result = await self.session.execute(
+            select(
+                Abastecimento.tipo_combustivel,
+                func.sum(Abastecimento.preco_por_litro),
+                func.count(Abastecimento.id),
+            ).group_by(Abastecimento.tipo_combustivel)
+        )
+        return [tuple(row) for row in result.all()]
+
+    @staticmethod
+    def _build_filters(
         tipo_combustivel: Optional[TipoCombustivel],
         data_inicio: Optional[datetime],
         data_fim: Optional[datetime],
-    ) -> Tuple[List[Abastecimento], int]:
-
-        query = select(Abastecimento)
-        count_query = select(func.count(Abastecimento.id))
-
+    ) -> list:
         filters = []
 
         if tipo_combustivel:
@@ -56,32 +254,342 @@ class AbastecimentoRepository:
         if data_fim:
             filters.append(Abastecimento.data_hora <= data_fim)
 
+        return filters
+
+    async def contar(
+        self,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+        estimar: bool = False,
+    ) -> int:
+        """
+        Conta os abastecimentos filtrados a partir dos buckets diários.
+
+        Os dias UTC inteiros do período são somados em contagens_diarias;
+        só os pedaços de dia nas bordas do filtro são contados em
+        abastecimentos (no máximo dois COUNTs, de menos de um dia cada).
+        Com `estimar`, nem isso: as bordas viram a fração do dia coberta
+        aplicada ao bucket do dia.
+        """
+        contagens = ContagemDiariaRepository(self.session)
+        dias, bordas = planejar_contagem(data_inicio, data_fim)
+
+        total = 0
+        if dias is not None:
+            total += await contagens.somar(tipo_combustivel, *dias)
+
+        if estimar:
+            quantidades = await contagens.get_por_dia(
+                tipo_combustivel, [dia_utc(de) for de, _ in bordas]
+            )
+            return total + round(estimar_bordas(bordas, quantidades))
+
+        for de, ate in bordas:
+            filters = [Abastecimento.data_hora >= de, Abastecimento.data_hora < ate]
+            if tipo_combustivel:
+                filters.append(Abastecimento.tipo_combustivel == tipo_combustivel)
+
+            result = await self.session.execute(
+                select(func.count(Abastecimento.id)).where(and_(*filters))
+            )
+            total += result.scalar() or 0
+
+        return total
+
+    async def get_all(
+        self,
+        page: int,
+        size: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+        modo_total: str = "exato",
+    ) -> Tuple[List[Row], Optional[int]]:
+        """
+        Retorna uma página (OFFSET) e o total conforme `modo_total`:
+        "exato" e "estimado" usam os buckets diários (ver `contar`);
+        "omitido" não conta e devolve None.
+        """
+        query = select(*COLUNAS_RESPOSTA)
+
+        filters = self._build_filters(tipo_combustivel, data_inicio, data_fim)
+
         if filters:
             query = query.where(and_(*filters))
-            count_query = count_query.where(and_(*filters))
 
-        total_result = await self.session.execute(count_query)
-        total = total_result.scalar() or 0
+        total = None
+        if modo_total != "omitido":
+            total = await self.contar(
+                tipo_combustivel,
+                data_inicio,
+                data_fim,
+                estimar=modo_total == "estimado",
+            )
 
         offset = (page - 1) * size
         query = (
             query
-            .order_by(Abastecimento.data_hora.desc())
+            .order_by(Abastecimento.data_hora.desc(), Abastecimento.id.desc())
             .offset(offset)
             .limit(size)
         )
 
         result = await self.session.execute(query)
-        items = result.scalars().all()
 
-        return list(items), total
-    
-    async def get_by_cpf(self, cpf: str) -> List[Abastecimento]:
+        return list(result.all()), total
+
+    async def get_all_keyset(
+        self,
+        size: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+        apos: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Row]:
+        """
+        Paginação keyset: busca até `size` registros após a posição `apos`.
+
+        A posição é o par (data_hora, id) do último registro já visto; a
+        comparação por row-value permite ao índice buscar direto o ponto de
+        continuação, sem percorrer as páginas anteriores como o OFFSET.
+        """
+        filters = self._build_filters(tipo_combustivel, data_inicio, data_fim)
+
+        if apos is not None:
+            filters.append(
+                tuple_(Abastecimento.data_hora, Abastecimento.id) < tuple_(*apos)
+            )
+
+        query = select(*COLUNAS_RESPOSTA)
+        if filters:
+            query = query.where(and_(*filters))
+
+        query = (
+            query
+            .order_by(Abastecimento.data_hora.desc(), Abastecimento.id.desc())
+            .limit(size)
+        )
+
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def stream_all(
+        self,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+        yield_per: int = 2000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Itera sobre todos os abastecimentos filtrados com cursor no servidor.
+
+        Uma única consulta, entregue em partições de `yield_per` linhas.
+        """
+        query = select(*COLUNAS_RESPOSTA)
+        filters = self._build_filters(tipo_combustivel, data_inicio, data_fim)
+        if filters:
+            query = query.where(and_(*filters))
+
+        result = await self.session.stream(
+            query
+            .order_by(Abastecimento.data_hora.desc(), Abastecimento.id.desc())
+            .execution_options(yield_per=yield_per)
+        )
+        async for particao in result.partitions():
+            yield particao
+
+    async def get_by_cpf(self, cpf: str) -> List[Row]:
         """
         Retorna todos os abastecimentos feitos por um motorista (CPF).
         """
         result = await self.session.execute(
-            select(Abastecimento).where(Abastecimento.cpf_motorista == cpf)
+            select(*COLUNAS_RESPOSTA).where(Abastecimento.cpf_motorista == cpf)
             .order_by(Abastecimento.data_hora.desc())
         )
-        return result.scalars().all()
+        return list(result.all())
+
+    async def count_by_cpf(self, cpf: str) -> int:
+        """
+        Conta os abastecimentos de um motorista (varredura só no índice de CPF).
+        """
+        result = await self.session.execute(
+            select(func.count(Abastecimento.id))
+            .where(Abastecimento.cpf_motorista == cpf)
+        )
+        return result.scalar() or 0
+
+    async def get_by_chave_natural(
+        self,
+        id_posto: int,
+        data_hora: datetime,
+        cpf_motorista: str,
+        volume_abastecido: Decimal,
+    ) -> Optional[Abastecimento]:
+        """
+        Busca um abastecimento igual (posto, data_hora, CPF e volume).
+
+        Usa o índice (cpf_motorista, data_hora): é uma busca pontual, sem
+        índice único dedicado.
+        """
+        result = await self.session.execute(
+            select(Abastecimento)
+            .where(
+                Abastecimento.cpf_motorista == cpf_motorista,
+                Abastecimento.data_hora == data_hora,
+                Abastecimento.id_posto == id_posto,
+                Abastecimento.volume_abastecido == normalizar_volume(volume_abastecido),
+            )
+            .order_by(Abastecimento.id)
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def stream_chaves_naturais(
+        self, desde: datetime, yield_per: int = 10_000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Itera, em partições, sobre as colunas da chave natural dos
+        abastecimentos com data_hora >= `desde` (carga do filtro de Bloom).
+        """
+        result = await self.session.stream(
+            select(
+                Abastecimento.id_posto,
+                Abastecimento.data_hora,
+                Abastecimento.cpf_motorista,
+                Abastecimento.volume_abastecido,
+            )
+            .where(Abastecimento.data_hora >= desde)
+            .execution_options(yield_per=yield_per)
+        )
+        async for particao in result.partitions():
+            yield particao
+
+    async def stream_janela_recente(
+        self, desde: datetime, yield_per: int = 10_000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Itera, em partições, sobre as colunas da camada quente dos
+        abastecimentos com data_hora >= `desde`.
+        """
+        result = await self.session.stream(
+            select(
+                Abastecimento.id,
+                Abastecimento.data_hora,
+                Abastecimento.tipo_combustivel,
+                Abastecimento.preco_por_litro,
+                Abastecimento.volume_abastecido,
+                Abastecimento.id_posto,
+                Abastecimento.improper_data,
+            )
+            .where(Abastecimento.data_hora >= desde)
+            .execution_options(yield_per=yield_per)
+        )
+        async for particao in result.partitions():
+            yield particao
+
+    async def get_serie_precos(
+        self,
+        inicio: datetime,
+        fim: datetime,
+        intervalo_segundos: int,
+        tipo_combustivel: Optional[TipoCombustivel] = None,
+        id_posto: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Agrega [inicio, fim) em baldes de `intervalo_segundos` (alinhados à
+        época, em UTC) por combustível; usado quando o período sai da
+        janela da camada quente.
+        """
+        balde = func.floor(
+            func.extract("epoch", Abastecimento.data_hora) / intervalo_segundos
+        ).label("balde")
+
+        filters = [Abastecimento.data_hora >= inicio, Abastecimento.data_hora < fim]
+        if tipo_combustivel is not None:
+            filters.append(Abastecimento.tipo_combustivel == tipo_combustivel)
+        if id_posto is not None:
+            filters.append(Abastecimento.id_posto == id_posto)
+
+        result = await self.session.execute(
+            select(
+                balde,
+                Abastecimento.tipo_combustivel,
+                func.count(Abastecimento.id).label("total_abastecimentos"),
+                func.avg(Abastecimento.preco_por_litro).label("preco_medio"),
+                func.min(Abastecimento.preco_por_litro).label("preco_min"),
+                func.max(Abastecimento.preco_por_litro).label("preco_max"),
+                func.sum(Abastecimento.volume_abastecido).label("litros_vendidos"),
+                func.count(Abastecimento.id)
+                .filter(Abastecimento.improper_data)
+                .label("quantidade_anomalias"),
+            )
+            .where(and_(*filters))
+            .group_by(balde, Abastecimento.tipo_combustivel)
+            .order_by(balde, Abastecimento.tipo_combustivel)
+        )
+        return list(result.all())
+
+    async def get_resumo_by_cpf(self, cpf: str) -> Row:
+        """
+        Calcula os totais do motorista com uma agregação no índice de CPF.
+
+        Alternativa ao resumo_motoristas quando o motorista ainda não tem
+        linha lá; devolve quantidade 0 se não houver abastecimentos.
+        """
+        result = await self.session.execute(
+            select(
+                func.count(Abastecimento.id).label("quantidade"),
+                func.sum(Abastecimento.volume_abastecido).label("litros"),
+                func.sum(
+                    Abastecimento.preco_por_litro * Abastecimento.volume_abastecido
+                ).label("gasto"),
+                func.count(Abastecimento.id)
+                .filter(Abastecimento.improper_data)
+                .label("quantidade_anomalias"),
+                func.min(Abastecimento.data_hora).label("primeiro_abastecimento"),
+                func.max(Abastecimento.data_hora).label("ultimo_abastecimento"),
+            ).where(Abastecimento.cpf_motorista == cpf)
+        )
+        return result.one()
+
+    async def get_by_cpf_keyset(
+        self,
+        cpf: str,
+        size: int,
+        apos: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Row]:
+        """
+        Retorna até `size` abastecimentos do motorista após a posição `apos`.
+        """
+        filters = [Abastecimento.cpf_motorista == cpf]
+
+        if apos is not None:
+            filters.append(
+                tuple_(Abastecimento.data_hora, Abastecimento.id) < tuple_(*apos)
+            )
+
+        result = await self.session.execute(
+            select(*COLUNAS_RESPOSTA).where(and_(*filters))
+            .order_by(Abastecimento.data_hora.desc(), Abastecimento.id.desc())
+            .limit(size)
+        )
+        return list(result.all())
+
+    async def stream_by_cpf(
+        self, cpf: str, yield_per: int = 500
+    ) -> AsyncIterator[Row]:
+        """
+        Itera sobre o histórico do motorista com cursor no servidor.
+
+        As linhas chegam em lotes de `yield_per`, mantendo o consumo de memória
+        constante independentemente do tamanho do histórico.
+        """
+        result = await self.session.stream(
+            select(*COLUNAS_RESPOSTA).where(Abastecimento.cpf_motorista == cpf)
+            .order_by(Abastecimento.data_hora.desc(), Abastecimento.id.desc())
+            .execution_options(yield_per=yield_per)
+        )
+        async for linha in result:
+            yield linha
+
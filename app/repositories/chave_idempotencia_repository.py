@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Insert, delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import instrumentar_repositorio
+from app.models.abastecimento import Abastecimento
+from app.models.chave_idempotencia import ChaveIdempotencia
+
+
+@instrumentar_repositorio
+class ChaveIdempotenciaRepository:
+    """Acesso às chaves de idempotência (chaves_idempotencia)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def comando_registrar(chave: str, novo) -> Insert:
+        """
+        Monta o INSERT da chave a partir de `novo`, a CTE do INSERT ...
+        RETURNING do abastecimento: chave e linha entram no mesmo comando.
+        """
+        return insert(ChaveIdempotencia).from_select(
+            ["chave", "id_abastecimento", "data_hora"],
+            select(literal(chave), novo.c.id, novo.c.data_hora),
+        )
+
+    async def registrar_lote(
+        self, pares: Sequence[Tuple[str, Abastecimento]]
+    ) -> None:
+        """
+        Grava as chaves de vários abastecimentos recém-inseridos em um só
+        INSERT. Não faz commit; uma chave repetida falha com IntegrityError.
+        """
+        if not pares:
+            return
+        await self.session.execute(
+            insert(ChaveIdempotencia),
+            [
+                {
+                    "chave": chave,
+                    "id_abastecimento": abastecimento.id,
+                    "data_hora": abastecimento.data_hora,
+                }
+                for chave, abastecimento in pares
+            ],
+        )
+
+    async def get_abastecimento(self, chave: str) -> Optional[Abastecimento]:
+        """Retorna o abastecimento criado com a chave, se houver."""
+        result = await self.session.execute(
+            select(ChaveIdempotencia.id_abastecimento, ChaveIdempotencia.data_hora)
+            .where(ChaveIdempotencia.chave == chave)
+        )
+        registro = result.first()
+        if registro is None:
+            return None
+
+        result = await self.session.execute(
+            select(Abastecimento).where(
+                Abastecimento.id == registro.id_abastecimento,
+                Abastecimento.data_hora == registro.data_hora,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def listar_chaves(self, desde: datetime) -> List[str]:
+        """Chaves gravadas a partir de `desde` (carga do filtro de Bloom)."""
+        result = await self.session.execute(
+            select(ChaveIdempotencia.chave).where(ChaveIdempotencia.created_at >= desde)
+        )
+        return list(result.scalars().all())
+
+    async def remover_anteriores(self, limite: datetime) -> int:
+        """
+        Apaga as chaves gravadas antes de `limite` (fora da janela de
+        deduplicação). Não faz commit.
+
+        Returns:
+            Quantidade de chaves apagadas
+        """
+        result = await self.session.execute(
+            delete(ChaveIdempotencia).where(ChaveIdempotencia.created_at < limite)
+        )
+        return result.rowcount
@@ -0,0 +1,197 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import instrumentar_repositorio
+from app.models.abastecimento import Abastecimento, TipoCombustivel
+from app.models.contagem_diaria import ContagemDiaria
+from app.utils.datas import dia_utc, para_utc
+
+Intervalo = Tuple[datetime, datetime]  # [de, ate)
+
+UM_DIA = timedelta(days=1)
+UM_MICROSSEGUNDO = timedelta(microseconds=1)
+
+
+def _inicio_dia(dia: date) -> datetime:
+    return datetime.combine(dia, time.min, tzinfo=timezone.utc)
+
+
+def planejar_contagem(
+    data_inicio: Optional[datetime],
+    data_fim: Optional[datetime],
+) -> Tuple[Optional[Tuple[Optional[date], Optional[date]]], List[Intervalo]]:
+    """
+    Divide o filtro [data_inicio, data_fim] em dias UTC inteiros e bordas.
+
+    Os dias inteiros são somados nos buckets; as bordas (pedaços de dia)
+    são contadas direto em abastecimentos. Cada borda fica dentro de um
+    único dia e é semiaberta: `data_fim` é inclusivo, então vira
+    `data_fim + 1µs` (a resolução do timestamp no PostgreSQL).
+
+    Returns:
+        (dias, bordas): `dias` é o par (primeiro, último) de dias inteiros,
+        com None para um lado sem limite, ou None se não houver dia inteiro
+    """
+    inicio = para_utc(data_inicio) if data_inicio else None
+    fim = para_utc(data_fim) + UM_MICROSSEGUNDO if data_fim else None
+
+    primeiro = ultimo = None
+    bordas: List[Intervalo] = []
+
+    if inicio is not None:
+        primeiro = dia_utc(inicio)
+        if inicio != _inicio_dia(primeiro):
+            primeiro += UM_DIA
+    if fim is not None:
+        ultimo = dia_utc(fim) - UM_DIA
+
+    if primeiro is not None and ultimo is not None and primeiro > ultimo:
+        # Menos de um dia inteiro: o intervalo todo é borda (no máximo dois dias)
+        de = inicio
+        while de < fim:
+            ate = min(_inicio_dia(dia_utc(de)) + UM_DIA, fim)
+            bordas.append((de, ate))
+            de = ate
+        return None, bordas
+
+    if inicio is not None and inicio != _inicio_dia(primeiro):
+        bordas.append((inicio, _inicio_dia(primeiro)))
+    if fim is not None and fim != _inicio_dia(ultimo + UM_DIA):
+        bordas.append((_inicio_dia(ultimo + UM_DIA), fim))
+
+    return (primeiro, ultimo), bordas
+
+
+def estimar_bordas(
+    bordas: Iterable[Intervalo], quantidades: Dict[date, int]
+) -> float:
+    """
+    Estima as bordas pela fração do dia coberta, supondo os
+    abastecimentos distribuídos uniformemente ao longo do dia.
+    """
+    total = 0.0
+    for de, ate in bordas:
+        fracao = (ate - de) / UM_DIA
+        total += quantidades.get(dia_utc(de), 0) * fracao
+    return total
+
+
+def agrupar_por_tipo_dia(abastecimentos: Sequence[Abastecimento]) -> List[dict]:
+    """
+    Conta abastecimentos por (tipo_combustivel, dia), com as chaves
+    ordenadas como no rollup por posto.
+    """
+    grupos: Dict[Tuple[str, date], int] = {}
+    for a in abastecimentos:
+        chave = (TipoCombustivel(a.tipo_combustivel).value, dia_utc(a.data_hora))
+        grupos[chave] = grupos.get(chave, 0) + 1
+
+    return [
+        {
+            "tipo_combustivel": TipoCombustivel(tipo),
+            "dia": dia,
+            "quantidade": grupos[(tipo, dia)],
+        }
+        for tipo, dia in sorted(grupos)
+    ]
+
+
+@instrumentar_repositorio
+class ContagemDiariaRepository:
+    """Acesso aos buckets de contagem por combustível e dia."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def acumular(self, abastecimentos: Sequence[Abastecimento]) -> None:
+        """
+        Soma os abastecimentos aos buckets com um único upsert multi-linha.
+
+        Não faz commit: deve rodar na mesma transação da inserção.
+        """
+        stmt = self.comando_acumular(abastecimentos)
+        if stmt is not None:
+            await self.session.execute(stmt)
+
+    @staticmethod
+    def comando_acumular(abastecimentos: Sequence[Abastecimento]) -> Optional[Insert]:
+        """
+        Monta o upsert de `acumular` sem executá-lo (None sem linhas); pode
+        entrar como CTE de outro comando.
+        """
+        linhas = agrupar_por_tipo_dia(abastecimentos)
+        if not linhas:
+            return None
+
+        stmt = insert(ContagemDiaria).values(linhas)
+        return stmt.on_conflict_do_update(
+            index_elements=[ContagemDiaria.tipo_combustivel, ContagemDiaria.dia],
+            set_={"quantidade": ContagemDiaria.quantidade + stmt.excluded.quantidade},
+        )
+
+    @staticmethod
+    def _build_filters(
+        tipo_combustivel: Optional[TipoCombustivel],
+        primeiro: Optional[date],
+        ultimo: Optional[date],
+    ) -> list:
+        filters = []
+
+        if tipo_combustivel:
+            filters.append(ContagemDiaria.tipo_combustivel == tipo_combustivel)
+        if primeiro:
+            filters.append(ContagemDiaria.dia >= primeiro)
+        if ultimo:
+            filters.append(ContagemDiaria.dia <= ultimo)
+
+        return filters
+
+    async def somar(
+        self,
+        tipo_combustivel: Optional[TipoCombustivel],
+        primeiro: Optional[date],
+        ultimo: Optional[date],
+    ) -> int:
+        """Soma os buckets dos dias [primeiro, ultimo] (None = sem limite)."""
+        query = select(func.coalesce(func.sum(ContagemDiaria.quantidade), 0))
+        filters = self._build_filters(tipo_combustivel, primeiro, ultimo)
+        if filters:
+            query = query.where(and_(*filters))
+
+        result = await self.session.execute(query)
+        return int(result.scalar())
+
+    async def get_por_dia(
+        self,
+        tipo_combustivel: Optional[TipoCombustivel],
+        dias: Sequence[date],
+    ) -> Dict[date, int]:
+        """Quantidade de cada dia informado (somando os combustíveis)."""
+        if not dias:
+            return {}
+
+        filters = [ContagemDiaria.dia.in_(sorted(set(dias)))]
+        if tipo_combustivel:
+            filters.append(ContagemDiaria.tipo_combustivel == tipo_combustivel)
+
+        result = await self.session.execute(
+            select(ContagemDiaria.dia, func.sum(ContagemDiaria.quantidade))
+            .where(and_(*filters))
+            .group_by(ContagemDiaria.dia)
+        )
+        return {dia: int(quantidade) for dia, quantidade in result.all()}
+
+    async def remover_periodo(self, inicio: date, fim: date) -> None:
+        """
+        Apaga os buckets dos dias em [inicio, fim), usado quando uma
+        partição sai da tabela. Não faz commit.
+        """
+        await self.session.execute(
+            delete(ContagemDiaria).where(
+                ContagemDiaria.dia >= inicio, ContagemDiaria.dia < fim
+            )
+        )
@@ -0,0 +1,65 @@
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import instrumentar_repositorio
+from app.models.abastecimento import TipoCombustivel
+from app.models.estatistica_preco_posto import EstatisticaPrecoPosto
+
+# Chave do advisory lock que serializa a fusão de snapshots entre processos
+TRAVA_SNAPSHOT = 0x45535450  # "ESTP"
+
+
+@instrumentar_repositorio
+class EstatisticaPrecoRepository:
+    """Snapshots dos sketches do detector de anomalias."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def listar(
+        self, chaves: Optional[Sequence[Tuple[int, TipoCombustivel]]] = None
+    ) -> List[EstatisticaPrecoPosto]:
+        """Snapshots de todos os postos, ou só das chaves (posto, combustível)."""
+        stmt = select(EstatisticaPrecoPosto)
+        if chaves is not None:
+            stmt = stmt.where(
+                tuple_(
+                    EstatisticaPrecoPosto.id_posto,
+                    EstatisticaPrecoPosto.tipo_combustivel,
+                ).in_(chaves)
+            )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def travar(self) -> None:
+        """
+        Advisory lock até o fim da transação: só um processo por vez lê e
+        regrava os snapshots, sem perder incrementos de outro worker.
+        """
+        await self.session.execute(select(func.pg_advisory_xact_lock(TRAVA_SNAPSHOT)))
+
+    async def salvar(self, linhas: Sequence[dict]) -> None:
+        """Grava (upsert) os snapshots informados e faz commit."""
+        if not linhas:
+            return
+
+        stmt = insert(EstatisticaPrecoPosto).values(list(linhas))
+        novo = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                EstatisticaPrecoPosto.id_posto,
+                EstatisticaPrecoPosto.tipo_combustivel,
+            ],
+            set_={
+                "quantidade": novo.quantidade,
+                "media": novo.media,
+                "variancia": novo.variancia,
+                "digest": novo.digest,
+                "atualizado_em": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
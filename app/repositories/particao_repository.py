@@ -0,0 +1,170 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import instrumentar_repositorio
+from app.repositories.contagem_diaria_repository import ContagemDiariaRepository
+from app.utils.particoes import (
+    limites_particao,
+    mes_da_particao,
+    nome_particao,
+    primeiro_dia_mes,
+    somar_meses,
+)
+
+PARTICAO_DEFAULT = "abastecimentos_default"
+
+
+@instrumentar_repositorio
+class ParticaoRepository:
+    """Manutenção das partições mensais da tabela abastecimentos."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def listar(self) -> List[str]:
+        """Retorna o nome de todas as partições anexadas, em ordem."""
+        result = await self.session.execute(
+            text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = 'abastecimentos'
+                ORDER BY c.relname
+                """
+            )
+        )
+        return list(result.scalars().all())
+
+    async def listar_meses(self) -> List[date]:
+        """Retorna os meses cobertos por partições mensais."""
+        return sorted(
+            mes for mes in map(mes_da_particao, await self.listar()) if mes
+        )
+
+    async def criar_particao(self, mes: date) -> bool:
+        """
+        Cria a partição do mês, se ainda não existir.
+
+        Linhas desse mês que tenham caído na partição default são movidas
+        para a nova partição na mesma transação (o PostgreSQL recusa criar a
+        partição enquanto elas estiverem na default).
+
+        Returns:
+            True se a partição foi criada
+        """
+        mes = primeiro_dia_mes(mes)
+        nome = nome_particao(mes)
+
+        if nome in await self.listar():
+            return False
+
+        inicio, fim = limites_particao(mes)
+        intervalo = {"inicio": inicio, "fim": fim}
+        bounds = (
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+        )
+
+        pendentes = await self.session.execute(
+            text(
+                f"""
+                SELECT EXISTS (
+                    SELECT 1 FROM {PARTICAO_DEFAULT}
+                    WHERE data_hora >= :inicio AND data_hora < :fim
+                )
+                """
+            ),
+            intervalo,
+        )
+
+        if not pendentes.scalar():
+            await self.session.execute(
+                text(f"CREATE TABLE {nome} PARTITION OF abastecimentos {bounds}")
+            )
+            return True
+
+        await self.session.execute(
+            text(f"ALTER TABLE abastecimentos DETACH PARTITION {PARTICAO_DEFAULT}")
+        )
+        await self.session.execute(
+            text(f"CREATE TABLE {nome} PARTITION OF abastecimentos {bounds}")
+        )
+        await self.session.execute(
+            text(
+                f"""
+                WITH movidas AS (
+                    DELETE FROM {PARTICAO_DEFAULT}
+                    WHERE data_hora >= :inicio AND data_hora < :fim
+                    RETURNING *
+                )
+                INSERT INTO abastecimentos SELECT * FROM movidas
+                """
+            ),
+            intervalo,
+        )
+        await self.session.execute(
+            text(
+                f"ALTER TABLE abastecimentos ATTACH PARTITION {PARTICAO_DEFAULT} DEFAULT"
+            )
+        )
+        return True
+
+    async def criar_particoes_futuras(self, referencia: date, meses: int) -> List[str]:
+        """
+        Garante partições do mês de `referencia` até `meses` meses à frente.
+
+        Returns:
+            Nomes das partições criadas
+        """
+        inicio = primeiro_dia_mes(referencia)
+        criadas = []
+
+        for deslocamento in range(meses + 1):
+            mes = somar_meses(inicio, deslocamento)
+            if await self.criar_particao(mes):
+                criadas.append(nome_particao(mes))
+
+        return criadas
+
+    async def remover_expiradas(
+        self, referencia: date, retencao_meses: int, modo: str = "detach"
+    ) -> List[str]:
+        """
+        Desanexa (detach) ou apaga (drop) partições anteriores à retenção.
+
+        Uma partição expira quando o mês inteiro é anterior a
+        `referencia` menos `retencao_meses` meses. Em modo detach a tabela
+        continua existindo fora do particionamento, para arquivamento. Nos
+        dois modos os buckets de contagem do mês são apagados, pois as
+        linhas deixam de fazer parte de abastecimentos.
+
+        Returns:
+            Nomes das partições removidas
+        """
+        if modo not in ("detach", "drop"):
+            raise ValueError(f"Modo de expurgo desconhecido: {modo}")
+
+        limite = somar_meses(primeiro_dia_mes(referencia), -retencao_meses)
+        removidas = []
+
+        for mes in await self.listar_meses():
+            if mes >= limite:
+                continue
+
+            nome = nome_particao(mes)
+            if modo == "drop":
+                await self.session.execute(text(f"DROP TABLE {nome}"))
+            else:
+                await self.session.execute(
+                    text(f"ALTER TABLE abastecimentos DETACH PARTITION {nome}")
+                )
+            await ContagemDiariaRepository(self.session).remover_periodo(
+                mes, somar_meses(mes, 1)
+            )
+            removidas.append(nome)
+
+        return removidas
@@ -0,0 +1,103 @@
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import instrumentar_repositorio
+from app.models.abastecimento import Abastecimento
+from app.models.resumo_motorista import ResumoMotorista
+
+
+def agrupar_por_motorista(abastecimentos: Sequence[Abastecimento]) -> List[dict]:
+    """
+    Consolida abastecimentos por CPF.
+
+    Assim como no rollup por posto, o lote é pré-agregado (uma linha por
+    chave no upsert) e as chaves saem ordenadas para evitar deadlocks.
+    """
+    grupos: Dict[str, dict] = {}
+
+    for a in abastecimentos:
+        gasto = a.preco_por_litro * a.volume_abastecido
+        grupo = grupos.get(a.cpf_motorista)
+
+        if grupo is None:
+            grupos[a.cpf_motorista] = {
+                "cpf_motorista": a.cpf_motorista,
+                "quantidade": 1,
+                "litros": a.volume_abastecido,
+                "gasto": gasto,
+                "quantidade_anomalias": int(bool(a.improper_data)),
+                "primeiro_abastecimento": a.data_hora,
+                "ultimo_abastecimento": a.data_hora,
+            }
+            continue
+
+        grupo["quantidade"] += 1
+        grupo["litros"] += a.volume_abastecido
+        grupo["gasto"] += gasto
+        grupo["quantidade_anomalias"] += int(bool(a.improper_data))
+        grupo["primeiro_abastecimento"] = min(grupo["primeiro_abastecimento"], a.data_hora)
+        grupo["ultimo_abastecimento"] = max(grupo["ultimo_abastecimento"], a.data_hora)
+
+    return [grupos[cpf] for cpf in sorted(grupos)]
+
+
+@instrumentar_repositorio
+class ResumoMotoristaRepository:
+    """Acesso ao resumo acumulado por motorista (resumo_motoristas)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def acumular(self, abastecimentos: Sequence[Abastecimento]) -> None:
+        """
+        Soma os abastecimentos ao resumo com um único upsert multi-linha.
+
+        Não faz commit: deve rodar na mesma transação da inserção.
+        """
+        stmt = self.comando_acumular(abastecimentos)
+        if stmt is not None:
+            await self.session.execute(stmt)
+
+    @staticmethod
+    def comando_acumular(abastecimentos: Sequence[Abastecimento]) -> Optional[Insert]:
+        """
+        Monta o upsert de `acumular` sem executá-lo (None sem linhas); pode
+        entrar como CTE de outro comando.
+        """
+        linhas = agrupar_por_motorista(abastecimentos)
+        if not linhas:
+            return None
+
+        stmt = insert(ResumoMotorista).values(linhas)
+        novo = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResumoMotorista.cpf_motorista],
+            set_={
+                "quantidade": ResumoMotorista.quantidade + novo.quantidade,
+                "litros": ResumoMotorista.litros + novo.litros,
+                "gasto": ResumoMotorista.gasto + novo.gasto,
+                "quantidade_anomalias": (
+                    ResumoMotorista.quantidade_anomalias + novo.quantidade_anomalias
+                ),
+                "primeiro_abastecimento": func.least(
+                    ResumoMotorista.primeiro_abastecimento,
+                    novo.primeiro_abastecimento,
+                ),
+                "ultimo_abastecimento": func.greatest(
+                    ResumoMotorista.ultimo_abastecimento,
+                    novo.ultimo_abastecimento,
+                ),
+                "atualizado_em": func.now(),
+            },
+        )
+        return stmt
+
+    async def get_by_cpf(self, cpf: str) -> Optional[ResumoMotorista]:
+        """Lê o resumo do motorista (busca pela PK)."""
+        result = await self.session.execute(
+            select(ResumoMotorista).where(ResumoMotorista.cpf_motorista == cpf)
+        )
+        return result.scalar_one_or_none()
@@ -0,0 +1,165 @@
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import instrumentar_repositorio
+from app.models.abastecimento import Abastecimento, TipoCombustivel
+from app.models.rollup_posto import RollupPosto
+from app.utils.datas import dia_utc
+
+
+def agrupar_por_posto_dia(
+    abastecimentos: Sequence[Abastecimento],
+) -> List[dict]:
+    """
+    Consolida abastecimentos por (id_posto, tipo_combustivel, dia).
+
+    Um INSERT ... ON CONFLICT não pode tocar a mesma chave duas vezes, então
+    o lote é pré-agregado; as chaves saem ordenadas para que transações
+    concorrentes travem as linhas sempre na mesma ordem (sem deadlock).
+    """
+    grupos: Dict[Tuple[int, str, date], dict] = {}
+
+    for a in abastecimentos:
+        tipo = TipoCombustivel(a.tipo_combustivel)
+        chave = (a.id_posto, tipo.value, dia_utc(a.data_hora))
+        grupo = grupos.get(chave)
+
+        if grupo is None:
+            grupos[chave] = {
+                "id_posto": a.id_posto,
+                "tipo_combustivel": tipo,
+                "dia": chave[2],
+                "quantidade": 1,
+                "soma_preco": a.preco_por_litro,
+                "preco_min": a.preco_por_litro,
+                "preco_max": a.preco_por_litro,
+                "litros": a.volume_abastecido,
+                "quantidade_anomalias": int(bool(a.improper_data)),
+            }
+            continue
+
+        grupo["quantidade"] += 1
+        grupo["soma_preco"] += a.preco_por_litro
+        grupo["preco_min"] = min(grupo["preco_min"], a.preco_por_litro)
+        grupo["preco_max"] = max(grupo["preco_max"], a.preco_por_litro)
+        grupo["litros"] += a.volume_abastecido
+        grupo["quantidade_anomalias"] += int(bool(a.improper_data))
+
+    return [grupos[chave] for chave in sorted(grupos)]
+
+
+@instrumentar_repositorio
+class RollupPostoRepository:
+    """Acesso ao agregado diário por posto (rollup_postos)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def acumular(self, abastecimentos: Sequence[Abastecimento]) -> None:
+        """
+        Soma os abastecimentos ao rollup com um único upsert multi-linha.
+
+        Não faz commit: deve rodar na mesma transação da inserção.
+        """
+        stmt = self.comando_acumular(abastecimentos)
+        if stmt is not None:
+            await self.session.execute(stmt)
+
+    @staticmethod
+    def comando_acumular(abastecimentos: Sequence[Abastecimento]) -> Optional[Insert]:
+        """
+        Monta o upsert de `acumular` sem executá-lo (None sem linhas); pode
+        entrar como CTE de outro comando.
+        """
+        linhas = agrupar_por_posto_dia(abastecimentos)
+        if not linhas:
+            return None
+
+        stmt = insert(RollupPosto).values(linhas)
+        novo = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                RollupPosto.id_posto,
+                RollupPosto.tipo_combustivel,
+                RollupPosto.dia,
+            ],
+            set_={
+                "quantidade": RollupPosto.quantidade + novo.quantidade,
+                "soma_preco": RollupPosto.soma_preco + novo.soma_preco,
+                "preco_min": func.least(RollupPosto.preco_min, novo.preco_min),
+                "preco_max": func.greatest(RollupPosto.preco_max, novo.preco_max),
+                "litros": RollupPosto.litros + novo.litros,
+                "quantidade_anomalias": (
+                    RollupPosto.quantidade_anomalias + novo.quantidade_anomalias
+                ),
+                "atualizado_em": func.now(),
+            },
+        )
+        return stmt
+
+    @staticmethod
+    def _build_filters(
+        id_posto: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[date],
+        data_fim: Optional[date],
+    ) -> list:
+        filters = [RollupPosto.id_posto == id_posto]
+
+        if tipo_combustivel:
+            filters.append(RollupPosto.tipo_combustivel == tipo_combustivel)
+        if data_inicio:
+            filters.append(RollupPosto.dia >= data_inicio)
+        if data_fim:
+            filters.append(RollupPosto.dia <= data_fim)
+
+        return filters
+
+    async def get_estatisticas(
+        self,
+        id_posto: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[date],
+        data_fim: Optional[date],
+    ) -> list:
+        """
+        Consolida o período por combustível lendo apenas o rollup.
+        """
+        filters = self._build_filters(id_posto, tipo_combustivel, data_inicio, data_fim)
+
+        result = await self.session.execute(
+            select(
+                RollupPosto.tipo_combustivel,
+                func.sum(RollupPosto.quantidade).label("quantidade"),
+                func.sum(RollupPosto.soma_preco).label("soma_preco"),
+                func.min(RollupPosto.preco_min).label("preco_min"),
+                func.max(RollupPosto.preco_max).label("preco_max"),
+                func.sum(RollupPosto.litros).label("litros"),
+                func.sum(RollupPosto.quantidade_anomalias).label("quantidade_anomalias"),
+            )
+            .where(and_(*filters))
+            .group_by(RollupPosto.tipo_combustivel)
+            .order_by(RollupPosto.tipo_combustivel)
+        )
+        return list(result.all())
+
+    async def get_diarias(
+        self,
+        id_posto: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[date],
+        data_fim: Optional[date],
+    ) -> List[RollupPosto]:
+        """Retorna as linhas diárias do rollup, da mais recente à mais antiga."""
+        filters = self._build_filters(id_posto, tipo_combustivel, data_inicio, data_fim)
+
+        result = await self.session.execute(
+            select(RollupPosto)
+            .where(and_(*filters))
+            .order_by(RollupPosto.dia.desc(), RollupPosto.tipo_combustivel)
+        )
+        return list(result.scalars().all())
@@ -3,11 +3,30 @@ from app.schemas.abastecimento import (
     AbastecimentoResponse,
     HistoricoResponse,
     AbastecimentoPagination,
+    LoteItemResultado,
+    LoteResponse,
 )
+from app.schemas.motorista import ResumoMotoristaResponse
+from app.schemas.posto import (
+    EstatisticaCombustivel,
+    EstatisticaDiaria,
+    EstatisticasDiariasResponse,
+    EstatisticasPostoResponse,
+)
+from app.schemas.serie import PontoSerie, SeriePrecosResponse
 
 __all__ = [
     "AbastecimentoCreate",
     "AbastecimentoResponse",
     "HistoricoResponse",
     "AbastecimentoPagination",
+    "LoteItemResultado",
+    "LoteResponse",
+    "ResumoMotoristaResponse",
+    "EstatisticaCombustivel",
+    "EstatisticaDiaria",
+    "EstatisticasDiariasResponse",
+    "EstatisticasPostoResponse",
+    "PontoSerie",
+    "SeriePrecosResponse",
 ]
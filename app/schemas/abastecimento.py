@@ -1,11 +1,11 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
 from app.models.abastecimento import TipoCombustivel
-from app.utils.validators import is_valid_cpf
+from app.utils.validators import normalizar_cpf
 
 
 class AbastecimentoCreate(BaseModel):
@@ -22,10 +22,11 @@ class AbastecimentoCreate(BaseModel):
     @classmethod
     def validate_cpf(cls, v: str) -> str:
         """Valida CPF do motorista."""
-        if not is_valid_cpf(v):
+        # Valida e retorna apenas dígitos (normaliza) na mesma passada
+        cpf = normalizar_cpf(v)
+        if cpf is None:
             raise ValueError("CPF inválido")
-        # Retorna apenas dígitos (normaliza)
-        return "".join(filter(str.isdigit, v))
+        return cpf
 
 
 class AbastecimentoResponse(BaseModel):
@@ -52,13 +53,33 @@ class HistoricoResponse(BaseModel):
     cpf_motorista: str
     total_abastecimentos: int
     abastecimentos: List[AbastecimentoResponse]
+    next_cursor: Optional[str] = None
 
 
 class AbastecimentoPagination(BaseModel):
     """Schema para resposta paginada de abastecimentos."""
     
     items: List[AbastecimentoResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
\ No newline at end of file
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class LoteItemResultado(BaseModel):
+    """Resultado individual de um item enviado em lote."""
+
+    indice: int
+    status: str  # "criado" ou "rejeitado"
+    abastecimento: Optional[AbastecimentoResponse] = None
+    erros: Optional[List[str]] = None
+
+
+class LoteResponse(BaseModel):
+    """Schema para resposta da ingestão em lote."""
+
+    total: int
+    criados: int
+    rejeitados: int
+    itens: List[LoteItemResultado]
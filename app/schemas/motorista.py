@@ -0,0 +1,17 @@
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class ResumoMotoristaResponse(BaseModel):
+    """Schema para os totais acumulados de um motorista."""
+
+    cpf_motorista: str
+    total_abastecimentos: int
+    litros_total: Decimal
+    gasto_total: Decimal
+    preco_medio: Decimal  # gasto / litros: preço efetivamente pago por litro
+    quantidade_anomalias: int
+    primeiro_abastecimento: datetime
+    ultimo_abastecimento: datetime
@@ -0,0 +1,44 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.models.abastecimento import TipoCombustivel
+
+
+class EstatisticaCombustivel(BaseModel):
+    """Estatísticas de um combustível no período consultado."""
+
+    tipo_combustivel: TipoCombustivel
+    total_abastecimentos: int
+    preco_medio: Decimal
+    preco_min: Decimal
+    preco_max: Decimal
+    litros_vendidos: Decimal
+    taxa_anomalia: float
+
+    class Config:
+        use_enum_values = True
+
+
+class EstatisticasPostoResponse(BaseModel):
+    """Schema para estatísticas consolidadas de um posto."""
+
+    id_posto: int
+    data_inicio: Optional[date]
+    data_fim: Optional[date]
+    combustiveis: List[EstatisticaCombustivel]
+
+
+class EstatisticaDiaria(EstatisticaCombustivel):
+    """Estatísticas de um combustível em um dia."""
+
+    dia: date
+
+
+class EstatisticasDiariasResponse(BaseModel):
+    """Schema para a série diária de estatísticas de um posto."""
+
+    id_posto: int
+    dias: List[EstatisticaDiaria]
@@ -0,0 +1,45 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+from app.models.abastecimento import TipoCombustivel
+
+# Intervalos aceitos pela série -> segundos
+INTERVALOS = {
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "6h": 21600,
+    "1d": 86400,
+}
+
+# Limite de intervalos por consulta (por combustível)
+MAX_INTERVALOS = 10_000
+
+
+class PontoSerie(BaseModel):
+    """Agregado de um combustível em um intervalo da série."""
+
+    inicio: datetime
+    tipo_combustivel: TipoCombustivel
+    total_abastecimentos: int
+    preco_medio: Decimal
+    preco_min: Decimal
+    preco_max: Decimal
+    litros_vendidos: Decimal
+    quantidade_anomalias: int
+
+    class Config:
+        use_enum_values = True
+
+
+class SeriePrecosResponse(BaseModel):
+    """Schema para a série temporal de preços por combustível."""
+
+    data_inicio: datetime
+    data_fim: datetime
+    intervalo: str
+    origem: Literal["memoria", "banco"]
+    pontos: List[PontoSerie]
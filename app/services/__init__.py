@@ -1,3 +1,4 @@
 from app.services.abastecimento_service import AbastecimentoService
+from app.services.posto_service import PostoService
 
-__all__ = ["AbastecimentoService"]
\ No newline at end of file
+__all__ = ["AbastecimentoService", "PostoService"]
\ No newline at end of file
@@ -1,63 +1,470 @@
 from decimal import Decimal
-from datetime import datetime
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.buffer_ingestao import buffer_ingestao
+from app.core.camada_quente import camada_quente
+from app.core.cache import cache_respostas, namespace_historico, namespace_lista
+from app.core.detector_anomalia import detector_anomalia
+from app.core.idempotencia import AbastecimentoDuplicado, indice_idempotencia
+from app.core.media_preco import media_preco
+from app.database import LEITURA_CACHEAVEL, roteador_leitura
 from app.models.abastecimento import Abastecimento, TipoCombustivel
-from app.schemas.abastecimento import AbastecimentoCreate, HistoricoResponse 
+from app.schemas.abastecimento import AbastecimentoCreate, AbastecimentoResponse
+from app.schemas.motorista import ResumoMotoristaResponse
+from app.schemas.serie import INTERVALOS, SeriePrecosResponse
 from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.repositories.chave_idempotencia_repository import ChaveIdempotenciaRepository
+from app.repositories.resumo_motorista_repository import ResumoMotoristaRepository
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.serializacao import (
+    cabecalho_csv,
+    serializar_csv,
+    serializar_historico,
+    serializar_linha_ndjson,
+    serializar_ndjson,
+    serializar_pagina,
+)
 
 
 LIMIAR_ANOMALIA = Decimal("1.25")  # +25%
 
 
+def _resumo(cpf_motorista: str, linha) -> ResumoMotoristaResponse:
+    litros = Decimal(linha.litros)
+    gasto = Decimal(linha.gasto)
+    return ResumoMotoristaResponse(
+        cpf_motorista=cpf_motorista,
+        total_abastecimentos=int(linha.quantidade),
+        litros_total=litros,
+        gasto_total=gasto.quantize(Decimal("0.01")),
+        preco_medio=(gasto / litros).quantize(Decimal("0.001")),
+        quantidade_anomalias=int(linha.quantidade_anomalias),
+        primeiro_abastecimento=linha.primeiro_abastecimento,
+        ultimo_abastecimento=linha.ultimo_abastecimento,
+    )
+
+
+def _ponto_serie(linha, intervalo_segundos: int) -> dict:
+    """Converte uma linha da série do banco no formato da camada quente."""
+    return {
+        "inicio": datetime.fromtimestamp(
+            int(linha.balde) * intervalo_segundos, tz=timezone.utc
+        ),
+        "tipo_combustivel": linha.tipo_combustivel,
+        "total_abastecimentos": linha.total_abastecimentos,
+        "preco_medio": Decimal(linha.preco_medio).quantize(Decimal("0.001")),
+        "preco_min": linha.preco_min,
+        "preco_max": linha.preco_max,
+        "litros_vendidos": linha.litros_vendidos,
+        "quantidade_anomalias": linha.quantidade_anomalias,
+    }
+
+
 class AbastecimentoService:
     """Serviço de domínio para regras de abastecimento."""
 
     def __init__(self, session: AsyncSession):
         self.repository = AbastecimentoRepository(session)
+        self.resumos = ResumoMotoristaRepository(session)
+        self.chaves = ChaveIdempotenciaRepository(session)
+        self.leitura_cacheavel = session.info.get(LEITURA_CACHEAVEL, True)
 
-    async def create_abastecimento(
-        self, data: AbastecimentoCreate
-    ) -> Abastecimento:
+    @staticmethod
+    def _is_anomalo(preco_por_litro: Decimal, media: Decimal | None) -> bool:
+        """Aplica a regra de anomalia (+25% sobre a média histórica)."""
+        if media is None:
+            return False
+        return preco_por_litro > media * LIMIAR_ANOMALIA
+
+    @classmethod
+    def _pontuar(cls, data: AbastecimentoCreate, media: Decimal | None) -> bool:
         """
-        Cria um abastecimento aplicando a regra de anomalia.
+        Usa o detector por posto; sem histórico suficiente no posto, cai na
+        regra de limiar sobre a média do combustível.
+        """
+        veredito = detector_anomalia.avaliar(
+            data.id_posto, data.tipo_combustivel, data.preco_por_litro
+        )
+        if veredito is None:
+            return cls._is_anomalo(data.preco_por_litro, media)
+        return veredito
+
+    @staticmethod
+    def _montar_valores(data: AbastecimentoCreate, improper_data: bool) -> dict:
+        return {
+            "id_posto": data.id_posto,
+            "data_hora": data.data_hora,
+            "tipo_combustivel": data.tipo_combustivel,
+            "preco_por_litro": data.preco_por_litro,
+            "volume_abastecido": data.volume_abastecido,
+            "cpf_motorista": data.cpf_motorista,
+            "improper_data": improper_data,
+        }
+
+    @staticmethod
+    async def _registrar_inseridos(abastecimentos: Sequence[Abastecimento]) -> None:
+        """
+        Atualiza os agregados em memória com registros já persistidos e
+        invalida as respostas em cache afetadas por eles.
+        """
+        namespaces = set()
+        for abastecimento in abastecimentos:
+            media_preco.registrar(
+                abastecimento.tipo_combustivel, abastecimento.preco_por_litro
+            )
+            detector_anomalia.registrar(
+                abastecimento.id_posto,
+                abastecimento.tipo_combustivel,
+                abastecimento.preco_por_litro,
+            )
+            indice_idempotencia.registrar(
+                abastecimento.id_posto,
+                abastecimento.data_hora,
+                abastecimento.cpf_motorista,
+                abastecimento.volume_abastecido,
+            )
+            camada_quente.registrar(abastecimento)
+            roteador_leitura.registrar_escrita(abastecimento.cpf_motorista)
+            namespaces.add(namespace_historico(abastecimento.cpf_motorista))
+            namespaces.add(namespace_lista(abastecimento.tipo_combustivel))
+
+        if namespaces:
+            namespaces.add(namespace_lista(None))
+            await cache_respostas.invalidar(*sorted(namespaces))
+
+    async def preparar_valores(self, data: AbastecimentoCreate) -> dict:
+        """
+        Aplica a regra de anomalia e retorna as colunas a inserir.
         """
         media_historica = await self.repository.get_media_preco_por_combustivel(
             data.tipo_combustivel
         )
 
-        improper_data = False
+        improper_data = self._pontuar(data, media_historica)
+
+        return self._montar_valores(data, improper_data)
+
+    async def verificar_duplicado(
+        self,
+        data: AbastecimentoCreate,
+        chave_idempotencia: Optional[str] = None,
+    ) -> None:
+        """
+        Detecta um reenvio antes da inserção.
+
+        Se o filtro de Bloom garante que a chave é nova, nada é consultado;
+        caso contrário a Idempotency-Key e a chave natural são conferidas
+        no banco.
+
+        Raises:
+            AbastecimentoDuplicado: Com o registro original
+        """
+        if not indice_idempotencia.ativo or not indice_idempotencia.talvez_duplicado(
+            data.id_posto,
+            data.data_hora,
+            data.cpf_motorista,
+            data.volume_abastecido,
+            chave_idempotencia,
+        ):
+            return
+
+        original = None
+        if chave_idempotencia is not None:
+            original = await self.chaves.get_abastecimento(chave_idempotencia)
+        if original is None:
+            original = await self.repository.get_by_chave_natural(
+                data.id_posto,
+                data.data_hora,
+                data.cpf_motorista,
+                data.volume_abastecido,
+            )
+        if original is not None:
+            raise AbastecimentoDuplicado(original)
+
+    async def create_abastecimento(
+        self,
+        data: AbastecimentoCreate,
+        chave_idempotencia: Optional[str] = None,
+        commit_assincrono: Optional[bool] = None,
+    ) -> AbastecimentoResponse:
+        """
+        Cria um abastecimento aplicando a regra de anomalia.
+
+        A resposta é montada direto da linha devolvida pelo INSERT ...
+        RETURNING. `commit_assincrono` (padrão: INGESTAO_COMMIT_ASSINCRONO)
+        confirma sem esperar o fsync do WAL.
+
+        Raises:
+            AbastecimentoDuplicado: Se outra requisição com a mesma
+                Idempotency-Key gravou primeiro
+        """
+        if commit_assincrono is None:
+            commit_assincrono = settings.ingestao_commit_assincrono
+        valores = await self.preparar_valores(data)
+
+        try:
+            linha = await self.repository.create(
+                valores,
+                chave_idempotencia=chave_idempotencia,
+                commit_assincrono=commit_assincrono,
+            )
+        except IntegrityError:
+            if chave_idempotencia is None:
+                raise
+            original = await self.chaves.get_abastecimento(chave_idempotencia)
+            if original is None:
+                raise
+            raise AbastecimentoDuplicado(original)
+
+        if chave_idempotencia is not None:
+            indice_idempotencia.registrar_chave(chave_idempotencia)
+
+        await self._registrar_inseridos([linha])
+        return AbastecimentoResponse.model_validate(linha)
+
+    async def enfileirar_abastecimento(
+        self,
+        data: AbastecimentoCreate,
+        chave_idempotencia: Optional[str] = None,
+    ) -> Optional[Abastecimento]:
+        """
+        Pontua o abastecimento e o entrega ao buffer write-behind; a
+        Idempotency-Key segue junto e é gravada na transação do lote.
+
+        Returns:
+            O registro gravado (durabilidade "aguardar") ou None quando o
+            registro apenas entrou na fila (durabilidade "aceitar")
+
+        Raises:
+            BufferCheio: Se a fila estiver cheia (backpressure)
+            BufferIndisponivel: Se o buffer estiver parado
+            BufferTimeout: Se a gravação não terminar a tempo
+            AbastecimentoDuplicado: Se outra requisição com a mesma
+                Idempotency-Key gravou primeiro
+        """
+        valores = await self.preparar_valores(data)
+        try:
+            return await buffer_ingestao.enfileirar(
+                valores,
+                aguardar=settings.ingestao_durabilidade == "aguardar",
+                chave_idempotencia=chave_idempotencia,
+            )
+        except IntegrityError:
+            if chave_idempotencia is None:
+                raise
+            original = await self.chaves.get_abastecimento(chave_idempotencia)
+            if original is None:
+                raise
+            raise AbastecimentoDuplicado(original)
+
+    async def persistir_valores(
+        self,
+        valores: List[dict],
+        chaves_idempotencia: Optional[List[Optional[str]]] = None,
+    ) -> List[Abastecimento]:
+        """
+        Grava valores já pontuados em uma transação (usado pelo buffer),
+        com as Idempotency-Keys alinhadas a `valores`, se houver.
+        """
+        criados = await self.repository.create_many(
+            valores,
+            tamanho_chunk=settings.lote_tamanho_chunk,
+            chaves_idempotencia=chaves_idempotencia,
+        )
+        for chave in chaves_idempotencia or ():
+            if chave is not None:
+                indice_idempotencia.registrar_chave(chave)
+        await self._registrar_inseridos(criados)
+        return criados
+
+    async def pontuar_lote(self, itens: Sequence[AbastecimentoCreate]) -> List[dict]:
+        """
+        Aplica a regra de anomalia a vários itens e retorna as colunas a
+        inserir; a média histórica é consultada uma vez por combustível.
+        """
+        medias: Dict[TipoCombustivel, Decimal | None] = {}
+        for tipo in {item.tipo_combustivel for item in itens}:
+            medias[tipo] = await self.repository.get_media_preco_por_combustivel(tipo)
+
+        return [
+            self._montar_valores(
+                item, self._pontuar(item, medias[item.tipo_combustivel])
+            )
+            for item in itens
+        ]
+
+    async def create_abastecimentos_lote(
+        self, itens: Sequence[AbastecimentoCreate]
+    ) -> List[Abastecimento]:
+        """
+        Cria vários abastecimentos de uma vez.
+
+        A média histórica é consultada uma única vez por tipo de combustível
+        presente no lote; os registros são gravados em uma só transação.
+        """
+        return await self.persistir_valores(await self.pontuar_lote(itens))
+
+    async def importar_lote(self, itens: Sequence[AbastecimentoCreate]) -> int:
+        """
+        Pontua e grava um lote via COPY (importação histórica).
+
+        Os agregados em memória são atualizados em seguida, de modo que os
+        lotes seguintes já são pontuados contra o histórico importado.
+        """
+        importados = await self.repository.copiar(await self.pontuar_lote(itens))
+        await self._registrar_inseridos(importados)
+        return len(importados)
+
+    async def get_historico_motorista(self, cpf_motorista: str) -> Optional[bytes]:
+        """
+        Retorna o histórico de abastecimentos de um motorista (CPF) já
+        serializado em JSON, ou None se o motorista não tiver abastecimentos.
+        """
+        async def carregar() -> bytes:
+            linhas = await self.repository.get_by_cpf(cpf_motorista)
+            if not linhas:
+                # Resposta vazia também fica em cache (vira 404 no router)
+                return b""
+
+            return serializar_historico(cpf_motorista, len(linhas), linhas)
+
+        resposta = await cache_respostas.obter_ou_carregar(
+            namespace_historico(cpf_motorista),
+            {"modo": "completo"},
+            carregar,
+            guardar=self.leitura_cacheavel,
+        )
+        return resposta or None
+
+    async def get_historico_motorista_paginado(
+        self,
+        cpf_motorista: str,
+        size: int,
+        cursor: Optional[str] = None,
+    ) -> Optional[bytes]:
+        """
+        Retorna uma página keyset do histórico do motorista em JSON, ou None
+        se o motorista não tiver abastecimentos.
 
-        if media_historica is not None:
-            if data.preco_por_litro > media_historica * LIMIAR_ANOMALIA:
-                improper_data = True
+        O total vem de um COUNT no índice de CPF, sem carregar o histórico.
 
-        abastecimento = Abastecimento(
-            id_posto=data.id_posto,
-            data_hora=data.data_hora,
-            tipo_combustivel=data.tipo_combustivel,
-            preco_por_litro=data.preco_por_litro,
-            volume_abastecido=data.volume_abastecido,
-            cpf_motorista=data.cpf_motorista,
-            improper_data=improper_data,
+        Raises:
+            ValueError: Se o cursor informado for inválido
+        """
+        apos = decode_cursor(cursor) if cursor else None
+
+        total = await self.repository.count_by_cpf(cpf_motorista)
+        if not total:
+            return None
+
+        linhas = await self.repository.get_by_cpf_keyset(
+            cpf_motorista, size=size + 1, apos=apos
         )
 
-        return await self.repository.create(abastecimento)
+        next_cursor = None
+        if len(linhas) > size:
+            linhas = linhas[:size]
+            next_cursor = encode_cursor(linhas[-1].data_hora, linhas[-1].id)
+
+        return serializar_historico(cpf_motorista, total, linhas, next_cursor)
 
-    async def get_historico_motorista(self, cpf_motorista: str) -> HistoricoResponse:
+    async def get_resumo_motorista(
+        self, cpf_motorista: str
+    ) -> Optional[ResumoMotoristaResponse]:
         """
-        Retorna o histórico de abastecimentos de um motorista (CPF).
+        Retorna os totais do motorista, ou None se ele não tiver abastecimentos.
+
+        Lê a linha de resumo_motoristas (busca pela PK); se ela não existir,
+        agrega direto em abastecimentos pelo índice de CPF.
+        """
+        linha = await self.resumos.get_by_cpf(cpf_motorista)
+        if linha is None:
+            linha = await self.repository.get_resumo_by_cpf(cpf_motorista)
+            if not linha.quantidade:
+                return None
+
+        return _resumo(cpf_motorista, linha)
+
+    async def get_serie_precos(
+        self,
+        data_inicio: datetime,
+        data_fim: datetime,
+        intervalo: str,
+        tipo_combustivel: Optional[TipoCombustivel] = None,
+        id_posto: Optional[int] = None,
+    ) -> SeriePrecosResponse:
+        """
+        Série de preços por combustível em [data_inicio, data_fim).
+
+        Períodos dentro da janela da camada quente são agregados em memória;
+        os demais, com um GROUP BY no banco.
         """
-        abastecimentos = await self.repository.get_by_cpf(cpf_motorista)
+        segundos = INTERVALOS[intervalo]
 
-        return HistoricoResponse(
-            cpf_motorista=cpf_motorista,
-            total_abastecimentos=len(abastecimentos),
-            abastecimentos=abastecimentos,
+        if camada_quente.cobre(data_inicio):
+            origem = "memoria"
+            pontos = camada_quente.series(
+                data_inicio, data_fim, segundos, tipo_combustivel, id_posto
+            )
+        else:
+            origem = "banco"
+            linhas = await self.repository.get_serie_precos(
+                data_inicio, data_fim, segundos, tipo_combustivel, id_posto
+            )
+            pontos = [_ponto_serie(linha, segundos) for linha in linhas]
+
+        return SeriePrecosResponse(
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            intervalo=intervalo,
+            origem=origem,
+            pontos=pontos,
         )
-    
+
+    async def contar_abastecimentos_motorista(self, cpf_motorista: str) -> int:
+        return await self.repository.count_by_cpf(cpf_motorista)
+
+    async def stream_historico_motorista(
+        self, cpf_motorista: str
+    ) -> AsyncIterator[bytes]:
+        """
+        Gera o histórico do motorista em NDJSON, uma linha por abastecimento.
+        """
+        async for linha in self.repository.stream_by_cpf(
+            cpf_motorista, yield_per=settings.historico_yield_per
+        ):
+            yield serializar_linha_ndjson(linha)
+
+    async def exportar_abastecimentos(
+        self,
+        formato: str,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+    ) -> AsyncIterator[bytes]:
+        """
+        Gera todos os abastecimentos filtrados em CSV ou NDJSON.
+
+        Uma consulta com cursor no servidor; cada partição de linhas vira
+        um único bloco de bytes, então a memória não cresce com o total.
+        """
+        serializar = serializar_csv if formato == "csv" else serializar_ndjson
+        if formato == "csv":
+            yield cabecalho_csv()
+
+        async for linhas in self.repository.stream_all(
+            tipo_combustivel,
+            data_inicio,
+            data_fim,
+            yield_per=settings.exportacao_yield_per,
+        ):
+            yield serializar(linhas)
+
     async def list_abastecimentos(
         self,
         page: int,
@@ -65,16 +472,86 @@ class AbastecimentoService:
         tipo_combustivel: Optional[TipoCombustivel],
         data_inicio: Optional[datetime],
         data_fim: Optional[datetime],
-    ) -> Tuple[List[Abastecimento], int]:
+        modo_total: Optional[str] = None,
+    ) -> bytes:
+        """
+        Retorna uma lista paginada de abastecimentos, já serializada em JSON.
+
+        `modo_total` ("exato", "estimado" ou "omitido"; padrão em
+        LISTAGEM_TOTAL_MODO) define como `total` é calculado. Sem total
+        exato, o cursor da próxima página é emitido sempre que a página
+        vem cheia (a seguinte pode estar vazia).
+        """
+        modo_total = modo_total or settings.listagem_total_modo
+
+        async def carregar() -> bytes:
+            linhas, total = await self.repository.get_all(
+                page=page,
+                size=size,
+                tipo_combustivel=tipo_combustivel,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                modo_total=modo_total,
+            )
+
+            if modo_total == "exato":
+                tem_proxima = page * size < total
+            else:
+                tem_proxima = len(linhas) == size
+
+            next_cursor = None
+            if linhas and tem_proxima:
+                next_cursor = encode_cursor(linhas[-1].data_hora, linhas[-1].id)
+
+            return serializar_pagina(
+                linhas,
+                size=size,
+                total=total,
+                page=page,
+                pages=None if total is None else (total + size - 1) // size,
+                next_cursor=next_cursor,
+            )
+
+        return await cache_respostas.obter_ou_carregar(
+            namespace_lista(tipo_combustivel),
+            {
+                "page": page,
+                "size": size,
+                "data_inicio": data_inicio,
+                "data_fim": data_fim,
+                "total": modo_total,
+            },
+            carregar,
+            guardar=self.leitura_cacheavel,
+        )
+
+    async def list_abastecimentos_cursor(
+        self,
+        size: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+        cursor: Optional[str] = None,
+    ) -> bytes:
         """
-        Retorna uma lista paginada de abastecimentos com filtros opcionais.
+        Retorna uma página keyset em JSON, com o cursor da página seguinte.
+
+        Raises:
+            ValueError: Se o cursor informado for inválido
         """
-        return await self.repository.get_all(
-            page=page,
-            size=size,
+        apos = decode_cursor(cursor) if cursor else None
+
+        linhas = await self.repository.get_all_keyset(
+            size=size + 1,
             tipo_combustivel=tipo_combustivel,
             data_inicio=data_inicio,
             data_fim=data_fim,
+            apos=apos,
         )
 
-    
\ No newline at end of file
+        next_cursor = None
+        if len(linhas) > size:
+            linhas = linhas[:size]
+            next_cursor = encode_cursor(linhas[-1].data_hora, linhas[-1].id)
+
+        return serializar_pagina(linhas, size=size, next_cursor=next_cursor)
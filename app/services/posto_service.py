@@ -0,0 +1,75 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.rollup_posto_repository import RollupPostoRepository
+from app.schemas.posto import (
+    EstatisticaCombustivel,
+    EstatisticaDiaria,
+    EstatisticasDiariasResponse,
+    EstatisticasPostoResponse,
+)
+
+
+def _estatistica(linha) -> dict:
+    quantidade = int(linha.quantidade)
+    return {
+        "tipo_combustivel": linha.tipo_combustivel,
+        "total_abastecimentos": quantidade,
+        "preco_medio": (Decimal(linha.soma_preco) / quantidade).quantize(Decimal("0.001")),
+        "preco_min": linha.preco_min,
+        "preco_max": linha.preco_max,
+        "litros_vendidos": linha.litros,
+        "taxa_anomalia": round(int(linha.quantidade_anomalias) / quantidade, 4),
+    }
+
+
+class PostoService:
+    """Serviço de estatísticas por posto, lidas do rollup diário."""
+
+    def __init__(self, session: AsyncSession):
+        self.repository = RollupPostoRepository(session)
+
+    async def get_estatisticas(
+        self,
+        id_posto: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[date],
+        data_fim: Optional[date],
+    ) -> EstatisticasPostoResponse:
+        """
+        Consolida preço médio/mínimo/máximo, litros e taxa de anomalia por
+        combustível no período.
+        """
+        linhas = await self.repository.get_estatisticas(
+            id_posto, tipo_combustivel, data_inicio, data_fim
+        )
+
+        return EstatisticasPostoResponse(
+            id_posto=id_posto,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            combustiveis=[EstatisticaCombustivel(**_estatistica(l)) for l in linhas],
+        )
+
+    async def get_estatisticas_diarias(
+        self,
+        id_posto: int,
+        tipo_combustivel: Optional[TipoCombustivel],
+        data_inicio: Optional[date],
+        data_fim: Optional[date],
+    ) -> EstatisticasDiariasResponse:
+        """
+        Retorna a série diária de estatísticas por combustível.
+        """
+        linhas = await self.repository.get_diarias(
+            id_posto, tipo_combustivel, data_inicio, data_fim
+        )
+
+        return EstatisticasDiariasResponse(
+            id_posto=id_posto,
+            dias=[EstatisticaDiaria(dia=l.dia, **_estatistica(l)) for l in linhas],
+        )
@@ -0,0 +1,263 @@
+"""Tarefas de manutenção executadas em segundo plano pela aplicação."""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.camada_quente import camada_quente
+from app.core.detector_anomalia import detector_anomalia
+from app.core.idempotencia import indice_idempotencia
+from app.core.media_preco import media_preco
+from app.database import AsyncSessionLocal, monitor_saude, roteador_leitura
+from app.models.abastecimento import Abastecimento
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.repositories.chave_idempotencia_repository import ChaveIdempotenciaRepository
+from app.repositories.contagem_diaria_repository import ContagemDiariaRepository
+from app.repositories.estatistica_preco_repository import EstatisticaPrecoRepository
+from app.repositories.resumo_motorista_repository import ResumoMotoristaRepository
+from app.services.abastecimento_service import AbastecimentoService
+
+logger = logging.getLogger(__name__)
+
+CPF_AQUECIMENTO = "00000000000"  # não existe: as consultas não retornam nada
+
+
+async def carregar_medias_preco() -> None:
+    """Carrega o agregador de médias com um único GROUP BY no banco."""
+    async with AsyncSessionLocal() as session:
+        agregados = await AbastecimentoRepository(session).get_agregados_preco()
+    media_preco.carregar(agregados)
+
+
+async def reconciliar_medias_periodicamente(intervalo_segundos: int) -> None:
+    """
+    Recarrega periodicamente as médias a partir do banco.
+
+    Corrige divergências entre workers (cada um só enxerga as próprias
+    inserções) e inserções feitas fora da API.
+    """
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            await carregar_medias_preco()
+        except Exception:
+            logger.exception("Falha ao reconciliar médias de preço")
+
+
+async def persistir_lote_buffer(
+    valores: List[dict], chaves_idempotencia: List[Optional[str]]
+) -> List[Abastecimento]:
+    """Grava um lote do buffer write-behind em uma sessão própria."""
+    async with AsyncSessionLocal() as session:
+        return await AbastecimentoService(session).persistir_valores(
+            valores, chaves_idempotencia
+        )
+
+
+async def carregar_filtro_idempotencia() -> None:
+    """
+    Preenche o filtro de Bloom com as chaves naturais da janela recente e
+    as Idempotency-Keys gravadas; só então ele passa a dispensar o banco.
+    """
+    desde = indice_idempotencia.inicio_janela()
+    async with AsyncSessionLocal() as session:
+        async for linhas in AbastecimentoRepository(session).stream_chaves_naturais(desde):
+            indice_idempotencia.carregar(linhas)
+        for chave in await ChaveIdempotenciaRepository(session).listar_chaves(desde):
+            indice_idempotencia.registrar_chave(chave)
+    indice_idempotencia.cobertura_desde = desde
+
+
+async def carregar_camada_quente() -> None:
+    """
+    (Re)carrega a camada quente com a janela recente; até terminar, as
+    séries continuam vindo do estado anterior (ou do banco).
+    """
+    desde = camada_quente.inicio_janela()
+    camada_quente.iniciar_carga()
+    try:
+        async with AsyncSessionLocal() as session:
+            async for linhas in AbastecimentoRepository(session).stream_janela_recente(desde):
+                camada_quente.carregar(linhas)
+    except BaseException:
+        camada_quente.abortar_carga()
+        raise
+    camada_quente.concluir_carga(desde)
+
+
+async def manter_camada_quente_periodicamente(
+    intervalo_segundos: int, recarga_segundos: int = 0
+) -> None:
+    """
+    Descarta o que saiu da janela e, com `recarga_segundos`, recarrega do
+    banco (inserções de outros workers ou feitas fora da API).
+    """
+    ultima_recarga = time.monotonic()
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            if recarga_segundos and time.monotonic() - ultima_recarga >= recarga_segundos:
+                await carregar_camada_quente()
+                ultima_recarga = time.monotonic()
+            else:
+                camada_quente.expurgar()
+        except Exception:
+            logger.exception("Falha ao manter a camada quente")
+
+
+async def expurgar_chaves_idempotencia() -> int:
+    """Apaga as Idempotency-Keys mais antigas que a janela de deduplicação."""
+    async with AsyncSessionLocal() as session:
+        removidas = await ChaveIdempotenciaRepository(session).remover_anteriores(
+            indice_idempotencia.inicio_janela()
+        )
+        await session.commit()
+    return removidas
+
+
+async def expurgar_chaves_periodicamente(intervalo_segundos: int) -> None:
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            await expurgar_chaves_idempotencia()
+        except Exception:
+            logger.exception("Falha ao expurgar chaves de idempotência")
+
+
+async def carregar_detector_anomalia() -> None:
+    """Restaura os sketches do detector a partir do último snapshot."""
+    async with AsyncSessionLocal() as session:
+        linhas = await EstatisticaPrecoRepository(session).listar()
+    detector_anomalia.carregar(linhas)
+
+
+async def salvar_snapshot_detector() -> None:
+    """
+    Funde no snapshot do banco os pontos registrados por este processo
+    desde o último snapshot e recarrega os sketches de todos os postos,
+    trazendo os incrementos de outros workers e da importação.
+    """
+    linhas = detector_anomalia.exportar()
+
+    async with AsyncSessionLocal() as session:
+        repository = EstatisticaPrecoRepository(session)
+        if linhas:
+            try:
+                await repository.travar()
+                atuais = await repository.listar(
+                    [(l["id_posto"], l["tipo_combustivel"]) for l in linhas]
+                )
+                await repository.salvar(
+                    detector_anomalia.mesclar_snapshot(atuais, linhas)
+                )
+            except Exception:
+                detector_anomalia.restaurar_alterados(linhas)
+                raise
+
+        detector_anomalia.carregar(await repository.listar())
+
+
+async def snapshot_detector_periodicamente(intervalo_segundos: int) -> None:
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            await salvar_snapshot_detector()
+        except Exception:
+            logger.exception("Falha ao gravar snapshot do detector de anomalias")
+
+
+async def verificar_replicas_periodicamente(intervalo_segundos: float) -> None:
+    """Mede saúde e atraso das réplicas de leitura."""
+    while True:
+        try:
+            await roteador_leitura.verificar()
+        except Exception:
+            logger.exception("Falha ao verificar réplicas de leitura")
+        await asyncio.sleep(intervalo_segundos)
+
+
+async def verificar_saude_periodicamente(intervalo_segundos: float) -> None:
+    """Atualiza o estado servido pelo /health (uma verificação por vez)."""
+    while True:
+        await monitor_saude.verificar()
+        await asyncio.sleep(intervalo_segundos)
+
+
+async def preparar_consultas(session: AsyncSession, leitura: bool = False) -> None:
+    """
+    Executa uma vez as consultas quentes na conexão da sessão.
+
+    O asyncpg guarda os prepared statements por conexão: a primeira
+    requisição que usa cada conexão já encontra o plano preparado. Os
+    LIMIT/OFFSET são parâmetros, então o SQL é o mesmo das requisições
+    reais; os argumentos apenas garantem buscas vazias pelo índice.
+    """
+    repository = AbastecimentoRepository(session)
+    await repository.get_all(
+        page=1, size=1, tipo_combustivel=None, data_inicio=None, data_fim=None
+    )
+    await repository.get_all_keyset(
+        size=1, tipo_combustivel=None, data_inicio=None, data_fim=None
+    )
+    await repository.get_by_cpf_keyset(CPF_AQUECIMENTO, size=1)
+    await repository.count_by_cpf(CPF_AQUECIMENTO)
+    await repository.get_by_cpf(CPF_AQUECIMENTO)
+    await ResumoMotoristaRepository(session).get_by_cpf(CPF_AQUECIMENTO)
+    await ContagemDiariaRepository(session).somar(None, None, None)
+
+    if not leitura:
+        # Conferência de duplicatas, feita no primário a cada criação
+        await repository.get_by_chave_natural(
+            0, datetime.now(timezone.utc), CPF_AQUECIMENTO, Decimal("0")
+        )
+        await ChaveIdempotenciaRepository(session).get_abastecimento("")
+
+
+async def aquecer_pool(
+    fabrica: Callable[[], AsyncSession], quantidade: int, leitura: bool = False
+) -> None:
+    """
+    Abre `quantidade` conexões ao mesmo tempo (para que sejam conexões
+    distintas do pool) e prepara as consultas em cada uma; ao final, todas
+    voltam ao pool já abertas.
+    """
+    concluidas = 0
+    todas = asyncio.Event()
+
+    async def aquecer_uma() -> None:
+        nonlocal concluidas
+        async with fabrica() as session:
+            try:
+                await preparar_consultas(session, leitura=leitura)
+            finally:
+                concluidas += 1
+                if concluidas == quantidade:
+                    todas.set()
+            # Segura a conexão até as demais terem sido abertas
+            await todas.wait()
+
+    resultados = await asyncio.gather(
+        *(aquecer_uma() for _ in range(quantidade)), return_exceptions=True
+    )
+    for resultado in resultados:
+        if isinstance(resultado, BaseException):
+            raise resultado
+
+
+async def aquecer_conexoes(quantidade: int) -> None:
+    """Aquece o pool do primário e, sem bloquear em caso de falha, o de cada réplica."""
+    quantidade = min(quantidade, settings.db_pool_size)
+    if quantidade <= 0:
+        return
+
+    await aquecer_pool(AsyncSessionLocal, quantidade)
+    for replica in roteador_leitura.replicas:
+        try:
+            await aquecer_pool(replica.sessoes, quantidade, leitura=True)
+        except Exception:
+            logger.exception("Falha ao aquecer conexões da %s", replica.nome)
@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(data_hora: datetime, id: int) -> str:
+    """
+    Gera um cursor opaco para paginação keyset.
+
+    Args:
+        data_hora: data_hora do último registro retornado
+        id: id do último registro retornado (desempate)
+
+    Returns:
+        String base64 url-safe, sem padding
+    """
+    payload = json.dumps(
+        {"d": data_hora.isoformat(), "i": id}, separators=(",", ":")
+    ).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica um cursor gerado por encode_cursor.
+
+    Returns:
+        Tupla (data_hora, id) do último registro visto
+
+    Raises:
+        ValueError: Se o cursor estiver malformado
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(payload["d"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
@@ -0,0 +1,17 @@
+from datetime import date, datetime, timezone
+
+
+def dia_utc(valor: datetime) -> date:
+    """
+    Dia (UTC) de um instante; datas sem fuso são tratadas como UTC.
+    """
+    if valor.tzinfo is None:
+        return valor.date()
+    return valor.astimezone(timezone.utc).date()
+
+
+def para_utc(valor: datetime) -> datetime:
+    """Converte para UTC; datas sem fuso são tratadas como UTC."""
+    if valor.tzinfo is None:
+        return valor.replace(tzinfo=timezone.utc)
+    return valor.astimezone(timezone.utc)
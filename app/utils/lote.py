@@ -0,0 +1,91 @@
+import json
+from typing import Any, List, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas.abastecimento import AbastecimentoCreate, LoteItemResultado
+from app.utils.validators import normalizar_cpfs
+
+
+def ler_itens_lote(corpo: bytes, ndjson: bool) -> List[Any]:
+    """
+    Decodifica o corpo de uma requisição em lote.
+
+    Args:
+        corpo: Bytes recebidos na requisição
+        ndjson: True se o corpo é NDJSON (um objeto JSON por linha)
+
+    Returns:
+        Lista de itens brutos. Linhas NDJSON malformadas viram instâncias de
+        ValueError, para que sejam rejeitadas individualmente.
+
+    Raises:
+        ValueError: Se o corpo JSON não for um array válido
+    """
+    if ndjson:
+        itens: List[Any] = []
+        for linha in corpo.splitlines():
+            if not linha.strip():
+                continue
+            try:
+                itens.append(json.loads(linha))
+            except json.JSONDecodeError as e:
+                itens.append(ValueError(f"JSON inválido: {e.msg}"))
+        return itens
+
+    try:
+        itens = json.loads(corpo)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON inválido: {e.msg}") from e
+
+    if not isinstance(itens, list):
+        raise ValueError("O corpo deve ser um array de abastecimentos")
+
+    return itens
+
+
+def _formatar_erros(erro: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(parte) for parte in e['loc']) or 'item'}: {e['msg']}"
+        for e in erro.errors()
+    ]
+
+
+def validar_itens_lote(
+    itens: List[Any],
+) -> Tuple[List[Tuple[int, AbastecimentoCreate]], List[LoteItemResultado]]:
+    """
+    Valida cada item do lote com as regras de AbastecimentoCreate.
+
+    Returns:
+        Tupla (válidos, rejeitados): válidos como pares (índice, schema) e
+        rejeitados já no formato de resultado por item.
+    """
+    validos: List[Tuple[int, AbastecimentoCreate]] = []
+    rejeitados: List[LoteItemResultado] = []
+
+    # Valida todos os CPFs do lote de uma vez; a validação por item abaixo
+    # encontra o resultado no memo
+    normalizar_cpfs([
+        item["cpf_motorista"]
+        for item in itens
+        if isinstance(item, dict) and isinstance(item.get("cpf_motorista"), str)
+    ])
+
+    for indice, item in enumerate(itens):
+        if isinstance(item, ValueError):
+            rejeitados.append(
+                LoteItemResultado(indice=indice, status="rejeitado", erros=[str(item)])
+            )
+            continue
+
+        try:
+            validos.append((indice, AbastecimentoCreate.model_validate(item)))
+        except ValidationError as e:
+            rejeitados.append(
+                LoteItemResultado(
+                    indice=indice, status="rejeitado", erros=_formatar_erros(e)
+                )
+            )
+
+    return validos, rejeitados
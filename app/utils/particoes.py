@@ -0,0 +1,54 @@
+import re
+from datetime import date, datetime, timezone
+from typing import Optional, Tuple
+
+PREFIXO_PARTICAO = "abastecimentos_p"
+_PADRAO_PARTICAO = re.compile(rf"^{PREFIXO_PARTICAO}(\d{{4}})(\d{{2}})$")
+
+
+def primeiro_dia_mes(valor: date) -> date:
+    """Retorna o primeiro dia do mês de `valor`."""
+    return date(valor.year, valor.month, 1)
+
+
+def somar_meses(mes: date, quantidade: int) -> date:
+    """
+    Desloca `mes` em `quantidade` meses (pode ser negativo).
+
+    Returns:
+        Primeiro dia do mês resultante
+    """
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nome_particao(mes: date) -> str:
+    """Nome da partição mensal, ex.: abastecimentos_p202501."""
+    return f"{PREFIXO_PARTICAO}{mes:%Y%m}"
+
+
+def mes_da_particao(nome: str) -> Optional[date]:
+    """
+    Extrai o mês de uma partição mensal pelo nome.
+
+    Returns:
+        Primeiro dia do mês, ou None se o nome não segue o padrão
+        (ex.: a partição default)
+    """
+    correspondencia = _PADRAO_PARTICAO.match(nome)
+    if not correspondencia:
+        return None
+
+    ano, mes = (int(parte) for parte in correspondencia.groups())
+    if not 1 <= mes <= 12:
+        return None
+    return date(ano, mes, 1)
+
+
+def limites_particao(mes: date) -> Tuple[datetime, datetime]:
+    """Intervalo [início, fim) em UTC coberto pela partição do mês."""
+    fim = somar_meses(mes, 1)
+    return (
+        datetime(mes.year, mes.month, 1, tzinfo=timezone.utc),
+        datetime(fim.year, fim.month, 1, tzinfo=timezone.utc),
+    )
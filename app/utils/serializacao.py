@@ -0,0 +1,146 @@
+"""
+Serialização direta das linhas de abastecimento para JSON (orjson).
+
+As listagens e históricos não passam por AbastecimentoResponse: as tuplas
+vindas do banco viram dicts e são codificadas de uma vez pelo orjson. A
+saída é byte a byte igual à que o FastAPI produziria com os schemas
+Pydantic (Decimal como string, datetime ISO 8601 com "Z" para UTC, chaves
+na ordem dos campos).
+
+Também gera os blocos CSV/NDJSON da exportação em streaming; o CSV usa os
+mesmos nomes de coluna aceitos pela importação histórica.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+
+import orjson
+
+_OPCOES = orjson.OPT_UTC_Z
+
+CAMPOS = (
+    "id",
+    "id_posto",
+    "data_hora",
+    "tipo_combustivel",
+    "preco_por_litro",
+    "volume_abastecido",
+    "cpf_motorista",
+    "improper_data",
+    "created_at",
+)
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=_OPCOES)
+
+
+def abastecimento_para_dict(linha: Sequence) -> dict:
+    """
+    Converte uma linha (na ordem de COLUNAS_RESPOSTA) no dict da resposta.
+    """
+    (id, id_posto, data_hora, tipo_combustivel, preco_por_litro,
+     volume_abastecido, cpf_motorista, improper_data, created_at) = linha
+
+    return {
+        "id": id,
+        "id_posto": id_posto,
+        "data_hora": data_hora,
+        "tipo_combustivel": tipo_combustivel,
+        "preco_por_litro": str(preco_por_litro),
+        "volume_abastecido": str(volume_abastecido),
+        "cpf_motorista": cpf_motorista,
+        "improper_data": improper_data,
+        "created_at": created_at,
+    }
+
+
+def serializar_pagina(
+    linhas: Iterable[Sequence],
+    size: int,
+    total: Optional[int] = None,
+    page: Optional[int] = None,
+    pages: Optional[int] = None,
+    next_cursor: Optional[str] = None,
+) -> bytes:
+    """Gera o JSON de AbastecimentoPagination."""
+    return dumps({
+        "items": [abastecimento_para_dict(linha) for linha in linhas],
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": pages,
+        "next_cursor": next_cursor,
+    })
+
+
+def serializar_historico(
+    cpf_motorista: str,
+    total_abastecimentos: int,
+    linhas: Iterable[Sequence],
+    next_cursor: Optional[str] = None,
+) -> bytes:
+    """Gera o JSON de HistoricoResponse."""
+    return dumps({
+        "cpf_motorista": cpf_motorista,
+        "total_abastecimentos": total_abastecimentos,
+        "abastecimentos": [abastecimento_para_dict(linha) for linha in linhas],
+        "next_cursor": next_cursor,
+    })
+
+
+def serializar_linha_ndjson(linha: Sequence) -> bytes:
+    """Gera uma linha NDJSON (com a quebra de linha) para um abastecimento."""
+    return orjson.dumps(
+        abastecimento_para_dict(linha),
+        option=_OPCOES | orjson.OPT_APPEND_NEWLINE,
+    )
+
+
+def serializar_ndjson(linhas: Iterable[Sequence]) -> bytes:
+    """Gera várias linhas NDJSON de uma vez."""
+    return b"".join(serializar_linha_ndjson(linha) for linha in linhas)
+
+
+def _iso(valor: datetime) -> str:
+    # Mesmo formato do JSON: "Z" para UTC
+    texto = valor.isoformat()
+    return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+
+
+def cabecalho_csv() -> bytes:
+    return (",".join(CAMPOS) + "\r\n").encode()
+
+
+def serializar_csv(linhas: Iterable[Sequence]) -> bytes:
+    """Gera as linhas CSV (sem cabeçalho) de vários abastecimentos."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for (id, id_posto, data_hora, tipo_combustivel, preco_por_litro,
+         volume_abastecido, cpf_motorista, improper_data, created_at) in linhas:
+        escritor.writerow((
+            id,
+            id_posto,
+            _iso(data_hora),
+            getattr(tipo_combustivel, "value", tipo_combustivel),
+            preco_por_litro,
+            volume_abastecido,
+            cpf_motorista,
+            "true" if improper_data else "false",
+            _iso(created_at),
+        ))
+    return buffer.getvalue().encode()
+
+
+async def comprimir_gzip(
+    partes: AsyncIterator[bytes], nivel: int = 6
+) -> AsyncIterator[bytes]:
+    """Comprime um fluxo de bytes em gzip, parte a parte."""
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)  # 31 = cabeçalho gzip
+    async for parte in partes:
+        comprimido = compressor.compress(parte)
+        if comprimido:
+            yield comprimido
+    yield compressor.flush()
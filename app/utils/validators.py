@@ -1,45 +1,169 @@
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+_DIGITOS = frozenset("0123456789")
+
+# Pesos dos dígitos verificadores: 10..2 para o 1º, 11..2 para o 2º
+_PESOS_DV1 = np.arange(10, 1, -1, dtype=np.int64)
+_PESOS_DV2 = np.arange(11, 1, -1, dtype=np.int64)
+
+MEMO_MAX_ITENS = 65_536
+
+# Tamanho de um CPF formatado (000.000.000-00). Entradas maiores são
+# inválidas de saída e nunca entram no memo: um cliente não consegue
+# ocupá-lo com chaves arbitrariamente grandes.
+CPF_MAX_TAMANHO = 14
+
+_AUSENTE = object()
+
+
+class _MemoLRU:
+    """Memo limitado (LRU) de CPFs já verificados: entrada bruta -> resultado."""
+
+    def __init__(self, max_itens: int):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    def get(self, chave: str):
+        valor = self._itens.get(chave, _AUSENTE)
+        if valor is not _AUSENTE:
+            self._itens.move_to_end(chave)
+        return valor
+
+    def set(self, chave: str, valor: Optional[str]) -> None:
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        if len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def limpar(self) -> None:
+        self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+
+_memo = _MemoLRU(MEMO_MAX_ITENS)
+
+
+def _somente_digitos(cpf: str) -> str:
+    return "".join(c for c in cpf if c in _DIGITOS)
+
+
+def _verificar(digitos: str) -> bool:
+    """
+    Confere tamanho, dígitos repetidos e verificadores de um CPF já
+    normalizado, segundo o algoritmo oficial.
+    """
+    if len(digitos) != 11 or digitos == digitos[0] * 11:
+        return False
+
+    valores = digitos.encode("ascii")
+    soma1 = soma2 = 0
+    for indice in range(9):
+        valor = valores[indice] - 48
+        soma1 += valor * (10 - indice)
+        soma2 += valor * (11 - indice)
+
+    resto = soma1 % 11
+    digito1 = 0 if resto < 2 else 11 - resto
+    soma2 += digito1 * 2
+
+    resto = soma2 % 11
+    digito2 = 0 if resto < 2 else 11 - resto
+
+    return valores[9] - 48 == digito1 and valores[10] - 48 == digito2
+
+
+def normalizar_cpf(cpf: str) -> Optional[str]:
+    """
+    Normaliza e valida um CPF em uma única passada.
+
+    Args:
+        cpf: String contendo CPF (aceita formatação com pontos e hífen)
+
+    Returns:
+        O CPF apenas com dígitos, ou None se for inválido
+    """
+    if len(cpf) > CPF_MAX_TAMANHO:
+        return None
+
+    resultado = _memo.get(cpf)
+    if resultado is not _AUSENTE:
+        return resultado
+
+    digitos = _somente_digitos(cpf)
+    resultado = digitos if _verificar(digitos) else None
+    _memo.set(cpf, resultado)
+    return resultado
+
+
+def normalizar_cpfs(cpfs: Sequence[str]) -> List[Optional[str]]:
+    """
+    Normaliza e valida vários CPFs de uma vez.
+
+    Os CPFs com 11 dígitos viram uma matriz (n x 11) e os verificadores são
+    calculados para todos com dois produtos matriciais pelos vetores de
+    pesos. Os resultados também alimentam o memo de `normalizar_cpf`.
+
+    Entradas com mais de CPF_MAX_TAMANHO caracteres são inválidas e não
+    são normalizadas nem memorizadas.
+
+    Returns:
+        Lista alinhada com a entrada: CPF só com dígitos ou None se inválido
+    """
+    normalizados = [
+        _somente_digitos(cpf) if len(cpf) <= CPF_MAX_TAMANHO else ""
+        for cpf in cpfs
+    ]
+    resultados: List[Optional[str]] = [None] * len(cpfs)
+
+    candidatos = [i for i, d in enumerate(normalizados) if len(d) == 11]
+    if candidatos:
+        bruto = "".join(normalizados[i] for i in candidatos).encode("ascii")
+        matriz = (
+            np.frombuffer(bruto, dtype=np.uint8)
+            .reshape(-1, 11)
+            .astype(np.int64) - 48
+        )
+
+        resto1 = (matriz[:, :9] @ _PESOS_DV1) % 11
+        digito1 = np.where(resto1 < 2, 0, 11 - resto1)
+        resto2 = (matriz[:, :10] @ _PESOS_DV2) % 11
+        digito2 = np.where(resto2 < 2, 0, 11 - resto2)
+
+        repetidos = (matriz == matriz[:, :1]).all(axis=1)
+        validos = (matriz[:, 9] == digito1) & (matriz[:, 10] == digito2) & ~repetidos
+
+        for i, valido in zip(candidatos, validos.tolist()):
+            if valido:
+                resultados[i] = normalizados[i]
+
+    for cpf, resultado in zip(cpfs, resultados):
+        if len(cpf) <= CPF_MAX_TAMANHO:
+            _memo.set(cpf, resultado)
+
+    return resultados
+
+
+def validar_cpfs(cpfs: Sequence[str]) -> np.ndarray:
+    """Versão em lote de `is_valid_cpf`: array booleano alinhado com a entrada."""
+    return np.array(
+        [resultado is not None for resultado in normalizar_cpfs(cpfs)], dtype=bool
+    )
+
+
 def is_valid_cpf(cpf: str) -> bool:
     """
     Valida um CPF brasileiro segundo algoritmo oficial.
-    
+
     Args:
         cpf: String contendo CPF (aceita formatação com pontos e hífen)
-        
+
     Returns:
         True se o CPF é válido, False C.C.
-        
+
     """
-    # Remove caracteres não numéricos
-    cpf = "".join(filter(str.isdigit, cpf))
-    
-    # Verifica tamanho
-    if len(cpf) != 11:
-        return False
-    
-    # Rejeita CPFs com todos os dígitos iguais
-    if cpf == cpf[0] * 11:
-        return False
-    
-    def calculate_digit(cpf_slice: str, initial_factor: int) -> int:
-        """
-        Calcula dígito verificador usando algoritmo oficial do CPF.
-        
-        Args:
-            cpf_slice: Slice do CPF para calcular (9 ou 10 dígitos)
-            initial_factor: Fator inicial (10 para 1º dígito, 11 para 2º)
-            
-        Returns:
-            Dígito verificador calculado (0-9)
-        """
-        total = sum(
-            int(digit) * (initial_factor - index) 
-            for index, digit in enumerate(cpf_slice)
-        )
-        remainder = total % 11
-        return 0 if remainder < 2 else 11 - remainder
-    
-    # Calcula e valida os dígitos verificadores
-    digit1 = calculate_digit(cpf[:9], 10)
-    digit2 = calculate_digit(cpf[:10], 11)
-    
-    return cpf[-2:] == f"{digit1}{digit2}"
\ No newline at end of file
+    return normalizar_cpf(cpf) is not None
@@ -0,0 +1,343 @@
+"""Benchmark de carga em malha aberta para a API de abastecimentos.
+
+As requisições partem em taxa constante (--taxa req/s), independentemente
+de as anteriores já terem respondido. A latência é medida a partir do
+instante em que a requisição *deveria* ter partido, o que evita a omissão
+coordenada de um gerador em malha fechada. Os payloads são gerados antes
+da parte cronometrada, e o relatório sai em JSON para comparar versões.
+
+Cenários:
+    criar      POST /api/v1/abastecimentos
+    listar     GET  /api/v1/abastecimentos com filtros aleatórios
+    historico  GET  /api/v1/abastecimentos/motoristas/{cpf}/historico
+    misto      mistura dos três (--mix criar=0.5,listar=0.3,historico=0.2)
+    replay     reenvia um NDJSON capturado (--arquivo)
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.load_data import fake, gerar_abastecimento  # noqa: E402
+
+CENARIOS = ("criar", "listar", "historico")
+PERCENTIS = (50, 75, 90, 95, 99, 99.9, 99.99)
+
+# Requisição pré-gerada: (cenário, método, path, corpo JSON)
+Requisicao = Tuple[str, str, str, Optional[dict]]
+
+
+class HistogramaHDR:
+    """
+    Histograma log-linear no estilo HDR: valores inteiros (microssegundos)
+    em buckets cuja largura dobra a cada potência de 2, com
+    2^(bits_sub - 1) sub-buckets lineares por faixa. O erro relativo de
+    qualquer percentil fica abaixo de 1 / 2^(bits_sub - 1).
+    """
+
+    def __init__(self, bits_sub: int = 8):
+        self.bits_sub = bits_sub
+        self._metade = 1 << (bits_sub - 1)
+        self._linear = 1 << bits_sub
+        self.contagens: Dict[int, int] = defaultdict(int)
+        self.total = 0
+        self.soma = 0
+        self.minimo: Optional[int] = None
+        self.maximo = 0
+
+    def _indice(self, valor: int) -> int:
+        if valor < self._linear:
+            return valor
+        deslocamento = valor.bit_length() - self.bits_sub
+        return (
+            self._linear
+            + (deslocamento - 1) * self._metade
+            + (valor >> deslocamento) - self._metade
+        )
+
+    def _limite_superior(self, indice: int) -> int:
+        if indice < self._linear:
+            return indice
+        deslocamento, sub = divmod(indice - self._linear, self._metade)
+        deslocamento += 1
+        return ((sub + self._metade + 1) << deslocamento) - 1
+
+    def registrar(self, valor: int) -> None:
+        valor = max(int(valor), 0)
+        self.contagens[self._indice(valor)] += 1
+        self.total += 1
+        self.soma += valor
+        self.maximo = max(self.maximo, valor)
+        self.minimo = valor if self.minimo is None else min(self.minimo, valor)
+
+    def percentil(self, p: float) -> int:
+        if not self.total:
+            return 0
+        alvo = max(1, round(self.total * p / 100))
+        acumulado = 0
+        for indice in sorted(self.contagens):
+            acumulado += self.contagens[indice]
+            if acumulado >= alvo:
+                return min(self._limite_superior(indice), self.maximo)
+        return self.maximo
+
+    def resumo_ms(self) -> Dict[str, Any]:
+        if not self.total:
+            return {"contagem": 0}
+        resumo: Dict[str, Any] = {
+            "contagem": self.total,
+            "min": self.minimo / 1000,
+            "media": round(self.soma / self.total / 1000, 3),
+            "max": self.maximo / 1000,
+        }
+        for p in PERCENTIS:
+            resumo[f"p{p:g}"] = self.percentil(p) / 1000
+        return resumo
+
+
+class Resultados:
+    def __init__(self):
+        self.latencia: Dict[str, HistogramaHDR] = defaultdict(HistogramaHDR)
+        self.servico: Dict[str, HistogramaHDR] = defaultdict(HistogramaHDR)
+        self.status: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.atraso_envio = HistogramaHDR()
+
+    def registrar(self, cenario: str, status: str, latencia_us: int, servico_us: int) -> None:
+        for chave in (cenario, "total"):
+            self.latencia[chave].registrar(latencia_us)
+            self.servico[chave].registrar(servico_us)
+            self.status[chave][status] += 1
+
+    def relatorio(self) -> Dict[str, Any]:
+        return {
+            chave: {
+                "status": dict(sorted(self.status[chave].items())),
+                # Latência desde o instante agendado (inclui fila no cliente)
+                "latencia_ms": self.latencia[chave].resumo_ms(),
+                # Só o tempo de resposta a partir do envio efetivo
+                "servico_ms": self.servico[chave].resumo_ms(),
+            }
+            for chave in sorted(self.latencia)
+        }
+
+
+# --- Geração de requisições (fora da parte cronometrada) -------------------
+
+def _parse_mix(texto: str) -> Dict[str, float]:
+    pesos = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        if nome.strip() not in CENARIOS:
+            raise ValueError(f"Cenário desconhecido no mix: {nome!r}")
+        pesos[nome.strip()] = float(peso)
+    return pesos
+
+
+def _requisicao_listar(rng: random.Random) -> Requisicao:
+    params = [f"size={rng.choice((10, 50, 100))}"]
+    if rng.random() < 0.5:
+        params.append(f"tipo_combustivel={rng.choice(('GASOLINA', 'ETANOL', 'DIESEL'))}")
+    if rng.random() < 0.3:
+        params.append(f"page={rng.randint(1, 20)}")
+    if rng.random() < 0.3:
+        params.append("data_inicio=2025-01-01T00:00:00Z")
+    return ("listar", "GET", "/api/v1/abastecimentos?" + "&".join(params), None)
+
+
+def gerar_requisicoes(
+    quantidade: int,
+    mix: Dict[str, float],
+    motoristas: int = 200,
+    semente: int = 42,
+) -> List[Requisicao]:
+    """Pré-gera `quantidade` requisições sorteando cenários pelos pesos do mix."""
+    rng = random.Random(semente)
+    random.seed(semente)
+    fake.seed_instance(semente)
+
+    # Um conjunto fixo de motoristas faz os históricos crescerem como em produção
+    cpfs = ["".join(filter(str.isdigit, fake.cpf())) for _ in range(motoristas)]
+    nomes, pesos = zip(*mix.items())
+
+    requisicoes: List[Requisicao] = []
+    for cenario in rng.choices(nomes, weights=pesos, k=quantidade):
+        if cenario == "criar":
+            corpo = gerar_abastecimento()
+            corpo["cpf_motorista"] = rng.choice(cpfs)
+            requisicoes.append(("criar", "POST", "/api/v1/abastecimentos", corpo))
+        elif cenario == "listar":
+            requisicoes.append(_requisicao_listar(rng))
+        else:
+            cpf = rng.choice(cpfs)
+            requisicoes.append((
+                "historico", "GET",
+                f"/api/v1/abastecimentos/motoristas/{cpf}/historico?size=50", None,
+            ))
+    return requisicoes
+
+
+def ler_replay(linhas: Iterable[str]) -> List[Requisicao]:
+    """
+    Lê requisições capturadas em NDJSON.
+
+    Cada linha pode ser {"method", "path", "body"?} ou diretamente o
+    payload de um abastecimento (vira um POST de criação). Linhas em
+    branco ou que não se encaixam em nenhum formato são ignoradas.
+    """
+    requisicoes: List[Requisicao] = []
+    for linha in linhas:
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(registro, dict):
+            continue
+
+        if "method" in registro and "path" in registro:
+            metodo = registro["method"].upper()
+            corpo = registro.get("body")
+            requisicoes.append(("replay", metodo, registro["path"], corpo))
+        elif "tipo_combustivel" in registro and "cpf_motorista" in registro:
+            requisicoes.append(("replay", "POST", "/api/v1/abastecimentos", registro))
+    return requisicoes
+
+
+# --- Execução em malha aberta ----------------------------------------------
+
+async def _disparar(
+    cliente: httpx.AsyncClient,
+    requisicao: Requisicao,
+    agendado: float,
+    resultados: Resultados,
+    timeout: float,
+) -> None:
+    cenario, metodo, path, corpo = requisicao
+    envio = time.perf_counter()
+    try:
+        resposta = await cliente.request(metodo, path, json=corpo, timeout=timeout)
+        status = str(resposta.status_code)
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    fim = time.perf_counter()
+
+    resultados.registrar(
+        cenario, status, int((fim - agendado) * 1e6), int((fim - envio) * 1e6)
+    )
+
+
+async def executar(
+    url: str,
+    requisicoes: List[Requisicao],
+    taxa: float,
+    conexoes: int,
+    timeout: float,
+) -> Dict[str, Any]:
+    resultados = Resultados()
+    limites = httpx.Limits(max_connections=conexoes, max_keepalive_connections=conexoes)
+
+    async with httpx.AsyncClient(base_url=url, limits=limites) as cliente:
+        tarefas = []
+        inicio = time.perf_counter() + 0.05
+
+        for i, requisicao in enumerate(requisicoes):
+            agendado = inicio + i / taxa
+            espera = agendado - time.perf_counter()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            else:
+                # O próprio gerador atrasou: fica registrado no relatório
+                resultados.atraso_envio.registrar(int(-espera * 1e6))
+            tarefas.append(asyncio.create_task(
+                _disparar(cliente, requisicao, agendado, resultados, timeout)
+            ))
+
+        await asyncio.gather(*tarefas)
+        duracao = time.perf_counter() - inicio
+
+    return {
+        "duracao_s": round(duracao, 3),
+        "vazao_rps": round(len(requisicoes) / duracao, 2),
+        "atraso_gerador_ms": resultados.atraso_envio.resumo_ms(),
+        "cenarios": resultados.relatorio(),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("cenario", choices=[*CENARIOS, "misto", "replay"])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--taxa", type=float, default=100, help="Requisições por segundo")
+    parser.add_argument("--duracao", type=float, default=30, help="Segundos de carga")
+    parser.add_argument("--mix", default="criar=0.5,listar=0.3,historico=0.2")
+    parser.add_argument("--arquivo", type=Path, help="NDJSON para o cenário replay")
+    parser.add_argument("--conexoes", type=int, default=200, help="Máximo de conexões HTTP")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", type=Path, help="Arquivo do relatório JSON (padrão: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    if args.cenario == "replay":
+        if args.arquivo is None:
+            raise SystemExit("O cenário replay requer --arquivo")
+        with args.arquivo.open(encoding="utf-8") as arquivo:
+            requisicoes = ler_replay(arquivo)
+        if not requisicoes:
+            raise SystemExit(f"Nenhuma requisição reconhecida em {args.arquivo}")
+    else:
+        mix = _parse_mix(args.mix) if args.cenario == "misto" else {args.cenario: 1.0}
+        requisicoes = gerar_requisicoes(
+            int(args.taxa * args.duracao), mix, semente=args.semente
+        )
+
+    print(
+        f"{len(requisicoes)} requisições a {args.taxa:g} req/s contra {args.url}",
+        file=sys.stderr,
+    )
+    resultado = asyncio.run(
+        executar(args.url, requisicoes, args.taxa, args.conexoes, args.timeout)
+    )
+
+    relatorio = {
+        "executado_em": datetime.now(timezone.utc).isoformat(),
+        "configuracao": {
+            "cenario": args.cenario,
+            "url": args.url,
+            "taxa_rps": args.taxa,
+            "requisicoes": len(requisicoes),
+            "mix": args.mix if args.cenario == "misto" else None,
+            "arquivo": str(args.arquivo) if args.arquivo else None,
+            "conexoes": args.conexoes,
+            "semente": args.semente,
+        },
+        **resultado,
+    }
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        args.saida.write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
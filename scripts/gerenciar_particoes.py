@@ -0,0 +1,68 @@
+"""Manutenção das partições mensais de abastecimentos.
+
+Cria as partições dos próximos meses e desanexa/apaga as que saíram da
+janela de retenção. Pensado para rodar periodicamente (cron/k8s CronJob).
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.database import AsyncSessionLocal, engine  # noqa: E402
+from app.repositories.particao_repository import ParticaoRepository  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--meses-futuros",
+        type=int,
+        default=settings.particoes_meses_futuros,
+        help="Quantos meses à frente devem ter partição (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--retencao-meses",
+        type=int,
+        default=settings.particoes_retencao_meses,
+        help="Meses mantidos; 0 desativa o expurgo (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--modo",
+        choices=["detach", "drop"],
+        default=settings.particoes_modo_expurgo,
+        help="O que fazer com partições expiradas (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    hoje = datetime.now(timezone.utc).date()
+
+    async with AsyncSessionLocal() as session:
+        repository = ParticaoRepository(session)
+
+        criadas = await repository.criar_particoes_futuras(hoje, args.meses_futuros)
+
+        removidas = []
+        if args.retencao_meses > 0:
+            removidas = await repository.remover_expiradas(
+                hoje, args.retencao_meses, modo=args.modo
+            )
+
+        await session.commit()
+        particoes = await repository.listar()
+
+    await engine.dispose()
+
+    print(f"Criadas:    {', '.join(criadas) or '-'}")
+    print(f"Removidas:  {', '.join(removidas) or '-'} ({args.modo})")
+    print(f"Partições:  {len(particoes)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""Importação histórica de abastecimentos a partir de CSV ou NDJSON.
+
+O arquivo é lido em streaming e processado em lotes: cada linha passa
+pelas mesmas validações de AbastecimentoCreate e pela pontuação de
+anomalia, e os válidos entram via COPY. Após cada lote gravado, um arquivo
+de checkpoint registra quantas linhas já foram consumidas; uma importação
+interrompida retoma dali ao ser executada de novo.
+
+O checkpoint é gravado logo após o commit do lote: se o processo cair
+entre os dois, esse único lote será importado de novo ao retomar.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, TextIO
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.detector_anomalia import detector_anomalia  # noqa: E402
+from app.database import AsyncSessionLocal, engine  # noqa: E402
+from app.services import tarefas  # noqa: E402
+from app.services.abastecimento_service import AbastecimentoService  # noqa: E402
+from app.utils.lote import validar_itens_lote  # noqa: E402
+
+
+def ler_registros(arquivo: TextIO, formato: str) -> Iterator[Any]:
+    """
+    Gera os registros do arquivo um a um (memória constante).
+
+    Linhas NDJSON malformadas viram ValueError, para serem rejeitadas
+    individualmente como na ingestão em lote da API.
+    """
+    if formato == "csv":
+        yield from csv.DictReader(arquivo)
+        return
+
+    for linha in arquivo:
+        if not linha.strip():
+            continue
+        try:
+            yield json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"JSON inválido: {e.msg}")
+
+
+def ler_checkpoint(caminho: Path) -> dict:
+    if not caminho.exists():
+        return {"linhas": 0, "importados": 0, "rejeitados": 0}
+    return json.loads(caminho.read_text(encoding="utf-8"))
+
+
+def gravar_checkpoint(caminho: Path, estado: dict) -> None:
+    # Grava em arquivo temporário e renomeia: nunca fica um checkpoint pela metade
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    temporario.write_text(json.dumps(estado), encoding="utf-8")
+    os.replace(temporario, caminho)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("arquivo", type=Path)
+    parser.add_argument(
+        "--formato",
+        choices=["csv", "ndjson"],
+        help="Padrão: deduzido da extensão (.csv ou .ndjson/.jsonl)",
+    )
+    parser.add_argument("--lote", type=int, default=5000, help="Linhas por COPY")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Arquivo de checkpoint (padrão: <arquivo>.checkpoint)",
+    )
+    parser.add_argument(
+        "--reiniciar", action="store_true", help="Ignora o checkpoint existente"
+    )
+    parser.add_argument(
+        "--rejeitados", type=Path, help="NDJSON com as linhas rejeitadas e os erros"
+    )
+    args = parser.parse_args(argv)
+
+    if args.formato is None:
+        args.formato = "csv" if args.arquivo.suffix.lower() == ".csv" else "ndjson"
+    if args.checkpoint is None:
+        args.checkpoint = args.arquivo.with_name(args.arquivo.name + ".checkpoint")
+    return args
+
+
+async def importar(args: argparse.Namespace) -> dict:
+    estado = (
+        {"linhas": 0, "importados": 0, "rejeitados": 0}
+        if args.reiniciar
+        else ler_checkpoint(args.checkpoint)
+    )
+
+    # A pontuação usa o mesmo estado em memória que a API
+    await tarefas.carregar_medias_preco()
+    if detector_anomalia.ativo:
+        await tarefas.carregar_detector_anomalia()
+
+    inicio = time.perf_counter()
+    linhas_sessao = 0
+    saida_rejeitados = (
+        args.rejeitados.open("a", encoding="utf-8") if args.rejeitados else None
+    )
+
+    try:
+        with args.arquivo.open(encoding="utf-8", newline="") as arquivo:
+            registros = ler_registros(arquivo, args.formato)
+
+            if estado["linhas"]:
+                # Avança sem validar até o ponto do checkpoint
+                for _ in islice(registros, estado["linhas"]):
+                    pass
+                print(f"Retomando após {estado['linhas']} linhas", file=sys.stderr)
+
+            while True:
+                itens = list(islice(registros, args.lote))
+                if not itens:
+                    break
+
+                validos, rejeitados = validar_itens_lote(itens)
+
+                if validos:
+                    async with AsyncSessionLocal() as session:
+                        await AbastecimentoService(session).importar_lote(
+                            [data for _, data in validos]
+                        )
+
+                if saida_rejeitados:
+                    for resultado in rejeitados:
+                        saida_rejeitados.write(json.dumps({
+                            "linha": estado["linhas"] + resultado.indice + 1,
+                            "erros": resultado.erros,
+                        }, ensure_ascii=False) + "\n")
+                    saida_rejeitados.flush()
+
+                estado["linhas"] += len(itens)
+                estado["importados"] += len(validos)
+                estado["rejeitados"] += len(rejeitados)
+                gravar_checkpoint(args.checkpoint, estado)
+
+                linhas_sessao += len(itens)
+                decorrido = time.perf_counter() - inicio
+                print(
+                    f"{estado['linhas']:>12} linhas | "
+                    f"{estado['importados']:>12} importadas | "
+                    f"{estado['rejeitados']:>8} rejeitadas | "
+                    f"{linhas_sessao / decorrido:>10.0f} linhas/s",
+                    file=sys.stderr,
+                )
+    finally:
+        if saida_rejeitados:
+            saida_rejeitados.close()
+
+    if detector_anomalia.ativo:
+        await tarefas.salvar_snapshot_detector()
+
+    decorrido = time.perf_counter() - inicio
+    return {
+        **estado,
+        "segundos": round(decorrido, 2),
+        "linhas_por_segundo": round(linhas_sessao / decorrido, 1) if decorrido else None,
+    }
+
+
+async def main() -> None:
+    args = parse_args()
+    try:
+        resumo = await importar(args)
+    finally:
+        await engine.dispose()
+
+    print(f"Linhas:      {resumo['linhas']}")
+    print(f"Importadas:  {resumo['importados']}")
+    print(f"Rejeitadas:  {resumo['rejeitados']}")
+    print(f"Tempo:       {resumo['segundos']}s ({resumo['linhas_por_segundo']} linhas/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark: validação de CPF.
+
+Compara a validação item a item (sem memo) com a validação em lote
+(NumPy) e com o memo de CPFs repetidos.
+
+Uso:
+    python -m tests.bench_cpf [--quantidade 5000]
+"""
+import argparse
+import random
+import timeit
+
+from app.utils.validators import (
+    _memo,
+    _somente_digitos,
+    _verificar,
+    normalizar_cpf,
+    normalizar_cpfs,
+)
+
+
+def _gerar_cpf(rng: random.Random) -> str:
+    base = [rng.randint(0, 9) for _ in range(9)]
+    for fator in (10, 11):
+        soma = sum(d * (fator - i) for i, d in enumerate(base))
+        resto = soma % 11
+        base.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, base))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quantidade", type=int, default=5000)
+    parser.add_argument("--motoristas", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    motoristas = [_gerar_cpf(rng) for _ in range(args.motoristas)]
+    cpfs = [rng.choice(motoristas) for _ in range(args.quantidade)]
+
+    def item_a_item():
+        return [_verificar(_somente_digitos(cpf)) for cpf in cpfs]
+
+    def lote():
+        _memo.limpar()
+        return normalizar_cpfs(cpfs)
+
+    def memo():
+        return [normalizar_cpf(cpf) for cpf in cpfs]
+
+    memo()
+    for nome, funcao in (("item a item", item_a_item), ("lote numpy", lote), ("memo", memo)):
+        tempo = min(timeit.repeat(funcao, number=10, repeat=5)) / 10
+        print(f"{nome:>12}: {tempo * 1e3:8.2f} ms para {len(cpfs)} CPFs")
+
+
+if __name__ == "__main__":
+    main()
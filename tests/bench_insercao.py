@@ -0,0 +1,121 @@
+"""
+Benchmark: latência por inserção individual de abastecimento.
+
+Compara o caminho antigo (session.add -> flush -> upserts -> commit ->
+refresh, oito idas ao banco) com o comando único do repositório (INSERT
+... RETURNING com os upserts das derivadas como CTEs; três idas com BEGIN
+e COMMIT), com commit síncrono e com synchronous_commit=off. Os três
+caminhos mantêm as tabelas derivadas na mesma transação, como na API.
+
+Grava registros reais: use um banco dedicado, já migrado. As tabelas de
+abastecimentos e derivadas são truncadas ao final.
+
+Uso:
+    TEST_DATABASE_URL=... python -m tests.bench_insercao [--insercoes 2000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.abastecimento import Abastecimento, TipoCombustivel
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+
+
+def _valores(i: int) -> dict:
+    return {
+        "id_posto": i % 50 + 1,
+        "data_hora": datetime.now(timezone.utc),
+        "tipo_combustivel": TipoCombustivel.GASOLINA,
+        "preco_por_litro": Decimal("5.899"),
+        "volume_abastecido": Decimal("42.15"),
+        "cpf_motorista": "52998224725",
+        "improper_data": False,
+    }
+
+
+async def _caminho_orm(session: AsyncSession, valores: dict) -> None:
+    repository = AbastecimentoRepository(session)
+    abastecimento = Abastecimento(**valores)
+    session.add(abastecimento)
+    await session.flush()
+    await repository._atualizar_agregados([abastecimento])
+    await session.commit()
+    await session.refresh(abastecimento)
+
+
+async def _caminho_returning(session: AsyncSession, valores: dict) -> None:
+    await AbastecimentoRepository(session).create(valores)
+
+
+async def _caminho_returning_assincrono(session: AsyncSession, valores: dict) -> None:
+    await AbastecimentoRepository(session).create(valores, commit_assincrono=True)
+
+
+async def _medir(engine, caminho, insercoes: int) -> list:
+    tempos = []
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for i in range(insercoes):
+            inicio = time.perf_counter()
+            await caminho(session, _valores(i))
+            tempos.append((time.perf_counter() - inicio) * 1e6)
+    return tempos
+
+
+async def _executar(url: str, insercoes: int) -> None:
+    engine = create_async_engine(url, pool_size=1)
+    caminhos = (
+        ("add+commit+refresh", _caminho_orm),
+        ("insert returning", _caminho_returning),
+        ("returning+async", _caminho_returning_assincrono),
+    )
+
+    try:
+        # Aquece conexão e prepared statements
+        for _, caminho in caminhos:
+            await _medir(engine, caminho, 50)
+
+        medias = {}
+        for nome, caminho in caminhos:
+            tempos = sorted(await _medir(engine, caminho, insercoes))
+            medias[nome] = statistics.fmean(tempos)
+            p99 = tempos[int(len(tempos) * 0.99) - 1]
+            print(
+                f"{nome:>18}: média {medias[nome]:8.1f} µs  "
+                f"p50 {statistics.median(tempos):8.1f} µs  p99 {p99:8.1f} µs"
+            )
+
+        base = medias["add+commit+refresh"]
+        for nome in ("insert returning", "returning+async"):
+            print(f"{'ganho ' + nome:>26}: {base / medias[nome]:5.2f}x")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "TRUNCATE abastecimentos, chaves_idempotencia, rollup_postos, "
+                    "contagens_diarias, resumo_motoristas RESTART IDENTITY"
+                )
+            )
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=os.getenv("TEST_DATABASE_URL"))
+    parser.add_argument("--insercoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    if not args.url:
+        parser.error("informe --url ou TEST_DATABASE_URL")
+
+    asyncio.run(_executar(args.url, args.insercoes))
+
+
+if __name__ == "__main__":
+    main()
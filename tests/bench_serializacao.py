@@ -0,0 +1,78 @@
+"""
+Micro-benchmark: serialização de uma página de listagem.
+
+Compara o caminho antigo (entidades ORM -> AbastecimentoPagination ->
+encoder do FastAPI) com o caminho direto (tuplas -> orjson).
+
+Uso:
+    python -m tests.bench_serializacao [--size 100] [--repeticoes 2000]
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.models.abastecimento import Abastecimento, TipoCombustivel
+from app.schemas.abastecimento import AbastecimentoPagination
+from app.utils.serializacao import serializar_pagina
+
+
+def _linhas(size):
+    inicio = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            i, i % 50 + 1, inicio + timedelta(minutes=i),
+            TipoCombustivel.GASOLINA, Decimal("5.899"), Decimal("42.150"),
+            "52998224725", False, inicio + timedelta(minutes=i, seconds=1),
+        )
+        for i in range(size)
+    ]
+
+
+def _caminho_orm(linhas, size):
+    # Inclui a criação das entidades, que na API acontece na hidratação
+    items = [
+        Abastecimento(
+            id=l[0], id_posto=l[1], data_hora=l[2], tipo_combustivel=l[3],
+            preco_por_litro=l[4], volume_abastecido=l[5], cpf_motorista=l[6],
+            improper_data=l[7], created_at=l[8],
+        )
+        for l in linhas
+    ]
+    pagina = AbastecimentoPagination(
+        items=items, total=10_000, page=1, size=size, pages=100
+    )
+    return json.dumps(
+        pagina.model_dump(mode="json"),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def _caminho_direto(linhas, size):
+    return serializar_pagina(linhas, size=size, total=10_000, page=1, pages=100)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    linhas = _linhas(args.size)
+    assert _caminho_orm(linhas, args.size) == _caminho_direto(linhas, args.size)
+
+    resultados = {}
+    for nome, funcao in (("orm+pydantic", _caminho_orm), ("tuplas+orjson", _caminho_direto)):
+        tempos = timeit.repeat(
+            lambda: funcao(linhas, args.size), number=args.repeticoes, repeat=5
+        )
+        resultados[nome] = min(tempos) / args.repeticoes * 1e6
+        print(f"{nome:>14}: {resultados[nome]:9.1f} µs/página (size={args.size})")
+
+    print(f"{'ganho':>14}: {resultados['orm+pydantic'] / resultados['tuplas+orjson']:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pytest
 from decimal import Decimal
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 from app.services.abastecimento_service import AbastecimentoService
 from app.schemas.abastecimento import AbastecimentoCreate
@@ -16,8 +17,8 @@ class FakeRepository:
     async def get_media_preco_por_combustivel(self, tipo):
         return self.media
 
-    async def create(self, abastecimento):
-        return abastecimento
+    async def create(self, valores, chave_idempotencia=None, commit_assincrono=False):
+        return SimpleNamespace(id=1, created_at=datetime.now(timezone.utc), **valores)
 
 
 @pytest.mark.asyncio
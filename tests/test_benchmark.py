@@ -0,0 +1,64 @@
+import json
+import random
+
+from scripts.benchmark import HistogramaHDR, gerar_requisicoes, ler_replay
+
+
+def test_percentis_com_erro_relativo_limitado():
+    rng = random.Random(1)
+    valores = sorted(rng.randint(1, 5_000_000) for _ in range(20_000))
+    histograma = HistogramaHDR()
+    for valor in valores:
+        histograma.registrar(valor)
+
+    for p in (50, 90, 99, 99.9):
+        exato = valores[round(len(valores) * p / 100) - 1]
+        assert abs(histograma.percentil(p) - exato) / exato < 1 / 128
+
+    assert histograma.percentil(100) == valores[-1]
+
+
+def test_valores_pequenos_sao_exatos():
+    histograma = HistogramaHDR()
+    for valor in range(1, 101):
+        histograma.registrar(valor)
+
+    assert histograma.percentil(50) == 50
+    assert histograma.percentil(99) == 99
+
+
+def test_requisicoes_pre_geradas_seguem_o_mix():
+    requisicoes = gerar_requisicoes(
+        2000, {"criar": 0.5, "listar": 0.3, "historico": 0.2}, motoristas=20
+    )
+    cenarios = [r[0] for r in requisicoes]
+
+    assert 0.45 < cenarios.count("criar") / 2000 < 0.55
+    assert len({r[3]["cpf_motorista"] for r in requisicoes if r[0] == "criar"}) <= 20
+
+    # data_hora é sorteada relativa a "agora"; o resto depende só da semente
+    def _sem_data_hora(lista):
+        return [
+            (c, m, p, {k: v for k, v in (corpo or {}).items() if k != "data_hora"})
+            for c, m, p, corpo in lista
+        ]
+
+    assert _sem_data_hora(requisicoes) == _sem_data_hora(gerar_requisicoes(
+        2000, {"criar": 0.5, "listar": 0.3, "historico": 0.2}, motoristas=20
+    ))
+
+
+def test_replay_aceita_requisicoes_e_payloads():
+    payload = {"tipo_combustivel": "DIESEL", "cpf_motorista": "52998224725"}
+    linhas = [
+        json.dumps({"method": "get", "path": "/api/v1/abastecimentos?size=10"}),
+        json.dumps(payload),
+        "",
+        json.dumps({"request_id": "x", "title": "ignorado"}),
+        "{quebrado",
+    ]
+
+    assert ler_replay(linhas) == [
+        ("replay", "GET", "/api/v1/abastecimentos?size=10", None),
+        ("replay", "POST", "/api/v1/abastecimentos", payload),
+    ]
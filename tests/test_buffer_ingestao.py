@@ -0,0 +1,201 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.buffer_ingestao import (
+    BufferCheio,
+    BufferIndisponivel,
+    BufferIngestao,
+    BufferTimeout,
+)
+
+
+class FakePersistencia:
+    """Registra os lotes gravados e devolve os valores com um id."""
+
+    def __init__(self, atraso=0.0):
+        self.lotes = []
+        self.chaves = []
+        self.atraso = atraso
+
+    async def __call__(self, valores, chaves):
+        self.chaves.extend(chaves)
+        await asyncio.sleep(self.atraso)
+        self.lotes.append(len(valores))
+        inicio = sum(self.lotes) - len(valores)
+        return [{**v, "id": inicio + i + 1} for i, v in enumerate(valores)]
+
+
+@pytest.mark.asyncio
+async def test_agrupa_registros_ate_o_tamanho_maximo():
+    persistir = FakePersistencia()
+    buffer = BufferIngestao(max_lote=3, intervalo_ms=1000)
+    buffer.iniciar(persistir)
+
+    criados = await asyncio.gather(
+        *(buffer.enfileirar({"n": n}) for n in range(6))
+    )
+    await buffer.parar()
+
+    assert persistir.lotes == [3, 3]
+    assert [c["n"] for c in criados] == list(range(6))
+
+
+@pytest.mark.asyncio
+async def test_grava_lote_parcial_apos_o_intervalo():
+    persistir = FakePersistencia()
+    buffer = BufferIngestao(max_lote=100, intervalo_ms=10)
+    buffer.iniciar(persistir)
+
+    criado = await buffer.enfileirar({"n": 1})
+    await buffer.parar()
+
+    assert criado["id"] == 1
+    assert persistir.lotes == [1]
+
+
+@pytest.mark.asyncio
+async def test_chave_de_idempotencia_segue_com_o_registro():
+    persistir = FakePersistencia()
+    buffer = BufferIngestao(max_lote=2, intervalo_ms=1000)
+    buffer.iniciar(persistir)
+
+    await asyncio.gather(
+        buffer.enfileirar({"n": 1}, chave_idempotencia="k-1"),
+        buffer.enfileirar({"n": 2}),
+    )
+    await buffer.parar()
+
+    assert persistir.chaves == ["k-1", None]
+
+
+@pytest.mark.asyncio
+async def test_parar_drena_registros_aceitos():
+    persistir = FakePersistencia()
+    buffer = BufferIngestao(max_lote=2, intervalo_ms=1000)
+    buffer.iniciar(persistir)
+
+    for n in range(5):
+        assert await buffer.enfileirar({"n": n}, aguardar=False) is None
+    await buffer.parar()
+
+    assert sum(persistir.lotes) == 5
+    with pytest.raises(BufferIndisponivel):
+        await buffer.enfileirar({"n": 6})
+
+
+@pytest.mark.asyncio
+async def test_fila_cheia_aplica_backpressure():
+    buffer = BufferIngestao(
+        max_lote=1, intervalo_ms=1, tamanho_fila=1, timeout_enfileirar_ms=10
+    )
+    buffer.iniciar(FakePersistencia(atraso=0.2))
+
+    await buffer.enfileirar({"n": 1}, aguardar=False)  # em gravação
+    await buffer.enfileirar({"n": 2}, aguardar=False)  # ocupa a fila
+
+    with pytest.raises(BufferCheio):
+        await buffer.enfileirar({"n": 3}, aguardar=False)
+
+    await buffer.parar()
+
+
+@pytest.mark.asyncio
+async def test_falha_na_gravacao_propaga_para_quem_aguarda():
+    async def persistir(valores, chaves):
+        raise RuntimeError("banco fora")
+
+    buffer = BufferIngestao(max_lote=10, intervalo_ms=1)
+    buffer.iniciar(persistir)
+
+    with pytest.raises(RuntimeError):
+        await buffer.enfileirar({"n": 1})
+
+    await buffer.parar()
+    assert buffer.falhas == 1
+
+
+class PersistenciaComInvalido(FakePersistencia):
+    """Falha o lote inteiro se algum registro for inválido."""
+
+    async def __call__(self, valores, chaves):
+        if any(v.get("invalido") for v in valores):
+            raise IntegrityError("INSERT", {}, ValueError("registro inválido"))
+        return await super().__call__(valores, chaves)
+
+
+@pytest.mark.asyncio
+async def test_registro_invalido_nao_derruba_o_lote():
+    persistir = PersistenciaComInvalido()
+    buffer = BufferIngestao(max_lote=3, intervalo_ms=1000)
+    buffer.iniciar(persistir)
+
+    resultados = await asyncio.gather(
+        buffer.enfileirar({"n": 0}),
+        buffer.enfileirar({"n": 1, "invalido": True}),
+        buffer.enfileirar({"n": 2}),
+        return_exceptions=True,
+    )
+    await buffer.parar()
+
+    assert resultados[0]["n"] == 0 and resultados[2]["n"] == 2
+    assert isinstance(resultados[1], IntegrityError)
+    assert (buffer.gravados, buffer.falhas) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_aceito_com_202_que_falha_vai_para_rejeitados(tmp_path):
+    arquivo = tmp_path / "rejeitados.ndjson"
+    persistir = PersistenciaComInvalido()
+    buffer = BufferIngestao(
+        max_lote=3, intervalo_ms=1000, arquivo_rejeitados=str(arquivo)
+    )
+    buffer.iniciar(persistir)
+
+    for valores in ({"n": 0}, {"n": 1, "invalido": True}, {"n": 2}):
+        await buffer.enfileirar(valores, aguardar=False)
+    await buffer.parar()
+
+    linhas = [json.loads(linha) for linha in arquivo.read_text().splitlines()]
+    assert len(linhas) == 1
+    assert (linhas[0]["n"], linhas[0]["invalido"]) == (1, True)
+    assert linhas[0]["erro"].startswith("IntegrityError: ")
+    assert (buffer.gravados, buffer.rejeitados) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_falha_de_conexao_derruba_o_lote_sem_regravar_um_a_um():
+    tentativas = []
+
+    async def persistir(valores, chaves):
+        tentativas.append(len(valores))
+        raise OperationalError("INSERT", {}, ConnectionRefusedError("banco fora"))
+
+    buffer = BufferIngestao(max_lote=3, intervalo_ms=1000)
+    buffer.iniciar(persistir)
+
+    resultados = await asyncio.gather(
+        *(buffer.enfileirar({"n": n}) for n in range(3)),
+        return_exceptions=True,
+    )
+    await buffer.parar()
+
+    assert tentativas == [3]
+    assert all(isinstance(r, OperationalError) for r in resultados)
+    assert buffer.falhas == 3
+
+
+@pytest.mark.asyncio
+async def test_gravacao_lenta_expira_para_quem_aguarda():
+    persistir = FakePersistencia(atraso=0.2)
+    buffer = BufferIngestao(max_lote=1, intervalo_ms=1, timeout_gravacao_ms=10)
+    buffer.iniciar(persistir)
+
+    with pytest.raises(BufferTimeout):
+        await buffer.enfileirar({"n": 1})
+
+    # O registro continua na fila e é gravado
+    await buffer.parar()
+    assert persistir.lotes == [1]
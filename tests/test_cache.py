@@ -0,0 +1,134 @@
+import pytest
+
+from app.config import settings
+from app.core import cache as modulo_cache
+from app.core.cache import (
+    CacheRespostas,
+    MemoriaLRUBackend,
+    RedisBackend,
+    criar_backend,
+    namespace_lista,
+)
+from app.models.abastecimento import TipoCombustivel
+
+
+class FakeRedis:
+    """Fake local do cliente redis.asyncio (apenas get/set/incr)."""
+
+    def __init__(self):
+        self.dados = {}
+
+    async def get(self, chave):
+        return self.dados.get(chave)
+
+    async def set(self, chave, valor, ex=None):
+        self.dados[chave] = valor
+
+    async def incr(self, chave):
+        self.dados[chave] = str(int(self.dados.get(chave, b"0")) + 1).encode()
+        return int(self.dados[chave])
+
+
+def _historico(total):
+    return f'{{"total_abastecimentos":{total}}}'.encode()
+
+
+@pytest.fixture(params=["memoria", "redis"])
+def cache(request):
+    if request.param == "memoria":
+        return CacheRespostas(MemoriaLRUBackend(max_itens=100), ttl=60)
+    return CacheRespostas(RedisBackend(client=FakeRedis()), ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_segunda_leitura_vem_do_cache(cache):
+    chamadas = []
+
+    async def carregar():
+        chamadas.append(1)
+        return _historico(len(chamadas))
+
+    primeira = await cache.obter_ou_carregar("historico:1", {}, carregar)
+    segunda = await cache.obter_ou_carregar("historico:1", {}, carregar)
+
+    assert primeira == segunda
+    assert len(chamadas) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_invalidacao_afeta_apenas_o_namespace(cache):
+    chamadas = []
+
+    async def carregar():
+        chamadas.append(1)
+        return _historico(len(chamadas))
+
+    await cache.obter_ou_carregar("historico:1", {}, carregar)
+    await cache.obter_ou_carregar("historico:2", {}, carregar)
+
+    await cache.invalidar("historico:1")
+
+    recarregado = await cache.obter_ou_carregar("historico:1", {}, carregar)
+    await cache.obter_ou_carregar("historico:2", {}, carregar)
+
+    assert recarregado == _historico(3)
+    assert len(chamadas) == 3
+
+
+@pytest.mark.asyncio
+async def test_lru_descarta_entrada_menos_recente():
+    backend = MemoriaLRUBackend(max_itens=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    await backend.get("a")
+
+    await backend.set("c", b"3", ttl=60)
+
+    assert await backend.get("a") == b"1"
+    assert await backend.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_desativado_sempre_carrega():
+    cache = CacheRespostas(backend=None)
+
+    async def carregar():
+        return _historico(1)
+
+    await cache.obter_ou_carregar("historico:1", {}, carregar)
+
+    assert cache.estatisticas()["backend"] == "desativado"
+    assert cache.hits == cache.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_leitura_de_replica_atrasada_nao_e_guardada(cache):
+    chamadas = []
+
+    async def carregar():
+        chamadas.append(1)
+        return _historico(len(chamadas))
+
+    await cache.obter_ou_carregar("historico:1", {}, carregar, guardar=False)
+    await cache.obter_ou_carregar("historico:1", {}, carregar)
+    segunda = await cache.obter_ou_carregar("historico:1", {}, carregar, guardar=False)
+
+    assert len(chamadas) == 2
+    assert segunda == _historico(2)
+
+
+def test_backend_padrao_e_redis_quando_ha_redis_url(monkeypatch):
+    monkeypatch.setattr(modulo_cache, "RedisBackend", lambda url: ("redis", url))
+
+    monkeypatch.setattr(settings, "redis_url", None)
+    assert isinstance(criar_backend(None), MemoriaLRUBackend)
+
+    monkeypatch.setattr(settings, "redis_url", "redis://cache:6379/1")
+    assert criar_backend(None) == ("redis", "redis://cache:6379/1")
+    assert isinstance(criar_backend("memoria"), MemoriaLRUBackend)
+
+
+def test_namespace_lista_por_combustivel():
+    assert namespace_lista(TipoCombustivel.DIESEL) == "lista:DIESEL"
+    assert namespace_lista(None) == "lista:*"
@@ -0,0 +1,178 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import camada_quente as modulo
+from app.core.camada_quente import CamadaQuente
+from app.models.abastecimento import TipoCombustivel
+from app.services.abastecimento_service import AbastecimentoService
+
+AGORA = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def _abastecimento(id, data_hora, tipo=TipoCombustivel.GASOLINA, preco="5.50",
+                   volume="40.00", posto=1, anomalo=False):
+    return SimpleNamespace(
+        id=id,
+        data_hora=data_hora,
+        tipo_combustivel=tipo,
+        preco_por_litro=Decimal(preco),
+        volume_abastecido=Decimal(volume),
+        id_posto=posto,
+        improper_data=anomalo,
+    )
+
+
+def _carregada(linhas, janela_horas=48):
+    camada = CamadaQuente(janela_horas=janela_horas)
+    camada.iniciar_carga()
+    camada.carregar(linhas)
+    camada.concluir_carga(camada.inicio_janela(AGORA))
+    return camada
+
+
+def test_series_vetorizada_bate_com_agregacao_ingenua():
+    rng = random.Random(7)
+    linhas = [
+        _abastecimento(
+            i,
+            AGORA - timedelta(minutes=rng.randrange(0, 24 * 60)),
+            tipo=rng.choice(list(TipoCombustivel)),
+            preco=f"{rng.uniform(4, 7):.2f}",
+            volume=f"{rng.uniform(10, 80):.2f}",
+            posto=rng.randrange(1, 4),
+            anomalo=rng.random() < 0.1,
+        )
+        for i in range(3000)
+    ]
+    camada = _carregada(linhas)
+    inicio, fim = AGORA - timedelta(hours=20), AGORA - timedelta(hours=2)
+
+    pontos = camada.series(inicio, fim, 3600, id_posto=2)
+
+    esperado = defaultdict(list)
+    for l in linhas:
+        if inicio <= l.data_hora < fim and l.id_posto == 2:
+            balde = l.data_hora.replace(minute=0, second=0, microsecond=0)
+            esperado[(balde, l.tipo_combustivel)].append(l)
+
+    assert [(p["inicio"], p["tipo_combustivel"]) for p in pontos] == sorted(
+        esperado, key=lambda chave: (chave[0], list(TipoCombustivel).index(chave[1]))
+    )
+    for ponto in pontos:
+        grupo = esperado[(ponto["inicio"], ponto["tipo_combustivel"])]
+        precos = [float(l.preco_por_litro) for l in grupo]
+        assert ponto["total_abastecimentos"] == len(grupo)
+        assert ponto["preco_medio"] == pytest.approx(sum(precos) / len(precos), abs=1e-3)
+        assert (ponto["preco_min"], ponto["preco_max"]) == (min(precos), max(precos))
+        assert ponto["litros_vendidos"] == pytest.approx(
+            float(sum(l.volume_abastecido for l in grupo)), abs=0.01
+        )
+        assert ponto["quantidade_anomalias"] == sum(l.improper_data for l in grupo)
+
+
+def test_registros_durante_a_carga_entram_sem_duplicar():
+    camada = CamadaQuente(janela_horas=48)
+    camada.registrar(_abastecimento(1, AGORA))  # antes da carga: ignorado
+    assert len(camada.colunas) == 0
+
+    camada.iniciar_carga()
+    camada.carregar([_abastecimento(1, AGORA), _abastecimento(2, AGORA)])
+    camada.registrar(_abastecimento(2, AGORA))  # já veio na carga
+    camada.registrar(_abastecimento(3, AGORA))
+    camada.concluir_carga(camada.inicio_janela(AGORA))
+
+    assert sorted(camada.colunas["id"].tolist()) == [1, 2, 3]
+
+    # Crescimento dos arrays além da capacidade inicial
+    for i in range(4, 3000):
+        camada.registrar(_abastecimento(i, AGORA))
+    assert len(camada.colunas) == 2999
+
+
+def test_expurgo_descarta_o_que_saiu_da_janela():
+    camada = _carregada([
+        _abastecimento(1, AGORA - timedelta(hours=40)),
+        _abastecimento(2, AGORA - timedelta(hours=1)),
+    ])
+    assert camada.cobre(AGORA - timedelta(hours=47))
+
+    removidos = camada.expurgar(AGORA + timedelta(hours=10))
+
+    assert removidos == 1
+    assert camada.colunas["id"].tolist() == [2]
+    assert not camada.cobre(AGORA - timedelta(hours=47))
+    assert camada.cobre(AGORA - timedelta(hours=30))
+
+
+def test_sem_recarga_recente_a_camada_deixa_de_cobrir():
+    camada = CamadaQuente(janela_horas=48, recarga_segundos=300)
+    camada.iniciar_carga()
+    camada.carregar([_abastecimento(1, AGORA)])
+    camada.concluir_carga(camada.inicio_janela())
+    recente = datetime.now(timezone.utc)
+
+    assert camada.cobre(recente)
+    assert not camada.defasada(camada.carregada_em + 600)
+    assert camada.defasada(camada.carregada_em + 601)
+
+    camada.carregada_em -= 601
+    assert not camada.cobre(recente)
+    assert camada.estatisticas()["defasada"]
+
+
+class FakeRepository:
+    def __init__(self):
+        self.consultas = 0
+
+    async def get_serie_precos(self, inicio, fim, intervalo_segundos, tipo, posto):
+        self.consultas += 1
+        return [
+            SimpleNamespace(
+                balde=int(AGORA.timestamp()) // intervalo_segundos,
+                tipo_combustivel=TipoCombustivel.DIESEL,
+                total_abastecimentos=2,
+                preco_medio=Decimal("6.1250000"),
+                preco_min=Decimal("6.00"),
+                preco_max=Decimal("6.25"),
+                litros_vendidos=Decimal("120.00"),
+                quantidade_anomalias=0,
+            )
+        ]
+
+
+@pytest.mark.asyncio
+async def test_serie_usa_memoria_na_janela_e_banco_fora_dela(monkeypatch):
+    camada = _carregada([_abastecimento(1, AGORA - timedelta(minutes=30))])
+    monkeypatch.setattr(
+        "app.services.abastecimento_service.camada_quente", camada
+    )
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = FakeRepository()
+
+    recente = await service.get_serie_precos(
+        AGORA - timedelta(hours=2), AGORA, "1h"
+    )
+    antiga = await service.get_serie_precos(
+        AGORA - timedelta(days=10), AGORA, "1d"
+    )
+
+    assert (recente.origem, len(recente.pontos)) == ("memoria", 1)
+    assert recente.pontos[0].preco_medio == Decimal("5.5")
+    assert service.repository.consultas == 1
+    assert antiga.origem == "banco"
+    assert antiga.pontos[0].inicio == AGORA.replace(hour=0)
+    assert antiga.pontos[0].preco_medio == Decimal("6.125")
+
+
+def test_camada_desativada_nao_cobre_nada():
+    camada = CamadaQuente(janela_horas=0)
+    camada.registrar(_abastecimento(1, AGORA))
+
+    assert not camada.ativo
+    assert not camada.cobre(AGORA)
+    assert modulo.de_micros(modulo.para_micros(AGORA)) == AGORA
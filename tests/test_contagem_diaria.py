@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.contagem_diaria_repository import (
+    agrupar_por_tipo_dia,
+    estimar_bordas,
+    planejar_contagem,
+)
+
+UTC = timezone.utc
+MICRO = timedelta(microseconds=1)
+
+
+def test_sem_filtro_soma_todos_os_buckets():
+    assert planejar_contagem(None, None) == ((None, None), [])
+
+
+def test_dias_inteiros_sem_bordas():
+    dias, bordas = planejar_contagem(
+        datetime(2025, 1, 1, tzinfo=UTC),
+        datetime(2025, 1, 31, 23, 59, 59, 999999, tzinfo=UTC),
+    )
+
+    assert dias == (date(2025, 1, 1), date(2025, 1, 31))
+    assert bordas == []
+
+
+def test_bordas_parciais_nos_dois_lados():
+    inicio = datetime(2025, 1, 1, 10, tzinfo=UTC)
+    fim = datetime(2025, 1, 10, 6, tzinfo=UTC)
+
+    dias, bordas = planejar_contagem(inicio, fim)
+
+    assert dias == (date(2025, 1, 2), date(2025, 1, 9))
+    assert bordas == [
+        (inicio, datetime(2025, 1, 2, tzinfo=UTC)),
+        (datetime(2025, 1, 10, tzinfo=UTC), fim + MICRO),
+    ]
+
+
+def test_fim_a_meia_noite_inclui_o_instante():
+    fim = datetime(2025, 1, 10, tzinfo=UTC)
+
+    dias, bordas = planejar_contagem(datetime(2025, 1, 1, tzinfo=UTC), fim)
+
+    assert dias == (date(2025, 1, 1), date(2025, 1, 9))
+    assert bordas == [(fim, fim + MICRO)]
+
+
+def test_intervalo_menor_que_um_dia_vira_bordas_por_dia():
+    inicio = datetime(2025, 1, 1, 18, tzinfo=UTC)
+    fim = datetime(2025, 1, 2, 6, tzinfo=UTC)
+
+    dias, bordas = planejar_contagem(inicio, fim)
+
+    assert dias is None
+    assert bordas == [
+        (inicio, datetime(2025, 1, 2, tzinfo=UTC)),
+        (datetime(2025, 1, 2, tzinfo=UTC), fim + MICRO),
+    ]
+
+
+def test_intervalo_invertido_nao_conta_nada():
+    assert planejar_contagem(
+        datetime(2025, 1, 2, tzinfo=UTC), datetime(2025, 1, 1, 12, tzinfo=UTC)
+    ) == (None, [])
+
+
+def test_fuso_e_datas_sem_fuso_como_utc():
+    brt = timezone(timedelta(hours=-3))
+
+    dias, bordas = planejar_contagem(
+        datetime(2024, 12, 31, 21, tzinfo=brt), datetime(2025, 1, 5, 12)
+    )
+
+    assert dias == (date(2025, 1, 1), date(2025, 1, 4))
+    assert bordas == [
+        (datetime(2025, 1, 5, tzinfo=UTC), datetime(2025, 1, 5, 12, tzinfo=UTC) + MICRO)
+    ]
+
+
+def test_estimativa_proporcional_a_fracao_do_dia():
+    bordas = [
+        (datetime(2025, 1, 1, 18, tzinfo=UTC), datetime(2025, 1, 2, tzinfo=UTC)),
+        (datetime(2025, 1, 2, tzinfo=UTC), datetime(2025, 1, 2, 12, tzinfo=UTC)),
+    ]
+
+    total = estimar_bordas(bordas, {date(2025, 1, 1): 400, date(2025, 1, 2): 100})
+
+    assert total == 150
+
+
+def test_agrupa_por_tipo_e_dia_utc():
+    meia_noite = datetime(2025, 1, 2, tzinfo=UTC)
+
+    def _abastecimento(tipo, data_hora):
+        return SimpleNamespace(tipo_combustivel=tipo, data_hora=data_hora)
+
+    linhas = agrupar_por_tipo_dia([
+        _abastecimento(TipoCombustivel.GASOLINA, meia_noite - timedelta(minutes=1)),
+        _abastecimento(TipoCombustivel.GASOLINA, meia_noite),
+        _abastecimento(TipoCombustivel.DIESEL, meia_noite),
+        _abastecimento("GASOLINA", meia_noite + timedelta(hours=3)),
+    ])
+
+    assert [(l["tipo_combustivel"], l["dia"].day, l["quantidade"]) for l in linhas] == [
+        (TipoCombustivel.DIESEL, 2, 1),
+        (TipoCombustivel.GASOLINA, 1, 1),
+        (TipoCombustivel.GASOLINA, 2, 2),
+    ]
@@ -1,5 +1,11 @@
 import pytest
-from app.utils.validators import is_valid_cpf
+from app.utils.validators import (
+    _memo,
+    is_valid_cpf,
+    normalizar_cpf,
+    normalizar_cpfs,
+    validar_cpfs,
+)
 
 @pytest.mark.parametrize(
     "cpf",
@@ -24,4 +30,40 @@ def test_validar_cpf(cpf):
     ]
 )
 def test_invalidar_cpf(cpf):
-    assert is_valid_cpf(cpf) is False
\ No newline at end of file
+    assert is_valid_cpf(cpf) is False
+
+def test_normalizar_cpf_remove_formatacao():
+    assert normalizar_cpf("529.982.247-25") == "52998224725"
+    assert normalizar_cpf("529.982.247-26") is None
+
+
+def test_lote_concorda_com_validacao_individual():
+    cpfs = [
+        "52998224725", "529.982.247-25", "16899535009", "98765432100",
+        "12345678900", "11111111111", "abc", "", "5299822472", "529982247250",
+    ]
+    cpfs += [f"{n:011d}" for n in range(10_000_000_000, 10_000_020_000, 7)]
+
+    lote = normalizar_cpfs(cpfs)
+    _memo.limpar()
+
+    assert lote == [normalizar_cpf(cpf) for cpf in cpfs]
+    assert validar_cpfs(cpfs).tolist() == [cpf is not None for cpf in lote]
+
+
+def test_lote_alimenta_o_memo():
+    _memo.limpar()
+    normalizar_cpfs(["529.982.247-25", "12345678900"])
+
+    assert _memo.get("529.982.247-25") == "52998224725"
+    assert _memo.get("12345678900") is None
+    assert len(_memo) == 2
+
+
+def test_entrada_longa_e_invalida_e_fica_fora_do_memo():
+    _memo.limpar()
+    longo = "529.982.247-25" + " " * 10_000
+
+    assert normalizar_cpfs([longo, "52998224725"]) == [None, "52998224725"]
+    assert normalizar_cpf(longo) is None
+    assert len(_memo) == 1
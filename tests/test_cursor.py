@@ -0,0 +1,19 @@
+import pytest
+from datetime import datetime, timezone
+
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_ida_e_volta():
+    data_hora = datetime(2025, 1, 22, 14, 30, 15, 123456, tzinfo=timezone.utc)
+
+    cursor = encode_cursor(data_hora, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (data_hora, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "bm90LWpzb24", "eyJkIjoxfQ"])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
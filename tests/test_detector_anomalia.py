@@ -0,0 +1,126 @@
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.core.detector_anomalia import DetectorAnomalia, TDigest
+from app.models.abastecimento import TipoCombustivel
+
+GASOLINA = TipoCombustivel.GASOLINA
+
+
+def test_tdigest_estima_quantis_da_cauda():
+    rng = random.Random(7)
+    valores = [rng.gauss(5.5, 0.2) for _ in range(20_000)]
+    digest = TDigest(compressao=100)
+    for valor in valores:
+        digest.adicionar(valor)
+
+    ordenados = sorted(valores)
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exato = ordenados[int(q * len(ordenados))]
+        assert abs(digest.quantil(q) - exato) < 0.02  # 0.1 desvio-padrão
+
+    assert len(digest.centroides) <= 100
+
+
+def test_tdigest_serializa_e_restaura():
+    digest = TDigest()
+    for i in range(1000):
+        digest.adicionar(float(i))
+
+    restaurado = TDigest.de_dict(digest.para_dict())
+
+    assert restaurado.quantil(0.99) == digest.quantil(0.99)
+    assert restaurado.total == 1000
+
+
+def _alimentar(detector, id_posto, media, quantidade=300, semente=1):
+    rng = random.Random(semente)
+    for _ in range(quantidade):
+        preco = Decimal(str(round(rng.gauss(media, 0.05), 2)))
+        detector.registrar(id_posto, GASOLINA, preco)
+
+
+def test_sem_historico_suficiente_delega_ao_limiar():
+    detector = DetectorAnomalia(min_amostras=50)
+    _alimentar(detector, 1, 5.0, quantidade=49)
+
+    assert detector.avaliar(1, GASOLINA, Decimal("9.00")) is None
+    assert detector.avaliar(2, GASOLINA, Decimal("9.00")) is None
+
+
+def test_limite_e_relativo_ao_posto():
+    detector = DetectorAnomalia(min_amostras=50)
+    _alimentar(detector, 1, 7.0)  # posto de região mais cara
+    _alimentar(detector, 2, 5.0)
+
+    # 7.10 passaria do limiar nacional (+25% sobre ~5.5), mas é normal no posto 1
+    assert detector.avaliar(1, GASOLINA, Decimal("7.10")) is False
+    assert detector.avaliar(2, GASOLINA, Decimal("7.00")) is True
+    assert detector.avaliar(2, GASOLINA, Decimal("5.05")) is False
+
+
+def test_modo_limiar_desativa_o_detector():
+    detector = DetectorAnomalia(ativo=False, min_amostras=1)
+    _alimentar(detector, 1, 5.0)
+
+    assert detector.avaliar(1, GASOLINA, Decimal("50.00")) is None
+
+
+def test_snapshot_exporta_alterados_e_recarrega():
+    detector = DetectorAnomalia(min_amostras=50)
+    _alimentar(detector, 1, 5.0)
+
+    linhas = detector.exportar()
+    assert [(l["id_posto"], l["tipo_combustivel"]) for l in linhas] == [(1, GASOLINA)]
+    assert detector.exportar() == []
+
+    novo = DetectorAnomalia(min_amostras=50)
+    novo.carregar(SimpleNamespace(**linha) for linha in linhas)
+
+    for preco in ("5.05", "6.00"):
+        assert novo.avaliar(1, GASOLINA, Decimal(preco)) == detector.avaliar(
+            1, GASOLINA, Decimal(preco)
+        )
+
+
+def test_snapshots_de_varios_workers_se_somam():
+    banco = {}
+
+    def gravar(detector):
+        linhas = detector.mesclar_snapshot(
+            [SimpleNamespace(**l) for l in banco.values()], detector.exportar()
+        )
+        banco.update({(l["id_posto"], l["tipo_combustivel"]): l for l in linhas})
+        detector.carregar(SimpleNamespace(**l) for l in banco.values())
+
+    worker_a, worker_b = DetectorAnomalia(), DetectorAnomalia()
+    _alimentar(worker_a, 1, 5.0, quantidade=200, semente=1)
+    _alimentar(worker_b, 1, 5.0, quantidade=100, semente=2)
+    gravar(worker_a)
+    gravar(worker_b)
+    _alimentar(worker_a, 1, 5.0, quantidade=50, semente=3)
+    gravar(worker_a)
+
+    linha = banco[(1, GASOLINA)]
+    assert linha["quantidade"] == 350
+    assert linha["digest"]["total"] == 350
+    # Cada worker recarrega o que os outros gravaram
+    assert worker_b._estatisticas[(1, GASOLINA)].quantidade == 300
+    assert worker_a._estatisticas[(1, GASOLINA)].quantidade == 350
+
+
+def test_mesclar_um_ponto_equivale_a_registrar():
+    detector = DetectorAnomalia(alpha=0.1)
+    _alimentar(detector, 1, 5.0, quantidade=100)
+    base = detector.exportar()[0]
+
+    unico = DetectorAnomalia(alpha=0.1)
+    unico.registrar(1, GASOLINA, Decimal("5.40"))
+    [mesclada] = detector.mesclar_snapshot([SimpleNamespace(**base)], unico.exportar())
+
+    detector.registrar(1, GASOLINA, Decimal("5.40"))
+    esperada = detector._estatisticas[(1, GASOLINA)]
+    assert mesclada["quantidade"] == esperada.quantidade
+    assert abs(mesclada["media"] - esperada.media) < 1e-12
+    assert abs(mesclada["variancia"] - esperada.variancia) < 1e-12
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app.services.abastecimento_service import AbastecimentoService
+from app.utils.serializacao import CAMPOS, comprimir_gzip
+from tests.test_serializacao import LINHAS
+
+
+class FakeRepository:
+    """Entrega as linhas em partições, como o cursor no servidor."""
+
+    def __init__(self, linhas, tamanho_particao=1):
+        self.linhas = linhas
+        self.tamanho_particao = tamanho_particao
+        self.filtros = None
+
+    async def stream_all(self, tipo_combustivel, data_inicio, data_fim, yield_per=2000):
+        self.filtros = (tipo_combustivel, data_inicio, data_fim)
+        for inicio in range(0, len(self.linhas), self.tamanho_particao):
+            yield self.linhas[inicio:inicio + self.tamanho_particao]
+
+
+def _service(linhas):
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = FakeRepository(linhas)
+    return service
+
+
+async def _coletar(partes):
+    return b"".join([parte async for parte in partes])
+
+
+@pytest.mark.asyncio
+async def test_exportacao_ndjson_uma_linha_por_abastecimento():
+    corpo = await _coletar(
+        _service(LINHAS).exportar_abastecimentos("ndjson", None, None, None)
+    )
+
+    registros = [json.loads(linha) for linha in corpo.splitlines()]
+    assert [r["id"] for r in registros] == [1, 2]
+    assert registros[1]["preco_por_litro"] == "5E+1"
+
+
+@pytest.mark.asyncio
+async def test_exportacao_csv_com_cabecalho():
+    corpo = await _coletar(
+        _service(LINHAS).exportar_abastecimentos("csv", None, None, None)
+    )
+
+    linhas = list(csv.DictReader(io.StringIO(corpo.decode())))
+    assert tuple(linhas[0]) == CAMPOS
+    assert linhas[0]["data_hora"] == "2025-01-02T03:04:05Z"
+    assert linhas[0]["tipo_combustivel"] == "GASOLINA"
+    assert [l["improper_data"] for l in linhas] == ["false", "true"]
+
+
+@pytest.mark.asyncio
+async def test_gzip_em_streaming():
+    async def partes():
+        for i in range(100):
+            yield f"linha {i}\n".encode()
+
+    comprimido = await _coletar(comprimir_gzip(partes()))
+
+    assert gzip.decompress(comprimido) == b"".join(
+        f"linha {i}\n".encode() for i in range(100)
+    )
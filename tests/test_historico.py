@@ -0,0 +1,69 @@
+import json
+from collections import namedtuple
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.services.abastecimento_service import AbastecimentoService
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.abastecimento_repository import COLUNAS_RESPOSTA
+from app.utils.cursor import decode_cursor
+
+Linha = namedtuple("Linha", [coluna.key for coluna in COLUNAS_RESPOSTA])
+
+
+def _abastecimento(id, data_hora):
+    return Linha(
+        id=id,
+        id_posto=1,
+        data_hora=data_hora,
+        tipo_combustivel=TipoCombustivel.GASOLINA,
+        preco_por_litro=Decimal("5.00"),
+        volume_abastecido=Decimal("40.00"),
+        cpf_motorista="52998224725",
+        improper_data=False,
+        created_at=data_hora,
+    )
+
+
+class FakeRepository:
+    """Fake com histórico em memória, ordenado como no banco."""
+
+    def __init__(self, abastecimentos):
+        self.abastecimentos = sorted(
+            abastecimentos, key=lambda a: (a.data_hora, a.id), reverse=True
+        )
+
+    async def count_by_cpf(self, cpf):
+        return len(self.abastecimentos)
+
+    async def get_by_cpf_keyset(self, cpf, size, apos=None):
+        items = [
+            a for a in self.abastecimentos
+            if apos is None or (a.data_hora, a.id) < apos
+        ]
+        return items[:size]
+
+
+@pytest.mark.asyncio
+async def test_historico_paginado_percorre_todas_as_paginas():
+    inicio = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = FakeRepository(
+        [_abastecimento(i, inicio + timedelta(hours=i)) for i in range(1, 6)]
+    )
+
+    vistos, cursor = [], None
+    while True:
+        pagina = json.loads(await service.get_historico_motorista_paginado(
+            "52998224725", size=2, cursor=cursor
+        ))
+        assert pagina["total_abastecimentos"] == 5
+        vistos.extend(a["id"] for a in pagina["abastecimentos"])
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            break
+        assert decode_cursor(cursor)[1] == vistos[-1]
+
+    assert vistos == [5, 4, 3, 2, 1]
@@ -0,0 +1,244 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.core.idempotencia import (
+    AbastecimentoDuplicado,
+    FiltroBloom,
+    IndiceIdempotencia,
+    chave_natural,
+)
+from app.models.abastecimento import TipoCombustivel
+from app.schemas.abastecimento import AbastecimentoCreate
+from app.services.abastecimento_service import AbastecimentoService
+
+CPF = "52998224725"
+AGORA = datetime(2025, 1, 10, 12, tzinfo=timezone.utc)
+
+
+def test_bloom_sem_falso_negativo_e_taxa_proxima_da_configurada():
+    filtro = FiltroBloom(capacidade=10_000, taxa_falsos_positivos=0.01)
+    for i in range(10_000):
+        filtro.adicionar(f"presente-{i}".encode())
+
+    assert all(f"presente-{i}".encode() in filtro for i in range(10_000))
+
+    falsos = sum(f"ausente-{i}".encode() in filtro for i in range(20_000))
+    assert falsos / 20_000 < 0.02
+
+
+def test_chave_natural_normaliza_fuso_e_escala_do_volume():
+    brt = timezone(timedelta(hours=-3))
+
+    assert chave_natural(
+        1, datetime(2025, 1, 10, 9, tzinfo=brt), CPF, Decimal("40")
+    ) == chave_natural(1, AGORA, CPF, Decimal("40.000"))
+    assert chave_natural(1, AGORA, CPF, Decimal("40.005")) == chave_natural(
+        1, AGORA, CPF, Decimal("40.01")
+    )
+
+
+def test_indice_so_confia_no_filtro_dentro_da_cobertura():
+    indice = IndiceIdempotencia(capacidade=1000, janela_horas=24)
+    novo = (1, AGORA, CPF, Decimal("40.00"))
+
+    # Antes da carga tudo é "talvez"
+    assert indice.talvez_duplicado(*novo)
+
+    indice.cobertura_desde = indice.inicio_janela(AGORA)
+    assert not indice.talvez_duplicado(*novo)
+    assert indice.talvez_duplicado(1, AGORA - timedelta(days=2), CPF, Decimal("40.00"))
+
+    indice.registrar(*novo)
+    assert indice.talvez_duplicado(*novo)
+
+    assert not indice.talvez_duplicado(2, AGORA, CPF, Decimal("40.00"), "chave-1")
+    indice.registrar_chave("chave-1")
+    assert indice.talvez_duplicado(2, AGORA, CPF, Decimal("40.00"), "chave-1")
+
+
+def test_modo_banco_ignora_o_filtro():
+    indice = IndiceIdempotencia(modo="banco", capacidade=1000)
+    indice.cobertura_desde = indice.inicio_janela(AGORA)
+
+    assert indice.talvez_duplicado(1, AGORA, CPF, Decimal("40.00"))
+
+
+class FakeRepository:
+    def __init__(self, existente=None):
+        self.existente = existente
+        self.consultas = 0
+
+    async def get_by_chave_natural(self, *args):
+        self.consultas += 1
+        return self.existente
+
+
+class FakeChaves:
+    def __init__(self, existente=None):
+        self.existente = existente
+        self.consultas = 0
+
+    async def get_abastecimento(self, chave):
+        self.consultas += 1
+        return self.existente
+
+
+def _service(repository, chaves):
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = repository
+    service.chaves = chaves
+    return service
+
+
+def _data():
+    return AbastecimentoCreate(
+        id_posto=1,
+        data_hora=AGORA,
+        tipo_combustivel=TipoCombustivel.GASOLINA,
+        preco_por_litro=Decimal("5.00"),
+        volume_abastecido=Decimal("40"),
+        cpf_motorista=CPF,
+    )
+
+
+@pytest.fixture
+def indice(monkeypatch):
+    indice = IndiceIdempotencia(capacidade=1000, janela_horas=24)
+    indice.cobertura_desde = indice.inicio_janela(AGORA)
+    monkeypatch.setattr(
+        "app.services.abastecimento_service.indice_idempotencia", indice
+    )
+    return indice
+
+
+@pytest.mark.asyncio
+async def test_novo_com_certeza_nao_consulta_o_banco(indice):
+    service = _service(FakeRepository(), FakeChaves())
+
+    await service.verificar_duplicado(_data(), "chave-1")
+
+    assert service.repository.consultas == 0
+    assert service.chaves.consultas == 0
+
+
+@pytest.mark.asyncio
+async def test_possivel_repeticao_devolve_o_original(indice):
+    original = object()
+    indice.registrar(1, AGORA, CPF, Decimal("40.00"))
+    service = _service(FakeRepository(existente=original), FakeChaves())
+
+    with pytest.raises(AbastecimentoDuplicado) as erro:
+        await service.verificar_duplicado(_data())
+
+    assert erro.value.abastecimento is original
+    assert service.chaves.consultas == 0
+
+
+@pytest.mark.asyncio
+async def test_falso_positivo_segue_como_novo(indice):
+    indice.registrar(1, AGORA, CPF, Decimal("40.00"))
+    service = _service(FakeRepository(), FakeChaves())
+
+    await service.verificar_duplicado(_data(), "chave-1")
+
+    assert (service.chaves.consultas, service.repository.consultas) == (1, 1)
+
+
+class FakeSessao:
+    commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def commit(self):
+        FakeSessao.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_carga_e_expurgo_das_chaves_usam_a_janela(monkeypatch):
+    from app.services import tarefas
+
+    indice = IndiceIdempotencia(capacidade=1000, janela_horas=24)
+    janelas = {}
+
+    class FakeAbastecimentos:
+        def __init__(self, session):
+            pass
+
+        async def stream_chaves_naturais(self, desde):
+            janelas["naturais"] = desde
+            return
+            yield
+
+    class FakeChavesRepositorio:
+        def __init__(self, session):
+            pass
+
+        async def listar_chaves(self, desde):
+            janelas["chaves"] = desde
+            return ["recente"]
+
+        async def remover_anteriores(self, limite):
+            janelas["expurgo"] = limite
+            return 3
+
+    monkeypatch.setattr(tarefas, "indice_idempotencia", indice)
+    monkeypatch.setattr(tarefas, "AsyncSessionLocal", FakeSessao)
+    monkeypatch.setattr(tarefas, "AbastecimentoRepository", FakeAbastecimentos)
+    monkeypatch.setattr(tarefas, "ChaveIdempotenciaRepository", FakeChavesRepositorio)
+    FakeSessao.commits = 0
+
+    await tarefas.carregar_filtro_idempotencia()
+    assert await tarefas.expurgar_chaves_idempotencia() == 3
+
+    assert janelas["chaves"] == janelas["naturais"] == indice.cobertura_desde
+    assert janelas["expurgo"] >= janelas["chaves"]
+    assert FakeSessao.commits == 1
+    assert "k:recente".encode() in indice.filtro
+
+
+class FakeLote:
+    def __init__(self):
+        self.chaves = None
+
+    async def get_media_preco_por_combustivel(self, tipo):
+        return None
+
+    async def create_many(self, valores, tamanho_chunk=500, chaves_idempotencia=None):
+        self.chaves = chaves_idempotencia
+        return []
+
+
+@pytest.mark.asyncio
+async def test_lote_do_buffer_grava_e_registra_a_idempotency_key(indice):
+    service = _service(FakeLote(), FakeChaves())
+
+    await service.persistir_valores([{}, {}], ["chave-1", None])
+
+    assert service.repository.chaves == ["chave-1", None]
+    assert indice.talvez_duplicado(2, AGORA, CPF, Decimal("40.00"), "chave-1")
+
+
+@pytest.mark.asyncio
+async def test_chave_repetida_no_buffer_devolve_o_original(monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+
+    class FakeBuffer:
+        async def enfileirar(self, valores, aguardar=True, chave_idempotencia=None):
+            raise IntegrityError("INSERT", {}, ValueError("chave repetida"))
+
+    original = object()
+    monkeypatch.setattr(
+        "app.services.abastecimento_service.buffer_ingestao", FakeBuffer()
+    )
+    service = _service(FakeLote(), FakeChaves(existente=original))
+
+    with pytest.raises(AbastecimentoDuplicado) as erro:
+        await service.enfileirar_abastecimento(_data(), "chave-1")
+
+    assert erro.value.abastecimento is original
@@ -0,0 +1,130 @@
+import io
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.abastecimento import Abastecimento, TipoCombustivel
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.services.abastecimento_service import AbastecimentoService
+from app.utils.lote import validar_itens_lote
+from scripts.importar_abastecimentos import (
+    gravar_checkpoint,
+    ler_checkpoint,
+    ler_registros,
+)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+POSTO_TESTE = 987_654
+
+CABECALHO = "id_posto,data_hora,tipo_combustivel,preco_por_litro,volume_abastecido,cpf_motorista\n"
+
+
+def test_csv_valida_com_as_regras_da_api():
+    arquivo = io.StringIO(
+        CABECALHO
+        + "1,2025-01-22T14:30:00+00:00,GASOLINA,5.00,40,529.982.247-25\n"
+        + "1,2025-01-22T14:30:00+00:00,GASOLINA,-5.00,40,52998224725\n"
+        + "1,2025-01-22T14:30:00+00:00,GASOLINA,5.00,40,12345678900\n"
+    )
+
+    validos, rejeitados = validar_itens_lote(list(ler_registros(arquivo, "csv")))
+
+    assert [indice for indice, _ in validos] == [0]
+    assert validos[0][1].cpf_motorista == "52998224725"
+    assert [r.indice for r in rejeitados] == [1, 2]
+
+
+def test_ndjson_malformado_vira_erro_da_linha():
+    arquivo = io.StringIO('{"id_posto": 1}\n\n{quebrado\n')
+
+    registros = list(ler_registros(arquivo, "ndjson"))
+
+    assert registros[0] == {"id_posto": 1}
+    assert isinstance(registros[1], ValueError)
+
+
+def test_checkpoint_inexistente_comeca_do_zero(tmp_path):
+    caminho = tmp_path / "dados.csv.checkpoint"
+
+    assert ler_checkpoint(caminho)["linhas"] == 0
+
+    gravar_checkpoint(caminho, {"linhas": 5000, "importados": 4990, "rejeitados": 10})
+
+    assert ler_checkpoint(caminho) == {"linhas": 5000, "importados": 4990, "rejeitados": 10}
+    assert not (tmp_path / "dados.csv.checkpoint.tmp").exists()
+
+
+class FakeRepository:
+    def __init__(self, media):
+        self.media = media
+        self.copiados = []
+
+    async def get_media_preco_por_combustivel(self, tipo):
+        return self.media
+
+    async def copiar(self, valores):
+        self.copiados.extend(valores)
+        return [Abastecimento(**v) for v in valores]
+
+
+@pytest.mark.asyncio
+async def test_importar_lote_pontua_e_copia():
+    arquivo = io.StringIO(
+        CABECALHO
+        + "901,2025-01-22T14:30:00+00:00,DIESEL,5.00,40,52998224725\n"
+        + "901,2025-01-22T15:30:00+00:00,DIESEL,9.00,40,52998224725\n"
+    )
+    validos, _ = validar_itens_lote(list(ler_registros(arquivo, "csv")))
+
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = FakeRepository(media=Decimal("5.00"))
+
+    assert await service.importar_lote([data for _, data in validos]) == 2
+    assert [v["improper_data"] for v in service.repository.copiados] == [False, True]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não configurada")
+async def test_falha_nos_agregados_desfaz_o_copy(monkeypatch):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    valores = [
+        {
+            "id_posto": POSTO_TESTE,
+            "data_hora": datetime(2025, 1, 22, 14, 30, tzinfo=timezone.utc),
+            "tipo_combustivel": TipoCombustivel.DIESEL,
+            "preco_por_litro": Decimal("5.00"),
+            "volume_abastecido": Decimal("40.00"),
+            "cpf_motorista": "52998224725",
+            "improper_data": False,
+        }
+    ]
+
+    async def falhar(abastecimentos):
+        raise RuntimeError("upsert falhou")
+
+    try:
+        async with AsyncSession(engine) as session:
+            repository = AbastecimentoRepository(session)
+            monkeypatch.setattr(repository, "_atualizar_agregados", falhar)
+            with pytest.raises(RuntimeError):
+                await repository.copiar(valores)
+
+        async with engine.connect() as conn:
+            restantes = (
+                await conn.execute(
+                    text("SELECT count(*) FROM abastecimentos WHERE id_posto = :posto"),
+                    {"posto": POSTO_TESTE},
+                )
+            ).scalar()
+        assert restantes == 0
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM abastecimentos WHERE id_posto = :posto"),
+                {"posto": POSTO_TESTE},
+            )
+        await engine.dispose()
@@ -0,0 +1,112 @@
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.schemas.abastecimento import AbastecimentoCreate, AbastecimentoResponse
+from app.services.abastecimento_service import AbastecimentoService
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class FakeRepository:
+    def __init__(self):
+        self.chamadas = []
+
+    async def get_media_preco_por_combustivel(self, tipo):
+        return None
+
+    async def create(self, valores, chave_idempotencia=None, commit_assincrono=False):
+        self.chamadas.append(commit_assincrono)
+        return SimpleNamespace(id=7, created_at=datetime.now(timezone.utc), **valores)
+
+
+# Posto, dia e CPF exclusivos deste arquivo: as linhas derivadas criadas
+# pela inserção são só do teste e podem ser apagadas por inteiro
+POSTO = 987655
+DIA = datetime(2001, 1, 10, 12, tzinfo=timezone.utc)
+CPF = "11144477735"
+
+
+def _dados():
+    return AbastecimentoCreate(
+        id_posto=POSTO,
+        data_hora=DIA,
+        tipo_combustivel=TipoCombustivel.DIESEL,
+        preco_por_litro=Decimal("6.10"),
+        volume_abastecido=Decimal("80"),
+        cpf_motorista=CPF,
+    )
+
+
+@pytest.mark.asyncio
+async def test_resposta_montada_da_linha_e_commit_assincrono_opcional(monkeypatch):
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = FakeRepository()
+    monkeypatch.setattr(settings, "ingestao_commit_assincrono", True)
+
+    resposta = await service.create_abastecimento(_dados())
+    await service.create_abastecimento(_dados(), commit_assincrono=False)
+
+    assert isinstance(resposta, AbastecimentoResponse)
+    assert resposta.id == 7
+    assert service.repository.chamadas == [True, False]
+
+
+async def _limpar(engine):
+    async with engine.begin() as conn:
+        for comando in (
+            "DELETE FROM chaves_idempotencia WHERE chave = 'teste-insercao'",
+            "DELETE FROM abastecimentos WHERE id_posto = :posto",
+            "DELETE FROM rollup_postos WHERE id_posto = :posto",
+            "DELETE FROM contagens_diarias WHERE dia = :dia",
+            "DELETE FROM resumo_motoristas WHERE cpf_motorista = :cpf",
+        ):
+            await conn.execute(
+                text(comando), {"posto": POSTO, "dia": DIA.date(), "cpf": CPF}
+            )
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não configurada")
+async def test_insert_returning_devolve_a_linha_e_atualiza_os_derivados():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    valores = _dados().model_dump()
+    valores["improper_data"] = False
+    await _limpar(engine)
+
+    try:
+        async with AsyncSession(engine) as session:
+            linha = await AbastecimentoRepository(session).create(
+                valores, chave_idempotencia="teste-insercao", commit_assincrono=True
+            )
+            # set_config local não sobrevive à transação
+            restante = (await session.execute(text("SHOW synchronous_commit"))).scalar()
+
+            derivados = (
+                await session.execute(
+                    text(
+                        "SELECT (SELECT quantidade FROM rollup_postos WHERE id_posto = :posto),"
+                        " (SELECT quantidade FROM contagens_diarias WHERE dia = :dia),"
+                        " (SELECT quantidade FROM resumo_motoristas WHERE cpf_motorista = :cpf),"
+                        " (SELECT id_abastecimento FROM chaves_idempotencia"
+                        "  WHERE chave = 'teste-insercao')"
+                    ),
+                    {"posto": POSTO, "dia": DIA.date(), "cpf": CPF},
+                )
+            ).one()
+
+        assert linha.id is not None and linha.created_at is not None
+        assert linha.volume_abastecido == Decimal("80.00")
+        assert restante == "on"
+        assert tuple(derivados) == (1, 1, 1, linha.id)
+    finally:
+        await _limpar(engine)
+        await engine.dispose()
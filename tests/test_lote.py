@@ -0,0 +1,93 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from decimal import Decimal
+
+from app.services.abastecimento_service import AbastecimentoService
+from app.models.abastecimento import TipoCombustivel
+from app.utils.lote import ler_itens_lote, validar_itens_lote
+
+
+def _item(**overrides):
+    item = {
+        "id_posto": 1,
+        "data_hora": "2025-01-22T14:30:00+00:00",
+        "tipo_combustivel": "GASOLINA",
+        "preco_por_litro": "5.00",
+        "volume_abastecido": "40",
+        "cpf_motorista": "52998224725",
+    }
+    item.update(overrides)
+    return item
+
+
+class FakeRepository:
+    """Fake que registra as consultas de média e as inserções em lote."""
+
+    def __init__(self, medias):
+        self.medias = medias
+        self.consultas = []
+        self.valores = None
+
+    async def get_media_preco_por_combustivel(self, tipo):
+        self.consultas.append(tipo)
+        return self.medias.get(tipo)
+
+    async def create_many(self, valores, tamanho_chunk=500, chaves_idempotencia=None):
+        self.valores = valores
+        return [SimpleNamespace(**v) for v in valores]
+
+
+def test_ler_itens_lote_ndjson_rejeita_apenas_linha_invalida():
+    corpo = "\n".join([json.dumps(_item()), "{quebrado", "", json.dumps(_item())])
+
+    itens = ler_itens_lote(corpo.encode(), ndjson=True)
+
+    assert len(itens) == 3
+    assert isinstance(itens[1], ValueError)
+
+
+def test_ler_itens_lote_json_exige_array():
+    with pytest.raises(ValueError):
+        ler_itens_lote(json.dumps(_item()).encode(), ndjson=False)
+
+
+def test_validar_itens_lote_separa_cpf_invalido():
+    itens = [_item(), _item(cpf_motorista="12345678900"), _item()]
+
+    validos, rejeitados = validar_itens_lote(itens)
+
+    assert [indice for indice, _ in validos] == [0, 2]
+    assert len(rejeitados) == 1
+    assert rejeitados[0].indice == 1
+    assert rejeitados[0].status == "rejeitado"
+
+
+@pytest.mark.asyncio
+async def test_lote_consulta_media_uma_vez_por_tipo():
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.repository = FakeRepository(
+        medias={
+            TipoCombustivel.GASOLINA: Decimal("5.00"),
+            TipoCombustivel.DIESEL: Decimal("4.80"),
+        }
+    )
+
+    validos, _ = validar_itens_lote([
+        _item(preco_por_litro="6.00"),  # +20%
+        _item(preco_por_litro="6.50"),  # +30%
+        _item(tipo_combustivel="DIESEL", preco_por_litro="4.80"),
+    ])
+
+    await service.create_abastecimentos_lote([data for _, data in validos])
+
+    assert sorted(service.repository.consultas) == [
+        TipoCombustivel.DIESEL,
+        TipoCombustivel.GASOLINA,
+    ]
+    assert [v["improper_data"] for v in service.repository.valores] == [
+        False,
+        True,
+        False,
+    ]
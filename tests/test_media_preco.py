@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import pytest
+
+from app.core.media_preco import AgregadorMediaPreco
+from app.models.abastecimento import TipoCombustivel
+
+
+def test_media_sem_historico_e_none():
+    agregador = AgregadorMediaPreco()
+
+    assert agregador.media(TipoCombustivel.GASOLINA) is None
+
+
+def test_media_acumulada_incorpora_insercoes():
+    agregador = AgregadorMediaPreco()
+    agregador.carregar([(TipoCombustivel.GASOLINA, Decimal("10.00"), 2)])
+
+    agregador.registrar(TipoCombustivel.GASOLINA, Decimal("8.00"))
+
+    assert agregador.media(TipoCombustivel.GASOLINA) == Decimal("6")
+    assert agregador.media(TipoCombustivel.DIESEL) is None
+
+
+def test_carregar_substitui_estado():
+    agregador = AgregadorMediaPreco()
+    agregador.registrar(TipoCombustivel.ETANOL, Decimal("3.00"))
+
+    agregador.carregar([(TipoCombustivel.DIESEL, Decimal("9.60"), 2)])
+
+    assert agregador.media(TipoCombustivel.ETANOL) is None
+    assert agregador.media(TipoCombustivel.DIESEL) == Decimal("4.80")
+
+
+def test_media_ewma_pondera_valores_recentes():
+    agregador = AgregadorMediaPreco(modo="ewma", alpha=0.5)
+    agregador.carregar([(TipoCombustivel.GASOLINA, Decimal("50.00"), 10)])
+
+    agregador.registrar(TipoCombustivel.GASOLINA, Decimal("7.00"))
+
+    assert agregador.media(TipoCombustivel.GASOLINA) == Decimal("6.00")
+
+
+def test_reconciliacao_preserva_a_ewma():
+    agregador = AgregadorMediaPreco(modo="ewma", alpha=0.5)
+    agregador.carregar([(TipoCombustivel.GASOLINA, Decimal("50.00"), 10)])
+    agregador.registrar(TipoCombustivel.GASOLINA, Decimal("7.00"))
+
+    agregador.carregar([
+        (TipoCombustivel.GASOLINA, Decimal("57.00"), 11),
+        (TipoCombustivel.DIESEL, Decimal("12.00"), 2),
+    ])
+
+    assert agregador.media(TipoCombustivel.GASOLINA) == Decimal("6.00")
+    assert agregador.media(TipoCombustivel.DIESEL) == Decimal("6.00")
+    assert agregador._contagem[TipoCombustivel.GASOLINA] == 11
+
+
+def test_modo_invalido():
+    with pytest.raises(ValueError):
+        AgregadorMediaPreco(modo="mediana")
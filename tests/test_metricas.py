@@ -0,0 +1,89 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.metricas import (
+    Histograma,
+    MetricasMiddleware,
+    RegistroMetricas,
+    instrumentar_repositorio,
+    operacao_db,
+    registrar_hooks_db,
+)
+
+
+def test_histograma_acumula_buckets_na_exposicao():
+    histograma = Histograma("latencia", "Latência.", ("rota",), buckets=(0.1, 1.0))
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        histograma.observar(("/x",), valor)
+
+    linhas = histograma.expor()
+
+    assert 'latencia_bucket{rota="/x",le="0.1"} 2' in linhas
+    assert 'latencia_bucket{rota="/x",le="1.0"} 3' in linhas
+    assert 'latencia_bucket{rota="/x",le="+Inf"} 4' in linhas
+    assert 'latencia_count{rota="/x"} 4' in linhas
+
+
+def test_middleware_rotula_pelo_template_da_rota():
+    registro = RegistroMetricas()
+    app = FastAPI()
+    app.add_middleware(MetricasMiddleware, registro=registro)
+
+    @app.get("/motoristas/{cpf}")
+    async def historico(cpf: str):
+        return {"cpf": cpf}
+
+    client = TestClient(app)
+    client.get("/motoristas/1")
+    client.get("/motoristas/2")
+    client.get("/inexistente")
+
+    assert registro.requisicoes.valor(
+        ("GET", "/motoristas/{cpf}", "historico", "200")
+    ) == 2
+    assert registro.requisicoes.valor(("GET", "sem_rota", "sem_rota", "404")) == 1
+    assert registro.latencia.contagem(("GET", "/motoristas/{cpf}", "historico")) == 2
+
+
+@instrumentar_repositorio
+class RepositorioTeste:
+    async def buscar(self):
+        return operacao_db.get()
+
+    async def listar(self):
+        for _ in range(2):
+            yield operacao_db.get()
+
+    async def _interno(self):
+        return operacao_db.get()
+
+
+@pytest.mark.asyncio
+async def test_decorador_define_operacao_apenas_durante_a_chamada():
+    repositorio = RepositorioTeste()
+
+    assert await repositorio.buscar() == "RepositorioTeste.buscar"
+    assert [o async for o in repositorio.listar()] == ["RepositorioTeste.listar"] * 2
+    assert await repositorio._interno() is None
+    assert operacao_db.get() is None
+
+
+def test_hooks_contam_consultas_por_operacao():
+    registro = RegistroMetricas()
+    engine = create_engine("sqlite://")
+    registrar_hooks_db(engine, registro)
+
+    token = operacao_db.set("Repo.metodo")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    operacao_db.reset(token)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 3"))
+
+    assert registro.consultas.valor(("Repo.metodo",)) == 2
+    assert registro.consultas.valor(("outros",)) == 1
+    assert registro.duracao_consultas.contagem(("Repo.metodo",)) == 2
@@ -0,0 +1,43 @@
+import pytest
+from datetime import date, datetime, timezone
+
+from app.utils.particoes import (
+    limites_particao,
+    mes_da_particao,
+    nome_particao,
+    somar_meses,
+)
+
+
+@pytest.mark.parametrize(
+    "mes, quantidade, esperado",
+    [
+        (date(2025, 1, 1), 1, date(2025, 2, 1)),
+        (date(2025, 11, 1), 3, date(2026, 2, 1)),
+        (date(2025, 1, 1), -1, date(2024, 12, 1)),
+        (date(2025, 3, 1), -15, date(2023, 12, 1)),
+    ],
+)
+def test_somar_meses(mes, quantidade, esperado):
+    assert somar_meses(mes, quantidade) == esperado
+
+
+def test_nome_particao_ida_e_volta():
+    nome = nome_particao(date(2025, 7, 1))
+
+    assert nome == "abastecimentos_p202507"
+    assert mes_da_particao(nome) == date(2025, 7, 1)
+
+
+@pytest.mark.parametrize(
+    "nome", ["abastecimentos_default", "abastecimentos_p202513", "outra_p202501"]
+)
+def test_mes_da_particao_ignora_nomes_fora_do_padrao(nome):
+    assert mes_da_particao(nome) is None
+
+
+def test_limites_particao_dezembro():
+    inicio, fim = limites_particao(date(2025, 12, 1))
+
+    assert inicio == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert fim == datetime(2026, 1, 1, tzinfo=timezone.utc)
@@ -0,0 +1,225 @@
+"""
+Regressão de planos de consulta do AbastecimentoRepository.
+
+Executa cada método do repositório contra um PostgreSQL semeado, captura
+as instruções SQL emitidas e roda EXPLAIN em cada uma, falhando se aparecer
+Seq Scan ou Sort (fora de SORT_PERMITIDO) no plano. Partições vazias (ex.:
+a default e meses futuros) são ignoradas: nelas o planejador escolhe Seq
+Scan por custo zero.
+
+Requer um banco dedicado, já migrado (`alembic upgrade head`), indicado em
+TEST_DATABASE_URL. A tabela abastecimentos é truncada ao final.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.repositories.particao_repository import ParticaoRepository
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+LINHAS_SEMEADAS = 200_000
+CPF_SEMEADO = "52998224725"
+REFERENCIA = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não configurada"
+)
+
+
+async def _semear() -> None:
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with AsyncSession(engine) as session:
+        await ParticaoRepository(session).criar_particoes_futuras(
+            REFERENCIA.date(), meses=12
+        )
+        await session.commit()
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE abastecimentos RESTART IDENTITY"))
+        # Um ano de dados em ordem cronológica, ~1000 motoristas distintos
+        await conn.execute(
+            text(
+                f"""
+                INSERT INTO abastecimentos (
+                    id_posto, data_hora, tipo_combustivel, preco_por_litro,
+                    volume_abastecido, cpf_motorista, improper_data
+                )
+                SELECT
+                    1 + (n % 500),
+                    timestamptz '{REFERENCIA.isoformat()}'
+                        + n * (interval '1 year' / {LINHAS_SEMEADAS}),
+                    (ARRAY['GASOLINA', 'ETANOL', 'DIESEL'])[1 + n % 3]::tipocombustivel,
+                    4 + (n % 300) / 100.0,
+                    15 + (n % 60),
+                    CASE WHEN n % 1000 = 0 THEN :cpf
+                         ELSE lpad((n % 997)::text, 11, '0') END,
+                    n % 7 = 0
+                FROM generate_series(1, {LINHAS_SEMEADAS}) AS n
+                """
+            ),
+            {"cpf": CPF_SEMEADO},
+        )
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE abastecimentos"))
+    await engine.dispose()
+
+
+async def _truncar() -> None:
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE abastecimentos RESTART IDENTITY"))
+    await engine.dispose()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def banco_semeado():
+    asyncio.run(_semear())
+    yield
+    asyncio.run(_truncar())
+
+
+def _relacoes(no: dict) -> set:
+    relacoes = {no["Relation Name"]} if "Relation Name" in no else set()
+    for filho in no.get("Plans", []):
+        relacoes |= _relacoes(filho)
+    return relacoes
+
+
+def _nos(plano: dict, ignoradas: set):
+    """Percorre o plano pulando subárvores que só leem relações ignoradas."""
+    relacoes = _relacoes(plano)
+    if relacoes and relacoes <= ignoradas:
+        return
+    yield plano
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho, ignoradas)
+
+
+async def _consumir(resultado):
+    if hasattr(resultado, "__aiter__"):
+        return [item async for item in resultado]
+    return await resultado
+
+
+inicio_mes = REFERENCIA + timedelta(days=150)
+fim_mes = inicio_mes + timedelta(days=30)
+
+# O GROUP BY de carga das médias lê a tabela inteira por definição e fica
+# de fora. O total da listagem vem de contagens_diarias (uma linha por
+# combustível e dia), pequena o bastante para o Seq Scan ser a escolha
+# certa; por isso ela é ignorada na verificação.
+CASOS = {
+    "get_all_tipo_e_periodo": lambda r: r.get_all(
+        page=3, size=10, tipo_combustivel=TipoCombustivel.DIESEL,
+        data_inicio=inicio_mes, data_fim=fim_mes,
+    ),
+    "get_all_periodo": lambda r: r.get_all(
+        page=3, size=10, tipo_combustivel=None,
+        data_inicio=inicio_mes, data_fim=fim_mes,
+    ),
+    "get_all_sem_filtro": lambda r: r.get_all(
+        page=3, size=10, tipo_combustivel=None, data_inicio=None, data_fim=None,
+    ),
+    "get_all_keyset_sem_filtro": lambda r: r.get_all_keyset(
+        size=10, tipo_combustivel=None, data_inicio=None, data_fim=None,
+        apos=(fim_mes, 10**9),
+    ),
+    "get_all_keyset_tipo": lambda r: r.get_all_keyset(
+        size=10, tipo_combustivel=TipoCombustivel.ETANOL,
+        data_inicio=None, data_fim=None, apos=(fim_mes, 10**9),
+    ),
+    "count_by_cpf": lambda r: r.count_by_cpf(CPF_SEMEADO),
+    "get_by_cpf": lambda r: r.get_by_cpf(CPF_SEMEADO),
+    "get_resumo_by_cpf": lambda r: r.get_resumo_by_cpf(CPF_SEMEADO),
+    "get_by_chave_natural": lambda r: r.get_by_chave_natural(
+        1, inicio_mes, CPF_SEMEADO, Decimal("40.00")
+    ),
+    "stream_chaves_naturais": lambda r: r.stream_chaves_naturais(
+        REFERENCIA + timedelta(days=360)
+    ),
+    "stream_janela_recente": lambda r: r.stream_janela_recente(
+        REFERENCIA + timedelta(days=360)
+    ),
+    "get_by_cpf_keyset": lambda r: r.get_by_cpf_keyset(
+        CPF_SEMEADO, size=10, apos=(fim_mes, 10**9)
+    ),
+    "stream_by_cpf": lambda r: r.stream_by_cpf(CPF_SEMEADO),
+    # Sem LIMIT, um mês inteiro é quase uma partição inteira e o Seq Scan
+    # nela é a escolha certa; dois dias na virada de mês exigem o índice
+    "stream_all_tipo_e_periodo": lambda r: r.stream_all(
+        TipoCombustivel.GASOLINA, inicio_mes, inicio_mes + timedelta(days=2)
+    ),
+    # Dois dias na virada de mês: poda as demais partições e lê só a faixa
+    "get_serie_precos": lambda r: r.get_serie_precos(
+        inicio_mes, inicio_mes + timedelta(days=2), 3600
+    ),
+}
+
+# A série agrupa por floor(epoch / intervalo), expressão sem índice: o
+# Sort do GroupAggregate (ou do ORDER BY sobre os baldes) é esperado. As
+# leituras sem LIMIT (histórico completo do CPF e exportação) atravessam
+# partições mensais: o planejador prefere um Bitmap Index Scan por
+# partição e ordenar as linhas lidas a um Merge Append. Elas continuam
+# sem Seq Scan; as variantes com LIMIT (keyset e página) não ordenam.
+SORT_PERMITIDO = {
+    "get_serie_precos",
+    "get_by_cpf",
+    "stream_by_cpf",
+    "stream_all_tipo_e_periodo",
+}
+
+@pytest.mark.parametrize("nome", sorted(CASOS))
+def test_plano_sem_seq_scan_nem_sort(nome):
+    asyncio.run(
+        _verificar_plano(CASOS[nome], permitir_sort=nome in SORT_PERMITIDO)
+    )
+
+
+async def _verificar_plano(chamada, permitir_sort: bool = False) -> None:
+    engine = create_async_engine(TEST_DATABASE_URL)
+    capturadas = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _capturar(conn, cursor, statement, parameters, context, executemany):
+        capturadas.append((statement, parameters))
+
+    async with AsyncSession(engine) as session:
+        await _consumir(chamada(AbastecimentoRepository(session)))
+
+    assert capturadas, "Nenhuma consulta capturada"
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        vazias = {
+            registro["relname"]
+            for registro in await raw.driver_connection.fetch(
+                "SELECT relname FROM pg_class "
+                "WHERE relname LIKE 'abastecimentos%' "
+                "AND relkind = 'r' AND reltuples <= 0"
+            )
+        } | {"contagens_diarias"}
+        for statement, parameters in capturadas:
+            saida = await raw.driver_connection.fetchval(
+                f"EXPLAIN (FORMAT JSON) {statement}", *(parameters or ())
+            )
+            # O dialeto asyncpg do SQLAlchemy registra um codec de json na
+            # conexão: a saída já chega decodificada
+            if isinstance(saida, str):
+                saida = json.loads(saida)
+            plano = saida[0]["Plan"]
+            tipos = [no["Node Type"] for no in _nos(plano, vazias)]
+
+            assert "Seq Scan" not in tipos, f"Seq Scan em:\n{statement}\n{tipos}"
+            if not permitir_sort:
+                assert "Sort" not in tipos, f"Sort em:\n{statement}\n{tipos}"
+
+    await engine.dispose()
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.pool import MedicaoEsperaPool
+
+
+class FakeConexao:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PoolTeste(MedicaoEsperaPool, QueuePool):
+    """Mesmo mixin da aplicação sobre o QueuePool síncrono."""
+
+
+def _pool(**kwargs):
+    return PoolTeste(FakeConexao, **kwargs)
+
+
+def test_estatisticas_refletem_conexoes_em_uso():
+    pool = _pool(pool_size=2, max_overflow=1)
+
+    conexoes = [pool.connect() for _ in range(3)]
+    stats = pool.estatisticas()
+
+    assert stats["em_uso"] == 3
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 3
+    assert stats["espera_media_ms"] is not None
+
+    for conexao in conexoes:
+        conexao.close()
+
+    assert pool.estatisticas()["em_uso"] == 0
+
+
+def test_timeout_e_contabilizado():
+    pool = _pool(pool_size=1, max_overflow=0, timeout=0.01)
+    conexao = pool.connect()
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    stats = pool.estatisticas()
+    assert stats["timeouts"] == 1
+    assert stats["espera_max_ms"] >= 10
+    conexao.close()
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers import health
+from app.core.prontidao import EstadoProntidao, prontidao
+from app.services import tarefas
+
+
+@pytest.mark.asyncio
+async def test_etapa_com_erro_fica_registrada_sem_propagar():
+    estado = EstadoProntidao()
+
+    async def falha():
+        raise RuntimeError("banco fora")
+
+    async def ok():
+        pass
+
+    assert not await estado.executar("medias_preco", falha)
+    assert await estado.executar("conexoes", ok)
+    estado.marcar_pronto()
+
+    resumo = estado.estado()
+    assert resumo["status"] == "ready"
+    assert resumo["etapas"]["medias_preco"]["status"] == "erro"
+    assert "banco fora" in resumo["etapas"]["medias_preco"]["erro"]
+    assert resumo["etapas"]["conexoes"]["status"] == "ok"
+
+
+def test_ready_responde_503_ate_o_aquecimento_terminar(monkeypatch):
+    monkeypatch.setattr(prontidao, "pronto", False)
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+
+    assert client.get("/ready").status_code == 503
+
+    prontidao.marcar_pronto()
+    assert client.get("/ready").json()["status"] == "ready"
+
+    prontidao.marcar_encerrando()
+    resposta = client.get("/ready")
+    assert (resposta.status_code, resposta.json()["status"]) == (503, "shutting_down")
+
+
+class FakeSessao:
+    abertas = 0
+    max_abertas = 0
+
+    async def __aenter__(self):
+        FakeSessao.abertas += 1
+        FakeSessao.max_abertas = max(FakeSessao.max_abertas, FakeSessao.abertas)
+        return self
+
+    async def __aexit__(self, *exc):
+        FakeSessao.abertas -= 1
+
+
+@pytest.mark.asyncio
+async def test_aquecimento_segura_as_conexoes_ao_mesmo_tempo(monkeypatch):
+    preparadas = []
+
+    async def preparar(session, leitura=False):
+        await asyncio.sleep(0)
+        preparadas.append(leitura)
+
+    monkeypatch.setattr(tarefas, "preparar_consultas", preparar)
+    FakeSessao.abertas = FakeSessao.max_abertas = 0
+
+    await tarefas.aquecer_pool(FakeSessao, 4, leitura=True)
+
+    assert preparadas == [True] * 4
+    assert FakeSessao.max_abertas == 4
+    assert FakeSessao.abertas == 0
+
+
+@pytest.mark.asyncio
+async def test_falha_no_aquecimento_nao_trava_as_demais(monkeypatch):
+    chamadas = 0
+
+    async def preparar(session, leitura=False):
+        nonlocal chamadas
+        chamadas += 1
+        if chamadas == 1:
+            raise ConnectionRefusedError("recusada")
+
+    monkeypatch.setattr(tarefas, "preparar_consultas", preparar)
+
+    with pytest.raises(ConnectionRefusedError):
+        await asyncio.wait_for(tarefas.aquecer_pool(FakeSessao, 3), timeout=1)
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.replicas import Replica, RoteadorLeitura
+
+AGORA = datetime(2025, 1, 10, 12, tzinfo=timezone.utc)
+
+
+def _replica(nome, atraso=None, em_dia=False):
+    replica = Replica(nome, engine=None, sessoes=None)
+    if atraso is not None:
+        replica.atualizar(AGORA, AGORA - timedelta(seconds=atraso), em_dia)
+    return replica
+
+
+def test_round_robin_entre_replicas_em_dia():
+    a, b = _replica("a", atraso=0.5), _replica("b", em_dia=True, atraso=99)
+    roteador = RoteadorLeitura([a, b], atraso_max_segundos=5)
+
+    escolhidas = [roteador.escolher(agora=AGORA).nome for _ in range(4)]
+
+    assert escolhidas == ["a", "b", "a", "b"]
+
+
+def test_replica_atrasada_ou_sem_verificacao_fica_de_fora():
+    roteador = RoteadorLeitura(
+        [_replica("atrasada", atraso=30), _replica("nunca_verificada")],
+        atraso_max_segundos=5,
+    )
+
+    assert roteador.escolher(agora=AGORA) is None
+    assert roteador.leituras_primario == 1
+
+
+def test_atraso_cresce_se_a_verificacao_parar():
+    replica = _replica("a", em_dia=True, atraso=0)
+    roteador = RoteadorLeitura([replica], atraso_max_segundos=5)
+
+    assert roteador.escolher(agora=AGORA + timedelta(seconds=4)) is replica
+    assert roteador.escolher(agora=AGORA + timedelta(seconds=6)) is None
+
+
+def test_leitura_apos_escrita_recente_vai_ao_primario():
+    replica = _replica("a", atraso=1)
+    roteador = RoteadorLeitura([replica], atraso_max_segundos=5)
+
+    roteador.registrar_escrita("52998224725", quando=AGORA - timedelta(seconds=2))
+    apos = roteador.ultima_escrita("52998224725")
+    assert roteador.escolher(apos=apos, agora=AGORA) is replica
+
+    roteador.registrar_escrita("52998224725", quando=AGORA)
+    apos = roteador.ultima_escrita("52998224725")
+    assert roteador.escolher(apos=apos, agora=AGORA) is None
+
+
+def test_escritas_antigas_sao_descartadas():
+    roteador = RoteadorLeitura([_replica("a")], atraso_max_segundos=5)
+
+    roteador.registrar_escrita("antigo", quando=AGORA - timedelta(seconds=10))
+    roteador.registrar_escrita("novo", quando=AGORA)
+
+    assert roteador.ultima_escrita("antigo") is None
+    assert roteador.ultima_escrita("novo") == AGORA
+
+
+def test_sem_replicas_nao_guarda_escritas():
+    roteador = RoteadorLeitura([])
+
+    roteador.registrar_escrita("52998224725")
+
+    assert not roteador.ativo
+    assert roteador.ultima_escrita("52998224725") is None
+
+
+class EngineFora:
+    def connect(self):
+        raise ConnectionRefusedError("recusada")
+
+
+@pytest.mark.asyncio
+async def test_falha_na_verificacao_marca_replica_indisponivel():
+    replica = _replica("a", atraso=0)
+    replica.engine = EngineFora()
+    roteador = RoteadorLeitura([replica])
+
+    await roteador.verificar()
+
+    assert not replica.saudavel
+    assert "recusada" in replica.erro
+    assert roteador.escolher(agora=AGORA) is None
+
+
+class FakeSessao:
+    def __init__(self):
+        self.info = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cpf, cacheavel", [(None, False), ("52998224725", True)]
+)
+async def test_leitura_de_replica_sem_instante_da_escrita_nao_vai_ao_cache(
+    monkeypatch, cpf, cacheavel
+):
+    from app import database
+
+    agora = datetime.now(timezone.utc)
+    replica = Replica("a", engine=None, sessoes=FakeSessao)
+    replica.atualizar(agora, agora, em_dia=True)
+    roteador = RoteadorLeitura([replica], atraso_max_segundos=5)
+    roteador.registrar_escrita("52998224725", quando=agora - timedelta(seconds=1))
+    monkeypatch.setattr(database, "roteador_leitura", roteador)
+
+    request = SimpleNamespace(
+        headers={}, path_params={"cpf": cpf} if cpf else {}
+    )
+    async for session in database.get_read_db(request):
+        assert session.info[database.LEITURA_CACHEAVEL] is cacheavel
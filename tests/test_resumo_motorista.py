@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.repositories.resumo_motorista_repository import agrupar_por_motorista
+from app.services.abastecimento_service import AbastecimentoService
+
+CPF = "52998224725"
+INICIO = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _abastecimento(cpf, data_hora, preco, volume, improper=False):
+    return SimpleNamespace(
+        cpf_motorista=cpf,
+        data_hora=data_hora,
+        preco_por_litro=Decimal(preco),
+        volume_abastecido=Decimal(volume),
+        improper_data=improper,
+    )
+
+
+def test_agrupa_por_cpf():
+    linhas = agrupar_por_motorista([
+        _abastecimento(CPF, INICIO + timedelta(days=2), "5.00", "40.00"),
+        _abastecimento(CPF, INICIO, "6.00", "10.00", improper=True),
+        _abastecimento("11144477735", INICIO, "5.50", "20.00"),
+    ])
+
+    assert [l["cpf_motorista"] for l in linhas] == ["11144477735", CPF]
+    resumo = linhas[1]
+    assert resumo["quantidade"] == 2
+    assert resumo["litros"] == Decimal("50.00")
+    assert resumo["gasto"] == Decimal("260.0000")
+    assert resumo["quantidade_anomalias"] == 1
+    assert resumo["primeiro_abastecimento"] == INICIO
+    assert resumo["ultimo_abastecimento"] == INICIO + timedelta(days=2)
+
+
+class FakeResumos:
+    def __init__(self, linha=None):
+        self.linha = linha
+
+    async def get_by_cpf(self, cpf):
+        return self.linha
+
+
+class FakeRepository:
+    def __init__(self, linha):
+        self.linha = linha
+        self.chamadas = 0
+
+    async def get_resumo_by_cpf(self, cpf):
+        self.chamadas += 1
+        return self.linha
+
+
+def _service(resumo, agregado):
+    service = AbastecimentoService.__new__(AbastecimentoService)
+    service.resumos = FakeResumos(resumo)
+    service.repository = FakeRepository(agregado)
+    return service
+
+
+def _linha(quantidade=2):
+    return SimpleNamespace(
+        quantidade=quantidade,
+        litros=Decimal("50.00"),
+        gasto=Decimal("260.0000"),
+        quantidade_anomalias=1,
+        primeiro_abastecimento=INICIO,
+        ultimo_abastecimento=INICIO + timedelta(days=2),
+    )
+
+
+@pytest.mark.asyncio
+async def test_resumo_le_tabela_sem_agregar():
+    service = _service(_linha(), None)
+
+    resumo = await service.get_resumo_motorista(CPF)
+
+    assert service.repository.chamadas == 0
+    assert resumo.total_abastecimentos == 2
+    assert resumo.gasto_total == Decimal("260.00")
+    assert resumo.preco_medio == Decimal("5.200")
+
+
+@pytest.mark.asyncio
+async def test_resumo_cai_na_agregacao_sem_linha():
+    service = _service(None, _linha())
+
+    resumo = await service.get_resumo_motorista(CPF)
+
+    assert service.repository.chamadas == 1
+    assert resumo.litros_total == Decimal("50.00")
+
+
+@pytest.mark.asyncio
+async def test_resumo_sem_abastecimentos():
+    vazio = SimpleNamespace(
+        quantidade=0, litros=None, gasto=None, quantidade_anomalias=0,
+        primeiro_abastecimento=None, ultimo_abastecimento=None,
+    )
+
+    assert await _service(None, vazio).get_resumo_motorista(CPF) is None
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.rollup_posto_repository import agrupar_por_posto_dia
+
+
+def _abastecimento(id_posto, data_hora, preco, volume="40.00", improper=False):
+    return SimpleNamespace(
+        id_posto=id_posto,
+        data_hora=data_hora,
+        tipo_combustivel=TipoCombustivel.GASOLINA,
+        preco_por_litro=Decimal(preco),
+        volume_abastecido=Decimal(volume),
+        improper_data=improper,
+    )
+
+
+def test_agrupa_por_posto_combustivel_e_dia_utc():
+    noite_brt = datetime(2025, 1, 1, 22, 0, tzinfo=timezone(timedelta(hours=-3)))
+    madrugada_utc = datetime(2025, 1, 2, 0, 30, tzinfo=timezone.utc)
+
+    linhas = agrupar_por_posto_dia([
+        _abastecimento(1, noite_brt, "5.00"),
+        _abastecimento(1, madrugada_utc, "7.00", improper=True),
+        _abastecimento(2, madrugada_utc, "6.00"),
+    ])
+
+    assert len(linhas) == 2
+    posto_1 = linhas[0]
+    assert (posto_1["id_posto"], posto_1["dia"].isoformat()) == (1, "2025-01-02")
+    assert posto_1["quantidade"] == 2
+    assert posto_1["soma_preco"] == Decimal("12.00")
+    assert (posto_1["preco_min"], posto_1["preco_max"]) == (Decimal("5.00"), Decimal("7.00"))
+    assert posto_1["litros"] == Decimal("80.00")
+    assert posto_1["quantidade_anomalias"] == 1
+
+
+def test_chaves_saem_ordenadas():
+    dia = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    linhas = agrupar_por_posto_dia([
+        _abastecimento(3, dia, "5.00"),
+        _abastecimento(1, dia + timedelta(days=1), "5.00"),
+        _abastecimento(1, dia, "5.00"),
+    ])
+
+    assert [(l["id_posto"], l["dia"].day) for l in linhas] == [(1, 1), (1, 2), (3, 1)]
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers import health
+from app.core.saude import MonitorSaude
+
+
+class FakeConexao:
+    def __init__(self, engine):
+        self.engine = engine
+        self.fechada = False
+
+    async def execute(self, consulta):
+        if self.engine.atraso:
+            await asyncio.sleep(self.engine.atraso)
+        if self.engine.falhar:
+            raise ConnectionResetError("conexão perdida")
+
+    async def close(self):
+        self.fechada = True
+
+
+class FakeEngine:
+    def __init__(self):
+        self.conexoes = []
+        self.falhar = False
+        self.atraso = 0.0
+
+    async def connect(self):
+        conexao = FakeConexao(self)
+        self.conexoes.append(conexao)
+        return conexao
+
+
+class FakePool:
+    def __init__(self, em_uso=0):
+        self.em_uso = em_uso
+
+    def estatisticas(self):
+        return {"tamanho": 5, "max_overflow": 10, "em_uso": self.em_uso}
+
+
+def _monitor(engine, em_uso=0, **kwargs):
+    return MonitorSaude(engine, FakePool(em_uso), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_verificacoes_reusam_a_conexao_dedicada():
+    engine = FakeEngine()
+    monitor = _monitor(engine)
+
+    assert monitor.estado()["services"]["database"] == "unknown"
+
+    await monitor.verificar()
+    await monitor.verificar()
+
+    estado = monitor.estado()
+    assert estado["status"] == "healthy"
+    assert estado["verificacao"]["latencia_ms"] is not None
+    assert len(engine.conexoes) == 1
+
+
+@pytest.mark.asyncio
+async def test_falha_descarta_a_conexao_e_reconecta():
+    engine = FakeEngine()
+    monitor = _monitor(engine)
+
+    engine.falhar = True
+    await monitor.verificar()
+    assert monitor.estado()["services"]["database"] == "unhealthy"
+    assert "conexão perdida" in monitor.estado()["verificacao"]["erro"]
+    assert engine.conexoes[0].fechada
+
+    engine.falhar = False
+    await monitor.verificar()
+    assert monitor.estado()["status"] == "healthy"
+    assert len(engine.conexoes) == 2
+
+
+@pytest.mark.asyncio
+async def test_timeout_marca_banco_indisponivel():
+    engine = FakeEngine()
+    engine.atraso = 1.0
+    monitor = _monitor(engine, timeout_segundos=0.01)
+
+    await asyncio.wait_for(monitor.verificar(), timeout=0.5)
+
+    assert monitor.estado()["services"]["database"] == "unhealthy"
+    assert "timeout" in monitor.estado()["verificacao"]["erro"]
+
+
+@pytest.mark.asyncio
+async def test_verificacao_velha_vira_unknown(monkeypatch):
+    monitor = _monitor(FakeEngine(), intervalo_segundos=1, timeout_segundos=1)
+    await monitor.verificar()
+
+    monkeypatch.setattr(monitor, "idade", lambda: monitor.max_idade + 1)
+
+    estado = monitor.estado()
+    assert (estado["status"], estado["services"]["database"]) == ("degraded", "unknown")
+
+
+def test_health_responde_do_estado_com_saturacao_do_pool(monkeypatch):
+    engine = FakeEngine()
+    monitor = _monitor(engine, em_uso=12)
+    monkeypatch.setattr(health, "monitor_saude", monitor)
+    asyncio.run(monitor.verificar())
+
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+
+    corpo = client.get("/health").json()
+    client.get("/health")
+
+    assert corpo["status"] == "healthy"
+    assert corpo["pool"]["saturacao"] == 0.8
+    assert corpo["verificacao"]["em"] is not None
+    # As chamadas ao /health não abrem conexões
+    assert len(engine.conexoes) == 1
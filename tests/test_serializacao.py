@@ -0,0 +1,86 @@
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.models.abastecimento import TipoCombustivel
+from app.repositories.abastecimento_repository import COLUNAS_RESPOSTA
+from app.schemas.abastecimento import (
+    AbastecimentoPagination,
+    AbastecimentoResponse,
+    HistoricoResponse,
+)
+from app.utils.serializacao import (
+    serializar_historico,
+    serializar_linha_ndjson,
+    serializar_pagina,
+)
+
+Linha = namedtuple("Linha", [coluna.key for coluna in COLUNAS_RESPOSTA])
+
+BRT = timezone(timedelta(hours=-3))
+
+LINHAS = [
+    Linha(1, 2, datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+          TipoCombustivel.GASOLINA, Decimal("5.50"), Decimal("40.00"),
+          "52998224725", False,
+          datetime(2025, 1, 2, 3, 4, 5, 120, tzinfo=BRT)),
+    Linha(2, 7, datetime(2025, 6, 30, 23, 59, 59, 999999, tzinfo=BRT),
+          TipoCombustivel.DIESEL, Decimal("5E+1"), Decimal("40"),
+          "11144477735", True,
+          datetime(2025, 7, 1, 12, 0)),
+]
+
+
+def _fastapi(modelo) -> bytes:
+    """Reproduz o corpo que o FastAPI gera a partir de um response_model."""
+    return json.dumps(
+        modelo.model_dump(mode="json"),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def _respostas():
+    return [AbastecimentoResponse.model_validate(linha._asdict()) for linha in LINHAS]
+
+
+def test_colunas_seguem_a_ordem_do_schema():
+    assert tuple(Linha._fields) == tuple(AbastecimentoResponse.model_fields)
+
+
+@pytest.mark.parametrize("next_cursor", [None, "abc"])
+def test_pagina_igual_ao_response_model(next_cursor):
+    esperado = _fastapi(AbastecimentoPagination(
+        items=_respostas(), total=12, page=1, size=2, pages=6,
+        next_cursor=next_cursor,
+    ))
+
+    assert serializar_pagina(
+        LINHAS, size=2, total=12, page=1, pages=6, next_cursor=next_cursor
+    ) == esperado
+
+
+def test_pagina_keyset_sem_total():
+    esperado = _fastapi(AbastecimentoPagination(items=_respostas(), size=2))
+
+    assert serializar_pagina(LINHAS, size=2) == esperado
+
+
+def test_historico_igual_ao_response_model():
+    esperado = _fastapi(HistoricoResponse(
+        cpf_motorista="52998224725",
+        total_abastecimentos=2,
+        abastecimentos=_respostas(),
+    ))
+
+    assert serializar_historico("52998224725", 2, LINHAS) == esperado
+
+
+def test_linha_ndjson():
+    assert serializar_linha_ndjson(LINHAS[0]) == (
+        _respostas()[0].model_dump_json().encode() + b"\n"
+    )